@@ -0,0 +1,27 @@
+"""expenses keyset pagination index
+
+Revision ID: 0002_expenses_keyset_index
+Revises: 0001_initial
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0002_expenses_keyset_index"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_expenses_user_date_created_id",
+        "expenses",
+        ["user_id", "expense_date", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_expenses_user_date_created_id", table_name="expenses")
@@ -0,0 +1,28 @@
+"""expenses summary covering index
+
+Revision ID: 0003_expenses_summary_index
+Revises: 0002_expenses_keyset_index
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0003_expenses_summary_index"
+down_revision = "0002_expenses_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_expenses_user_date_summary",
+        "expenses",
+        ["user_id", "expense_date", "currency", "category"],
+        unique=False,
+        postgresql_include=["amount"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_expenses_user_date_summary", table_name="expenses")
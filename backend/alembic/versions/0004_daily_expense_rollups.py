@@ -0,0 +1,56 @@
+"""daily expense rollups
+
+Revision ID: 0004_daily_expense_rollups
+Revises: 0003_expenses_summary_index
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004_daily_expense_rollups"
+down_revision = "0003_expenses_summary_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_expense_rollups",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("expense_date", sa.Date(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("sum_amount", sa.Numeric(scale=2), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "expense_date", "currency", "category"),
+    )
+    op.execute(
+        """
+        INSERT INTO daily_expense_rollups
+            (user_id, expense_date, currency, category, count, sum_amount)
+        SELECT user_id, expense_date, currency, COALESCE(category, ''), COUNT(*), SUM(amount)
+        FROM expenses
+        GROUP BY user_id, expense_date, currency, COALESCE(category, '')
+        """
+    )
+    # Summaries now read the rollups instead of scanning expenses.
+    op.drop_index("ix_expenses_user_date_summary", table_name="expenses")
+
+
+def downgrade():
+    op.create_index(
+        "ix_expenses_user_date_summary",
+        "expenses",
+        ["user_id", "expense_date", "currency", "category"],
+        unique=False,
+        postgresql_include=["amount"],
+    )
+    op.drop_table("daily_expense_rollups")
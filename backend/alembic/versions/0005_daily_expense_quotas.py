@@ -0,0 +1,44 @@
+"""daily expense quota counters
+
+Revision ID: 0005_daily_expense_quotas
+Revises: 0004_daily_expense_rollups
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0005_daily_expense_quotas"
+down_revision = "0004_daily_expense_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_expense_quotas",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("quota_date", sa.Date(), nullable=False),
+        sa.Column("used", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("user_id", "quota_date"),
+    )
+    # Seed from existing expenses so today's limits carry over.
+    op.execute(
+        """
+        INSERT INTO daily_expense_quotas (user_id, quota_date, used)
+        SELECT user_id, expense_date, COUNT(*)
+        FROM expenses
+        GROUP BY user_id, expense_date
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("daily_expense_quotas")
@@ -5,8 +5,10 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db import get_db
+from app.db import db_pool_stats, get_db
 from app.models import User
+from app.services.text_parser import parse_cache_stats
+from app.services.user_cache import invalidate_user, user_cache_stats
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -46,6 +48,7 @@ async def set_premium(
     user.is_premium = body.is_premium
     db.add(user)
     db.commit()
+    invalidate_user(user.id)
     db.refresh(user)
 
     return {
@@ -53,3 +56,16 @@ async def set_premium(
         "whatsapp_id": user.whatsapp_id,
         "is_premium": user.is_premium,
     }
+
+
+@router.get("/stats")
+async def runtime_stats(
+    x_admin_token: Optional[str] = Header(default=None, alias="X-Admin-Token"),
+) -> dict:
+    """Connection pool and cache counters for this process (one Lambda container)."""
+    _require_admin(x_admin_token)
+    return {
+        "db_pool": db_pool_stats(),
+        "user_cache": user_cache_stats(),
+        "parse_cache": parse_cache_stats(),
+    }
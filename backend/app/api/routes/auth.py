@@ -3,15 +3,17 @@ import logging
 import secrets
 import string
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Union
 
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db import get_db
+from app.db import get_async_db
 from app.models import LoginToken, RefreshToken, User
 
 logger = logging.getLogger(__name__)
@@ -52,7 +54,8 @@ def _hash_refresh_token(token: str) -> str:
     return hashlib.sha256((settings.jwt_secret_key + token).encode()).hexdigest()
 
 
-def _create_refresh_token(user_id: str, db: Session) -> str:
+def _create_refresh_token(user_id: str, db: Union[Session, AsyncSession]) -> str:
+    """Add a new refresh token to `db` and return its raw value; the caller commits."""
     raw = secrets.token_urlsafe(32)
     token = RefreshToken(
         user_id=user_id,
@@ -61,11 +64,12 @@ def _create_refresh_token(user_id: str, db: Session) -> str:
         + timedelta(days=settings.refresh_token_expiry_days),
     )
     db.add(token)
-    db.commit()
     return raw
 
 @router.post("/request-code")
-async def request_login_code(body: RequestCodeBody, db: Session = Depends(get_db)) -> dict:
+async def request_login_code(
+    body: RequestCodeBody, db: AsyncSession = Depends(get_async_db)
+) -> dict:
     """
     Start WhatsApp-based login:
     - User enters their WhatsApp number (wa_id).
@@ -77,8 +81,8 @@ async def request_login_code(body: RequestCodeBody, db: Session = Depends(get_db
         extra={"whatsapp_id": body.whatsapp_id},
     )
     user: Optional[User] = (
-        db.query(User).filter(User.whatsapp_id == body.whatsapp_id).first()
-    )
+        await db.execute(select(User).where(User.whatsapp_id == body.whatsapp_id))
+    ).scalars().first()
     if not user:
         logger.warning(
             "Login requested for unknown whatsapp_id %s",
@@ -98,7 +102,7 @@ async def request_login_code(body: RequestCodeBody, db: Session = Depends(get_db
         ),
     )
     db.add(token)
-    db.commit()
+    await db.commit()
 
     # Send code via SQS if configured; fallback to direct WhatsApp send.
     from app.services.queue import enqueue_outbound_text
@@ -121,7 +125,7 @@ async def request_login_code(body: RequestCodeBody, db: Session = Depends(get_db
 
 
 @router.post("/verify-code", response_model=TokenResponse)
-async def verify_login_code(body: VerifyCodeBody, db: Session = Depends(get_db)):
+async def verify_login_code(body: VerifyCodeBody, db: AsyncSession = Depends(get_async_db)):
     """
     Verify the one-time code and return a JWT for the web dashboard.
     """
@@ -130,8 +134,8 @@ async def verify_login_code(body: VerifyCodeBody, db: Session = Depends(get_db))
         extra={"whatsapp_id": body.whatsapp_id},
     )
     user: Optional[User] = (
-        db.query(User).filter(User.whatsapp_id == body.whatsapp_id).first()
-    )
+        await db.execute(select(User).where(User.whatsapp_id == body.whatsapp_id))
+    ).scalars().first()
     if not user:
         logger.warning(
             "verify_login_code: user not found for whatsapp_id %s",
@@ -143,16 +147,17 @@ async def verify_login_code(body: VerifyCodeBody, db: Session = Depends(get_db))
 
     now = datetime.now(timezone.utc)
     token: Optional[LoginToken] = (
-        db.query(LoginToken)
-        .filter(
-            LoginToken.user_id == user.id,
-            LoginToken.code == body.code,
-            LoginToken.used.is_(False),
-            LoginToken.expires_at > now,
+        await db.execute(
+            select(LoginToken)
+            .where(
+                LoginToken.user_id == user.id,
+                LoginToken.code == body.code,
+                LoginToken.used.is_(False),
+                LoginToken.expires_at > now,
+            )
+            .order_by(LoginToken.created_at.desc())
         )
-        .order_by(LoginToken.created_at.desc())
-        .first()
-    )
+    ).scalars().first()
 
     if not token:
         logger.warning(
@@ -165,10 +170,9 @@ async def verify_login_code(body: VerifyCodeBody, db: Session = Depends(get_db))
         )
 
     token.used = True
-    db.commit()
-
     access_token = _create_jwt(str(user.id))
     refresh_token = _create_refresh_token(user.id, db)
+    await db.commit()
     logger.info("verify_login_code successful for user %s", user.id)
     return TokenResponse(
         access_token=access_token,
@@ -182,19 +186,19 @@ class RefreshTokenBody(BaseModel):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_tokens(body: RefreshTokenBody, db: Session = Depends(get_db)):
+async def refresh_tokens(body: RefreshTokenBody, db: AsyncSession = Depends(get_async_db)):
     logger.info("refresh_tokens called")
     token_hash = _hash_refresh_token(body.refresh_token)
     now = datetime.now(timezone.utc)
     stored: Optional[RefreshToken] = (
-        db.query(RefreshToken)
-        .filter(
-            RefreshToken.token_hash == token_hash,
-            RefreshToken.revoked.is_(False),
-            RefreshToken.expires_at > now,
+        await db.execute(
+            select(RefreshToken).where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked.is_(False),
+                RefreshToken.expires_at > now,
+            )
         )
-        .first()
-    )
+    ).scalars().first()
 
     if not stored:
         logger.warning("refresh_tokens: invalid or expired refresh token")
@@ -203,10 +207,9 @@ async def refresh_tokens(body: RefreshTokenBody, db: Session = Depends(get_db)):
         )
 
     stored.revoked = True
-    db.commit()
-
     access_token = _create_jwt(str(stored.user_id))
     refresh_token = _create_refresh_token(stored.user_id, db)
+    await db.commit()
     logger.info("refresh_tokens successful for user %s", stored.user_id)
     return TokenResponse(
         access_token=access_token,
@@ -216,15 +219,15 @@ async def refresh_tokens(body: RefreshTokenBody, db: Session = Depends(get_db)):
 
 
 @router.post("/logout")
-async def logout(body: RefreshTokenBody, db: Session = Depends(get_db)):
+async def logout(body: RefreshTokenBody, db: AsyncSession = Depends(get_async_db)):
     logger.info("logout called")
     token_hash = _hash_refresh_token(body.refresh_token)
     stored: Optional[RefreshToken] = (
-        db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
-    )
+        await db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+    ).scalars().first()
     if stored and not stored.revoked:
         stored.revoked = True
-        db.commit()
+        await db.commit()
         logger.info("logout: refresh token revoked for user %s", stored.user_id)
     else:
         logger.info("logout: refresh token not found or already revoked")
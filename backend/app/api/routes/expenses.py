@@ -1,22 +1,48 @@
-from datetime import date
+import base64
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db import get_db
+from app.db import SessionLocal, get_async_db, get_db
+from app.db.engine import running_on_lambda
 from app.models import Expense
+from app.services import expense_import
 from app.services.auth import get_current_user
+from app.services.limits import daily_limit_for_user
+from app.services.quota import consume_statement, release_statement
+from app.services.rollups import summarize
 from app.models import User
 
 router = APIRouter(prefix="/api")
 
+EXPORT_BATCH_ROWS = 1000
+EXPORT_FIELDS = (
+    "id",
+    "user_id",
+    "amount",
+    "currency",
+    "category",
+    "merchant",
+    "notes",
+    "expense_date",
+    "receipt_id",
+    "created_at",
+)
+
 
 def _serialize_expense(expense: Expense) -> dict:
     return {
@@ -32,6 +58,29 @@ def _serialize_expense(expense: Expense) -> dict:
         "created_at": expense.created_at.isoformat() if expense.created_at else None,
     }
 
+def _encode_cursor(expense: Expense) -> str:
+    """
+    Build an opaque keyset cursor from the (expense_date, created_at, id) sort key.
+    """
+    raw = json.dumps(
+        [expense.expense_date.isoformat(), expense.created_at.isoformat(), str(expense.id)]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[date, datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, raw_created_at, raw_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            date.fromisoformat(raw_date),
+            datetime.fromisoformat(raw_created_at),
+            uuid.UUID(raw_id),
+        )
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
 class ExpenseUpdate(BaseModel):
     amount: Optional[float] = Field(default=None, gt=0)
     currency: Optional[str] = None
@@ -53,29 +102,231 @@ class DevSeedBody(BaseModel):
 
 @router.get("/expenses")
 async def list_expenses(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     category: Optional[str] = None,
 ) -> dict:
+    """
+    List the current user's expenses, newest first.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page
+    with a keyset seek; `offset` is kept for older clients and ignored when a
+    cursor is given.
+    """
     query = (
         select(Expense)
         .where(Expense.user_id == current_user.id)
-        .order_by(Expense.expense_date.desc(), Expense.created_at.desc())
+        .order_by(Expense.expense_date.desc(), Expense.created_at.desc(), Expense.id.desc())
     )
     if category:
         query = query.where(Expense.category == category)
 
-    expenses: List[Expense] = db.execute(query.limit(limit).offset(offset)).scalars().all()
-    return {"items": [_serialize_expense(e) for e in expenses]}
+    if cursor:
+        query = query.where(
+            tuple_(Expense.expense_date, Expense.created_at, Expense.id)
+            < tuple_(*_decode_cursor(cursor))
+        )
+    elif offset:
+        query = query.offset(offset)
+
+    # Fetch one extra row to know whether another page exists.
+    expenses: List[Expense] = (await db.execute(query.limit(limit + 1))).scalars().all()
+    next_cursor = _encode_cursor(expenses[limit - 1]) if len(expenses) > limit else None
+    return {
+        "items": [_serialize_expense(e) for e in expenses[:limit]],
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/expenses/summary")
+async def summarize_expenses(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    period: str = Query("month", pattern="^(day|week|month)$"),
+    by_category: bool = True,
+    limit: int = Query(1000, ge=1, le=5000),
+) -> dict:
+    """
+    Spending totals for charts, read from the daily rollups.
+
+    Rows are grouped by period bucket, currency and (unless `by_category` is
+    false) category over `start`..`end` inclusive, which default to the last 90
+    days. Amounts in different currencies are never summed together. At most
+    `limit` groups are returned; `truncated` tells the client to narrow the range.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end",
+        )
+
+    rows = summarize(db, current_user.id, start, end, period, by_category, limit + 1)
+    items = [
+        {
+            "period_start": row["period_start"].isoformat(),
+            "currency": row["currency"],
+            **({"category": row["category"]} if by_category else {}),
+            "total": float(row["total"].quantize(Decimal("0.01"))),
+            "count": row["count"],
+        }
+        for row in rows[:limit]
+    ]
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "period": period,
+        "items": items,
+        "truncated": len(rows) > limit,
+    }
+
+
+_IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def _export_query(
+    query: Select,
+    user_id: uuid.UUID,
+    start: Optional[date],
+    end: Optional[date],
+    category: Optional[str],
+) -> Select:
+    query = query.where(Expense.user_id == user_id)
+    if start:
+        query = query.where(Expense.expense_date >= start)
+    if end:
+        query = query.where(Expense.expense_date <= end)
+    if category:
+        query = query.where(Expense.category == category)
+    return query
+
+
+def _export_rows(
+    user_id: uuid.UUID,
+    fmt: str,
+    start: Optional[date],
+    end: Optional[date],
+    category: Optional[str],
+) -> Iterator[str]:
+    """
+    Yield the export body in pieces of about EXPORT_BATCH_ROWS rows. Rows are
+    fetched with yield_per (a server-side cursor on Postgres), so memory stays
+    flat however many expenses the user has. Runs in Starlette's threadpool
+    with its own session, since the request's session is closed before the
+    body is streamed.
+    """
+    query = (
+        _export_query(select(Expense), user_id, start, end, category)
+        .order_by(Expense.expense_date, Expense.created_at, Expense.id)
+        .execution_options(yield_per=EXPORT_BATCH_ROWS)
+    )
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    if fmt == "csv":
+        writer.writeheader()
+
+    db = SessionLocal()
+    try:
+        for partition in db.execute(query).scalars().partitions():
+            for expense in partition:
+                row = _serialize_expense(expense)
+                if fmt == "csv":
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(row))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/expenses/export")
+def export_expenses(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    category: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Stream the current user's expenses, oldest first, as CSV (with a header
+    row) or NDJSON. Fields match the items returned by GET /api/expenses.
+
+    On Lambda the body is not really streamed: Mangum buffers it, and API
+    Gateway caps responses at 6 MB. Exports over EXPORT_MAX_ROWS_LAMBDA rows
+    are refused there with a 413; narrow start/end to export in parts.
+    """
+    if running_on_lambda():
+        count_query = _export_query(
+            select(func.count()).select_from(Expense), current_user.id, start, end, category
+        )
+        if db.execute(count_query).scalar_one() > settings.export_max_rows_lambda:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=(
+                    f"Exports are limited to {settings.export_max_rows_lambda} rows; "
+                    "narrow start/end to export in parts"
+                ),
+            )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_rows(current_user.id, format, start, end, category),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="expenses.{format}"'},
+    )
+
+
+@router.post("/expenses/import")
+async def import_expenses(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+) -> dict:
+    """
+    Bulk-load expenses from a CSV (header row with at least amount and
+    expense_date) or NDJSON body, streamed rather than buffered. Daily limits
+    apply per expense_date; rows over the limit or failing validation are
+    skipped and reported. All accepted rows are committed together.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or _IMPORT_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=",
+        )
+
+    try:
+        return await expense_import.import_expenses(db, current_user, request.stream(), fmt)
+    except expense_import.ImportFormatError as exc:
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
 @router.patch("/expenses/{expense_id}")
 async def update_expense(
     expense_id: str,
     body: ExpenseUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> dict:
     try:
@@ -84,10 +335,10 @@ async def update_expense(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid expense id")
 
     expense: Optional[Expense] = (
-        db.query(Expense)
-        .filter(Expense.id == expense_uuid, Expense.user_id == current_user.id)
-        .first()
-    )
+        await db.execute(
+            select(Expense).where(Expense.id == expense_uuid, Expense.user_id == current_user.id)
+        )
+    ).scalars().first()
     if not expense:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Expense not found")
 
@@ -119,10 +370,24 @@ async def update_expense(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Expense date cannot be empty",
             )
-        expense.expense_date = update["expense_date"]
+        new_date = update["expense_date"]
+        if new_date != expense.expense_date:
+            # Move the expense's quota slot along with it, in this transaction.
+            limit = daily_limit_for_user(current_user)
+            dialect = db.get_bind().dialect.name
+            reserved = await db.execute(
+                consume_statement(dialect, current_user.id, new_date, limit, 1)
+            )
+            if reserved.first() is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Daily limit of {limit} expenses reached for {new_date.isoformat()}",
+                )
+            await db.execute(release_statement(current_user.id, expense.expense_date))
+            expense.expense_date = new_date
 
-    db.commit()
-    db.refresh(expense)
+    await db.commit()
+    await db.refresh(expense)
     return _serialize_expense(expense)
 
 
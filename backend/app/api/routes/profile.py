@@ -2,11 +2,12 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models import User
 from app.services.auth import get_current_user
+from app.services.user_cache import invalidate_user
 
 router = APIRouter(prefix="/api")
 
@@ -39,7 +40,7 @@ async def get_profile(
 @router.patch("/profile")
 async def update_profile(
     body: ProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> ProfileResponse:
     name = body.name.strip()
@@ -49,10 +50,11 @@ async def update_profile(
             detail="Name cannot be empty",
         )
 
+    # current_user belongs to this request's AsyncSession (get_current_user shares it).
     current_user.name = name
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    invalidate_user(current_user.id)
+    await db.refresh(current_user)
 
     return ProfileResponse(
         id=str(current_user.id),
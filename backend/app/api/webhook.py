@@ -1,15 +1,18 @@
 import logging
 from datetime import date, datetime, timezone
+from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.db import get_db
 from app.models import Expense, User
 from app.services.currency import resolve_currency
-from app.services.limits import daily_limit_for_user, has_reached_daily_limit
+from app.services.limits import daily_limit_for_user
+from app.services.quota import consume_daily_quota
 from app.services.text_parser import parse_expense_text
 from app.services.whatsapp import whatsapp_service
 
@@ -89,14 +92,17 @@ async def _handle_webhook_payload(
     
     logger.info("Received webhook payload: %s", payload)
 
+    from app.services.queue import batched_enqueue
+
     entries: List[Dict[str, Any]] = payload.get("entry", [])
-    for entry in entries:
-        for change in entry.get("changes", []):
-            value = change.get("value", {})
-            messages = value.get("messages", [])
-            contacts = value.get("contacts", [])
-            for message in messages:
-                await _handle_message(db, message, contacts)
+    with batched_enqueue():
+        for entry in entries:
+            for change in entry.get("changes", []):
+                value = change.get("value", {})
+                messages = value.get("messages", [])
+                contacts = value.get("contacts", [])
+                for message in messages:
+                    await _handle_message(db, message, contacts)
 
     return {"status": "received"}
 
@@ -127,6 +133,18 @@ def _message_reference_date(message: Dict[str, Any]) -> Optional[date]:
         return None
 
 
+def _create_user(db: Session, wa_id: str) -> User:
+    """Flush a new user; if a concurrent delivery created it first, load that one."""
+    user = User(whatsapp_id=wa_id)
+    db.add(user)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return db.query(User).filter(User.whatsapp_id == wa_id).one()
+    return user
+
+
 async def _handle_message(db: Session, message: Dict[str, Any], contacts: List[Dict[str, Any]]):
     msg_type = message.get("type")
     # Meta sends wa_id in message["from"] field, fallback to contacts if available
@@ -137,18 +155,21 @@ async def _handle_message(db: Session, message: Dict[str, Any], contacts: List[D
         return
 
     user = db.query(User).filter(User.whatsapp_id == wa_id).first()
-    if not user:
-        user = User(whatsapp_id=wa_id)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
 
     if msg_type == "text":
-        reference_date = _message_reference_date(message)
-        await _handle_text_message(db, user, message, reference_date)
+        # Parse (possibly an external HTTP call) before writing anything, so no
+        # row lock is held while waiting; a new user is then committed together
+        # with the expense.
+        body = _extract_text_body(message)
+        parsed = await parse_expense_text(body, reference_date=_message_reference_date(message))
+        user = user or _create_user(db, wa_id)
+        await _handle_text_message(db, user, body, parsed)
     else:
         from app.services.queue import enqueue_outbound_text
 
+        if not user:
+            _create_user(db, wa_id)
+            db.commit()
         fallback = "Thanks! Image and other message types will be supported soon."
         if not enqueue_outbound_text(wa_id, fallback):
             await whatsapp_service.send_text_message(wa_id, fallback)
@@ -159,33 +180,35 @@ def _extract_text_body(message: Dict[str, Any]) -> str:
     return text_obj.get("body", "").strip()
 
 
-async def _handle_text_message(
-    db: Session, user: User, message: Dict[str, Any], reference_date: Optional[date]
-):
-    body = _extract_text_body(message)
-    parsed = await parse_expense_text(body, reference_date=reference_date)
-
+async def _handle_text_message(db: Session, user: User, body: str, parsed: Dict[str, Any]):
+    wa_id = user.whatsapp_id
     amount = parsed.get("amount")
     if not amount or amount <= 0:
         logger.info("No valid amount found in message '%s'; skipping expense creation", body)
+        db.commit()
         await whatsapp_service.send_text_message(
-            user.whatsapp_id,
+            wa_id,
             "I couldn't find a valid amount in that message. Please include something like 'Lunch 12 USD'.",
         )
         return
 
-    currency = resolve_currency(db, user, parsed.get("currency"), user.whatsapp_id)
-    parsed["currency"] = currency
-
     expense_date = parsed["expense_date"]
-    if has_reached_daily_limit(db, user, expense_date):
+    # Reserves quota atomically; committed (or rolled back) with the expense.
+    if not consume_daily_quota(db, user, expense_date):
         limit = daily_limit_for_user(user)
+        # End the transaction before the (slow) reply: the refused upsert still
+        # holds the quota row lock, and other writers for this day would wait.
+        db.commit()
         await whatsapp_service.send_text_message(
-            user.whatsapp_id,
+            wa_id,
             f"You've reached your daily limit of {limit} expenses. Try again tomorrow or upgrade for a higher limit.",
         )
         return
 
+    currency = resolve_currency(user, parsed.get("currency"), wa_id)
+    parsed["currency"] = currency
+
+    amount = Decimal(str(amount)).quantize(Decimal("0.01"))
     expense = Expense(
         user_id=user.id,
         amount=amount,
@@ -196,15 +219,15 @@ async def _handle_text_message(
         expense_date=expense_date,
     )
 
+    # One transaction for the expense and any default-currency change on the user.
     db.add(expense)
     db.commit()
-    db.refresh(expense)
 
     confirmation = (
-        f"Recorded expense: {expense.amount} {expense.currency}"
-        f" for {expense.merchant or 'your expense'} on {expense.expense_date}."
+        f"Recorded expense: {amount} {currency}"
+        f" for {parsed['merchant'] or 'your expense'} on {expense_date}."
     )
     from app.services.queue import enqueue_outbound_text
 
-    if not enqueue_outbound_text(user.whatsapp_id, confirmation):
-        await whatsapp_service.send_text_message(user.whatsapp_id, confirmation)
+    if not enqueue_outbound_text(wa_id, confirmation):
+        await whatsapp_service.send_text_message(wa_id, confirmation)
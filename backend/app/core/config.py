@@ -10,6 +10,22 @@ class Settings(BaseSettings):
     app_name: str = Field(..., env="APP_NAME")
     debug: bool = Field(..., env="DEBUG")
     database_url: str = Field(..., env="DATABASE_URL")
+    # Async route sessions; defaults to DATABASE_URL with the asyncpg/aiosqlite driver.
+    async_database_url: Optional[str] = Field(default=None, env="ASYNC_DATABASE_URL")
+    # Connection pooling, see app/db/engine.py. DB_POOL_MODE: auto|lambda|queue|null.
+    db_pool_mode: str = Field("auto", env="DB_POOL_MODE")
+    # Overrides DB_POOL_MODE for the sync engine only. The API Lambda sets it
+    # to null so its async pool is the only one holding connections.
+    db_sync_pool_mode: Optional[str] = Field(default=None, env="DB_SYNC_POOL_MODE")
+    db_pool_size: int = Field(5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout_seconds: float = Field(30.0, env="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_recycle_seconds: int = Field(1800, env="DB_POOL_RECYCLE_SECONDS")
+    db_connect_timeout_seconds: int = Field(5, env="DB_CONNECT_TIMEOUT_SECONDS")
+    # RDS Proxy endpoint; replaces the host in DATABASE_URL when set.
+    db_proxy_host: Optional[str] = Field(default=None, env="DB_PROXY_HOST")
+    # Open one connection at import on Lambda so cold starts do it during init.
+    db_warm_up: bool = Field(True, env="DB_WARM_UP")
 
     # WhatsApp Cloud API
     whatsapp_verify_token: str = Field(..., env="WHATSAPP_VERIFY_TOKEN")
@@ -27,6 +43,11 @@ class Settings(BaseSettings):
     # Usage limits
     daily_limit_free: int = Field(10, env="DAILY_LIMIT_FREE")
     daily_limit_premium: int = Field(50, env="DAILY_LIMIT_PREMIUM")
+    # POST /api/expenses/import
+    import_max_rows: int = Field(100_000, env="IMPORT_MAX_ROWS")
+    # GET /api/expenses/export on Lambda: Mangum buffers the streamed body and
+    # API Gateway rejects responses over 6 MB, so larger exports get a 413.
+    export_max_rows_lambda: int = Field(20_000, env="EXPORT_MAX_ROWS_LAMBDA")
 
     # Optional external text parser service (AWS/GCP, custom endpoint, etc.)
     external_text_parser_url: str = Field(..., env="EXTERNAL_TEXT_PARSER_URL")
@@ -34,6 +55,34 @@ class Settings(BaseSettings):
         default=None, env="EXTERNAL_TEXT_PARSER_API_KEY"
     )
 
+    # Shared outbound HTTP client (WhatsApp Graph API, external text parser)
+    http_timeout_seconds: float = Field(10.0, env="HTTP_TIMEOUT_SECONDS")
+    http_max_connections: int = Field(100, env="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(20, env="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_keepalive_expiry_seconds: float = Field(60.0, env="HTTP_KEEPALIVE_EXPIRY_SECONDS")
+    http2_enabled: bool = Field(False, env="HTTP2_ENABLED")
+
+    # Local parser fast path: skip the external parser when the local
+    # confidence score (0-1) reaches this value; set above 1 to disable.
+    local_parser_confidence_threshold: float = Field(
+        0.9, env="LOCAL_PARSER_CONFIDENCE_THRESHOLD"
+    )
+
+    # Caches: set CACHE_REDIS_URL to share entries across instances
+    # (needs the optional `redis` package); otherwise an in-process LRU is used.
+    cache_redis_url: Optional[str] = Field(default=None, env="CACHE_REDIS_URL")
+    parse_cache_enabled: bool = Field(True, env="PARSE_CACHE_ENABLED")
+    parse_cache_max_entries: int = Field(2048, env="PARSE_CACHE_MAX_ENTRIES")
+    parse_cache_ttl_seconds: int = Field(7 * 24 * 3600, env="PARSE_CACHE_TTL_SECONDS")
+    # Authenticated user lookups; keep the TTL short since writes from other
+    # instances only invalidate a shared (Redis) cache.
+    user_cache_enabled: bool = Field(True, env="USER_CACHE_ENABLED")
+    user_cache_max_entries: int = Field(1024, env="USER_CACHE_MAX_ENTRIES")
+    user_cache_ttl_seconds: int = Field(30, env="USER_CACHE_TTL_SECONDS")
+    # Verified access-token claims, kept in-process until the token's `exp`.
+    jwt_cache_enabled: bool = Field(True, env="JWT_CACHE_ENABLED")
+    jwt_cache_max_entries: int = Field(4096, env="JWT_CACHE_MAX_ENTRIES")
+
     # Currency defaults
     default_currency: str = Field("USD", env="DEFAULT_CURRENCY")
 
@@ -42,6 +91,9 @@ class Settings(BaseSettings):
 
     # Migrations
     auto_migrate: bool = Field(False, env="AUTO_MIGRATE")
+    # The API Lambda skips schema setup on import. Set this to run it on each
+    # container's first request instead of invoking {"action": "initDb"} per deploy.
+    db_init_on_cold_start: bool = Field(False, env="DB_INIT_ON_COLD_START")
 
     class Config:
         env_file = BASE_DIR / ".env"
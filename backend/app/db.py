@@ -1,23 +0,0 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.core.config import settings
-
-# Central SQLAlchemy setup used across the app.
-engine = create_engine(settings.database_url, echo=settings.debug, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
-
-
-def get_db():
-    """
-    Provide a request-scoped DB session.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-__all__ = ["SessionLocal", "engine", "get_db"]
-
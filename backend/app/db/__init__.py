@@ -1,3 +1,23 @@
-from app.db.session import SessionLocal, engine, get_db
+from app.db.session import (
+    SessionLocal,
+    close_async_engine,
+    db_pool_stats,
+    engine,
+    get_async_db,
+    get_async_engine,
+    get_db,
+)
 
-__all__ = ["SessionLocal", "engine", "get_db"]
+# Registers the Session hooks that keep daily_expense_rollups in step with
+# expense writes, so every process that opens a session has them.
+from app.services import rollups as _rollups  # noqa: E402,F401
+
+__all__ = [
+    "SessionLocal",
+    "close_async_engine",
+    "db_pool_stats",
+    "engine",
+    "get_async_db",
+    "get_async_engine",
+    "get_db",
+]
@@ -0,0 +1,17 @@
+from typing import Callable
+
+from sqlalchemy.sql.expression import Insert
+
+
+def upsert_insert(dialect: str) -> Callable[..., Insert]:
+    """
+    Return the dialect's `insert` construct, which supports
+    on_conflict_do_update (Postgres and SQLite are the supported databases).
+    """
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"upserts are not supported on {dialect}")
+    return insert
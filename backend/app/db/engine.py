@@ -0,0 +1,233 @@
+"""
+The one place that builds the SQLAlchemy engine.
+
+Pooling depends on where the code runs (DB_POOL_MODE):
+
+- "lambda": a pool of one persistent connection per container, plus one
+  short-lived overflow connection. Concurrent containers never hold more than
+  one idle connection each.
+- "queue": a QueuePool sized by DB_POOL_SIZE / DB_MAX_OVERFLOW for a
+  long-running API server.
+- "null": no pooling, every session opens its own connection. Use this
+  behind an RDS Proxy when the proxy should own all pooling.
+- "auto" (the default): "lambda" when AWS_LAMBDA_FUNCTION_NAME is set,
+  otherwise "queue".
+
+DB_PROXY_HOST swaps the host in DATABASE_URL for an RDS Proxy endpoint.
+Connections are pre-pinged, since a frozen Lambda or a stopped dev database
+leaves them stale.
+
+build_async_engine() applies the same rules to the AsyncEngine behind the
+async route dependency, swapping the driver for asyncpg / aiosqlite.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    # Imported lazily: the SQS and cron handlers never build an async engine.
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = {"auto", "lambda", "queue", "null"}
+
+
+def running_on_lambda() -> bool:
+    return bool(os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+
+
+def resolve_pool_mode(mode: Optional[str] = None) -> str:
+    mode = (mode or settings.db_pool_mode).strip().lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE must be one of {sorted(POOL_MODES)}, got {mode!r}")
+    if mode == "auto":
+        return "lambda" if running_on_lambda() else "queue"
+    return mode
+
+
+class PoolMetrics:
+    """
+    Counters for one engine's pool. `checkout_wait` is the time spent getting a
+    connection from the pool, including opening a new one when the pool has to.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "checkout_wait_ms_avg": self.wait_seconds_total / waits * 1000 if waits else 0.0,
+                "checkout_wait_ms_max": self.wait_seconds_max * 1000,
+            }
+
+
+def _timed_pool(pool_cls: type, metrics: PoolMetrics) -> type:
+    """Subclass `pool_cls` so every checkout records how long it waited."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return pool_cls._do_get(self)
+        except exc.TimeoutError:
+            metrics.incr("timeouts")
+            raise
+        finally:
+            metrics.record_wait(time.perf_counter() - start)
+
+    # Pool.recreate() reuses type(self), so the instrumentation survives a dispose().
+    return type(pool_cls.__name__, (pool_cls,), {"_do_get": _do_get})
+
+
+def _attach_metrics(pool: Pool, metrics: PoolMetrics) -> None:
+    event.listen(pool, "connect", lambda *_: metrics.incr("connects"))
+    event.listen(pool, "checkout", lambda *_: metrics.incr("checkouts"))
+    event.listen(pool, "checkin", lambda *_: metrics.incr("checkins"))
+    event.listen(pool, "invalidate", lambda *_: metrics.incr("invalidations"))
+
+
+def _engine_kwargs(url: URL, mode: str, metrics: PoolMetrics, is_async: bool = False):
+    kwargs: Dict[str, Any] = {"echo": settings.debug, "future": True}
+
+    if url.get_backend_name() == "sqlite":
+        # SQLite keeps its dialect's pool: per-file or per-thread for pysqlite, and
+        # NullPool for aiosqlite file databases, whose connections are non-daemon
+        # threads that would block interpreter exit if a pooled one were abandoned.
+        pool_cls = NullPool if mode == "null" else url.get_dialect().get_pool_class(url)
+        kwargs["poolclass"] = _timed_pool(pool_cls, metrics)
+        if issubclass(pool_cls, QueuePool):
+            kwargs["pool_timeout"] = settings.db_pool_timeout_seconds
+        return url, kwargs
+
+    if settings.db_proxy_host:
+        url = url.set(host=settings.db_proxy_host)
+    if url.get_backend_name() == "postgresql":
+        timeout_arg = "timeout" if is_async else "connect_timeout"
+        kwargs["connect_args"] = {timeout_arg: settings.db_connect_timeout_seconds}
+    kwargs["pool_pre_ping"] = True
+    if mode == "null":
+        kwargs["poolclass"] = _timed_pool(NullPool, metrics)
+    else:
+        queue_cls = AsyncAdaptedQueuePool if is_async else QueuePool
+        kwargs["poolclass"] = _timed_pool(queue_cls, metrics)
+        kwargs["pool_size"] = 1 if mode == "lambda" else settings.db_pool_size
+        kwargs["max_overflow"] = 1 if mode == "lambda" else settings.db_max_overflow
+        kwargs["pool_timeout"] = settings.db_pool_timeout_seconds
+        kwargs["pool_recycle"] = settings.db_pool_recycle_seconds
+    return url, kwargs
+
+
+def _instrument(engine: Engine, mode: str, metrics: PoolMetrics) -> None:
+    _attach_metrics(engine.pool, metrics)
+    engine.pool_metrics = metrics
+    engine.pool_mode = mode
+
+
+def build_engine(database_url: Optional[str] = None, pool_mode: Optional[str] = None) -> Engine:
+    """Create an engine with runtime-appropriate pooling; metrics live on `engine.pool_metrics`."""
+    mode = resolve_pool_mode(pool_mode)
+    metrics = PoolMetrics()
+    url, kwargs = _engine_kwargs(make_url(database_url or settings.database_url), mode, metrics)
+    engine = create_engine(url, **kwargs)
+    _instrument(engine, mode, metrics)
+    return engine
+
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_url(database_url: str) -> URL:
+    """DATABASE_URL with its driver swapped for the asyncio one (asyncpg / aiosqlite)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} URLs")
+    return url.set(drivername=_ASYNC_DRIVERS[backend])
+
+
+def build_async_engine(
+    database_url: Optional[str] = None, pool_mode: Optional[str] = None
+) -> AsyncEngine:
+    """
+    AsyncEngine counterpart of build_engine. ASYNC_DATABASE_URL is used as-is
+    when set; otherwise DATABASE_URL gets the async driver.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    mode = resolve_pool_mode(pool_mode)
+    metrics = PoolMetrics()
+    if database_url is None and settings.async_database_url:
+        url = make_url(settings.async_database_url)
+    else:
+        url = async_url(database_url or settings.database_url)
+    url, kwargs = _engine_kwargs(url, mode, metrics, is_async=True)
+    engine = create_async_engine(url, **kwargs)
+    _instrument(engine.sync_engine, mode, metrics)
+    return engine
+
+
+def warm_up(engine: Engine) -> bool:
+    """
+    Open (and return to the pool) one connection so the first request does not
+    pay for the TCP/TLS/auth handshake. Failures are logged, not raised: the
+    database may be asleep, and the request path will retry anyway.
+    """
+    start = time.perf_counter()
+    try:
+        with engine.connect():
+            pass
+    except Exception as error:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.warning("Database warm-up failed after %.0f ms: %s", elapsed_ms, error)
+        return False
+    logger.info("Database warm-up took %.0f ms", (time.perf_counter() - start) * 1000)
+    return True
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """Pool counters plus current occupancy, for the admin stats endpoint and logs."""
+    engine = getattr(engine, "sync_engine", engine)
+    stats: Dict[str, Any] = {"mode": engine.pool_mode, "pool": type(engine.pool).__name__}
+    stats.update(engine.pool_metrics.as_dict())
+    if isinstance(engine.pool, QueuePool):
+        stats.update(
+            size=engine.pool.size(),
+            checked_out=engine.pool.checkedout(),
+            overflow=max(engine.pool.overflow(), 0),
+            idle=engine.pool.checkedin(),
+        )
+    return stats
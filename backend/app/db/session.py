@@ -1,13 +1,29 @@
-from sqlalchemy import create_engine
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Set
+
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.engine import build_async_engine, build_engine, pool_stats, running_on_lambda, warm_up
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
-echo = settings.debug
-engine = create_engine(settings.database_url, echo=echo, future=True)
+engine = build_engine(pool_mode=settings.db_sync_pool_mode)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+# Warming a NullPool engine would just open and close a connection.
+if settings.db_warm_up and running_on_lambda() and engine.pool_mode != "null":
+    warm_up(engine)
+
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+# Disposals of engines replaced on a loop change, awaited by close_async_engine().
+_pending_disposals: Set[asyncio.Future] = set()
+
 
 def get_db():
     db = SessionLocal()
@@ -15,3 +31,71 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Return the process-wide AsyncEngine. Pooled async connections belong to
+    the event loop that opened them, so a call from a different loop (a new
+    TestClient, a script's asyncio.run) builds a fresh engine and disposes
+    the one it replaces.
+    """
+    global _async_engine, _async_engine_loop, _async_sessionmaker
+    loop = asyncio.get_running_loop()
+    if _async_engine is None or _async_engine_loop is not loop:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        if _async_engine is not None:
+            _dispose_replaced(_async_engine, _async_engine_loop)
+
+        _async_engine = build_async_engine()
+        _async_engine_loop = loop
+        # expire_on_commit=False: an expired attribute would need a lazy load,
+        # which AsyncSession cannot do implicitly.
+        _async_sessionmaker = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+def _dispose_replaced(old: AsyncEngine, old_loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Dispose an engine built on another loop, on that loop while it still runs
+    (another thread), otherwise here. Connections that can no longer be
+    closed cleanly are logged and dropped by the pool.
+    """
+    if old_loop.is_running():
+        future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(old.dispose(), old_loop))
+    else:
+        future = asyncio.ensure_future(old.dispose())
+    _pending_disposals.add(future)
+    future.add_done_callback(_pending_disposals.discard)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    db = _async_sessionmaker()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def close_async_engine() -> None:
+    global _async_engine, _async_engine_loop, _async_sessionmaker
+    loop = asyncio.get_running_loop()
+    pending = [future for future in _pending_disposals if future.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    if _async_engine is not None and _async_engine_loop is loop:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_engine_loop = None
+    _async_sessionmaker = None
+
+
+def db_pool_stats() -> dict:
+    stats = {"sync": pool_stats(engine)}
+    if _async_engine is not None:
+        stats["async"] = pool_stats(_async_engine)
+    return stats
@@ -1,39 +1,26 @@
-import json
-import logging
-import os
-
-import boto3
-from botocore.config import Config
 from mangum import Mangum
 
-from app.main import app
-
+from app.core.config import settings
+from app.main import app, init_db
+from app.services.activity import signal_activity
 
-logger = logging.getLogger(__name__)
-
-_mangum_handler = Mangum(app)
-_lambda_client = boto3.client(
-    "lambda",
-    config=Config(connect_timeout=1, read_timeout=2, retries={"max_attempts": 0}),
-)
-_env_manager_function_name = os.getenv("ENV_MANAGER_FUNCTION_NAME")
-_enable_auto_sleep = os.getenv("ENABLE_AUTO_SLEEP", "false").strip().lower() in {
-    "1",
-    "true",
-    "yes",
-    "on",
-}
+# Lifespan is off so the shared HTTP client is not closed after every
+# invocation; it lives as long as the warm container. That also skips the
+# lifespan's init_db(): the schema is set up by invoking this function with
+# {"action": "initDb"} once per deploy, or on the first request when
+# DB_INIT_ON_COLD_START is set.
+_mangum_handler = Mangum(app, lifespan="off")
+_db_initialized = not settings.db_init_on_cold_start
 
 
 def lambda_handler(event, context):
-    if _enable_auto_sleep and _env_manager_function_name:
-        try:
-            _lambda_client.invoke(
-                FunctionName=_env_manager_function_name,
-                InvocationType="Event",
-                Payload=json.dumps({"action": "wakeOnDemand"}),
-            )
-        except Exception as exc:  # pragma: no cover - best-effort
-            logger.warning("Failed to invoke env manager from API: %s", exc)
-
+    global _db_initialized
+    if event.get("action") == "initDb":
+        init_db()
+        return {"status": "ok"}
+    if not _db_initialized:
+        init_db()
+        _db_initialized = True
+
+    signal_activity("API")
     return _mangum_handler(event, context)
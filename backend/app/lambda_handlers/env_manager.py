@@ -1,18 +1,15 @@
 import json
 import logging
 import os
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-import boto3
+from app.services.aws import get_client
 
 
 logger = logging.getLogger(__name__)
 
-rds = boto3.client("rds")
-lambda_client = boto3.client("lambda")
-ssm = boto3.client("ssm")
-
 
 DB_INSTANCE_IDENTIFIER = os.getenv("DB_INSTANCE_IDENTIFIER")
 INBOUND_MAPPING_UUID = os.getenv("INBOUND_MAPPING_UUID")
@@ -20,10 +17,39 @@ OUTBOUND_MAPPING_UUID = os.getenv("OUTBOUND_MAPPING_UUID")
 ENV_STATE_SSM_PARAMETER_NAME = os.getenv("ENV_STATE_SSM_PARAMETER_NAME")
 ENABLE_AUTO_SLEEP = os.getenv("ENABLE_AUTO_SLEEP", "false").lower() == "true"
 IDLE_MINUTES_THRESHOLD = int(os.getenv("IDLE_MINUTES_THRESHOLD", "30"))
+# Wake-up polling: each pollWake invocation checks the DB with exponential
+# backoff for up to WAKE_POLL_BUDGET_SECONDS, then re-invokes itself.
+WAKE_POLL_BUDGET_SECONDS = float(os.getenv("WAKE_POLL_BUDGET_SECONDS", "120"))
+WAKE_POLL_INITIAL_DELAY_SECONDS = float(os.getenv("WAKE_POLL_INITIAL_DELAY_SECONDS", "5"))
+WAKE_POLL_MAX_DELAY_SECONDS = float(os.getenv("WAKE_POLL_MAX_DELAY_SECONDS", "30"))
+WAKE_TIMEOUT_MINUTES = int(os.getenv("WAKE_TIMEOUT_MINUTES", "20"))
+# Stop polling this long before the invocation itself would time out.
+_INVOCATION_MARGIN_SECONDS = 10
+# wakeOnDemand on an awake environment is a heartbeat: lastActivityAt is
+# rewritten at most this often, so signals from many containers cost one
+# SSM write per interval.
+ACTIVITY_WRITE_INTERVAL_SECONDS = float(os.getenv("ACTIVITY_WRITE_INTERVAL_SECONDS", "60"))
+_WAKE_PROGRESS_KEYS = ("wakeStartedAt", "wakePollAttempts", "wakeLastPolledAt", "dbStatus")
+
+
+def _rds():
+    return get_client("rds")
+
+
+def _ssm():
+    return get_client("ssm")
+
+
+def _lambda_client():
+    return get_client("lambda")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    return _now().isoformat()
 
 
 def _default_state() -> Dict[str, Any]:
@@ -40,10 +66,10 @@ def _load_state() -> Dict[str, Any]:
         return _default_state()
 
     try:
-        resp = ssm.get_parameter(Name=ENV_STATE_SSM_PARAMETER_NAME)
+        resp = _ssm().get_parameter(Name=ENV_STATE_SSM_PARAMETER_NAME)
         value = resp.get("Parameter", {}).get("Value") or "{}"
         state = json.loads(value)
-    except ssm.exceptions.ParameterNotFound:
+    except _ssm().exceptions.ParameterNotFound:
         state = _default_state()
         _save_state(state)
     except Exception as exc:  # pragma: no cover - defensive logging
@@ -56,7 +82,7 @@ def _save_state(state: Dict[str, Any]) -> None:
     if not ENV_STATE_SSM_PARAMETER_NAME:
         return
     try:
-        ssm.put_parameter(
+        _ssm().put_parameter(
             Name=ENV_STATE_SSM_PARAMETER_NAME,
             Type="String",
             Value=json.dumps(state),
@@ -79,32 +105,36 @@ def _minutes_since(ts: str | None) -> float:
     dt = _parse_iso(ts)
     if not dt:
         return 0.0
-    delta = datetime.now(timezone.utc) - dt
+    delta = _now() - dt
     return delta.total_seconds() / 60.0
 
 
-def _set_mappings_enabled(enabled: bool) -> None:
+def _set_mappings_enabled(enabled: bool) -> bool:
+    """Toggle the SQS event source mappings; False if any update failed."""
+    ok = True
     uuids = [INBOUND_MAPPING_UUID, OUTBOUND_MAPPING_UUID]
     for uuid in uuids:
         if not uuid:
             continue
         try:
-            lambda_client.update_event_source_mapping(UUID=uuid, Enabled=enabled)
+            _lambda_client().update_event_source_mapping(UUID=uuid, Enabled=enabled)
         except Exception as exc:  # pragma: no cover - defensive logging
+            ok = False
             logger.warning(
                 "Failed to update event source mapping %s (enabled=%s): %s",
                 uuid,
                 enabled,
                 exc,
             )
+    return ok
 
 
 def _stop_db() -> None:
     if not DB_INSTANCE_IDENTIFIER:
         return
     try:
-        rds.stop_db_instance(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER)
-    except rds.exceptions.InvalidDBInstanceStateFault:
+        _rds().stop_db_instance(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER)
+    except _rds().exceptions.InvalidDBInstanceStateFault:
         # Already stopped or stopping
         return
     except Exception as exc:  # pragma: no cover - defensive logging
@@ -115,37 +145,89 @@ def _start_db() -> None:
     if not DB_INSTANCE_IDENTIFIER:
         return
     try:
-        rds.start_db_instance(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER)
-    except rds.exceptions.InvalidDBInstanceStateFault:
+        _rds().start_db_instance(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER)
+    except _rds().exceptions.InvalidDBInstanceStateFault:
         # Already starting or available
         return
     except Exception as exc:  # pragma: no cover - defensive logging
         logger.warning("Failed to start DB instance %s: %s", DB_INSTANCE_IDENTIFIER, exc)
 
 
-def _wait_for_db_available(timeout_minutes: int = 15) -> None:
+def _db_status() -> Optional[str]:
+    """DBInstanceStatus of the managed instance, or None if it could not be read."""
     if not DB_INSTANCE_IDENTIFIER:
+        return "available"
+    try:
+        resp = _rds().describe_db_instances(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER)
+    except Exception as exc:  # pragma: no cover - defensive logging
+        logger.warning("Error while polling DB status: %s", exc)
+        return None
+    dbs = resp.get("DBInstances") or []
+    return dbs[0].get("DBInstanceStatus") if dbs else None
+
+
+def _poll_delay(attempt: int) -> float:
+    return min(WAKE_POLL_INITIAL_DELAY_SECONDS * 2**attempt, WAKE_POLL_MAX_DELAY_SECONDS)
+
+
+def _poll_budget_seconds(context) -> float:
+    budget = WAKE_POLL_BUDGET_SECONDS
+    if context is not None:
+        remaining = context.get_remaining_time_in_millis() / 1000
+        budget = min(budget, remaining - _INVOCATION_MARGIN_SECONDS)
+    return budget
+
+
+def _schedule_poll(context) -> None:
+    """Continue polling in a fresh asynchronous invocation of this function."""
+    function_name = getattr(context, "function_name", None) or os.getenv(
+        "AWS_LAMBDA_FUNCTION_NAME"
+    )
+    if not function_name:
         return
+    try:
+        _lambda_client().invoke(
+            FunctionName=function_name,
+            InvocationType="Event",
+            Payload=json.dumps({"action": "pollWake"}),
+        )
+    except Exception as exc:  # pragma: no cover - defensive logging
+        # The scheduled evaluateIdle keeps checking a waking environment.
+        logger.warning("Failed to schedule wake polling: %s", exc)
 
-    max_checks = max(int(timeout_minutes * 2), 1)
-    for _ in range(max_checks):
-        try:
-            resp = rds.describe_db_instances(DBInstanceIdentifier=DB_INSTANCE_IDENTIFIER)
-            dbs = resp.get("DBInstances") or []
-            if dbs and dbs[0].get("DBInstanceStatus") == "available":
-                return
-        except Exception as exc:  # pragma: no cover - defensive logging
-            logger.warning("Error while polling DB status: %s", exc)
-        # Use Lambda's built-in wait rather than time.sleep for clarity
-        lambda_client.get_waiter  # no-op to avoid unused reference lint
-    # If we exit the loop, we timed out; workers will still be re-enabled by
-    # a later wake call once the DB is actually up.
+
+def _advance_wake(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One step of the wake state machine: check the DB once and, only when it
+    is available, re-enable the SQS mappings and mark the environment active.
+    A DB found stopped (the start request raced a stop still in progress) is
+    started again. Progress is saved to the SSM state either way.
+    """
+    status = _db_status()
+    if status == "available" and _set_mappings_enabled(True):
+        state["state"] = "active"
+        for key in _WAKE_PROGRESS_KEYS:
+            state.pop(key, None)
+        _save_state(state)
+        return state
+
+    if status == "stopped":
+        _start_db()
+    state["dbStatus"] = status
+    state["wakePollAttempts"] = state.get("wakePollAttempts", 0) + 1
+    state["wakeLastPolledAt"] = _now_iso()
+    _save_state(state)
+    return state
 
 
 def _handle_evaluate_idle(state: Dict[str, Any]) -> Dict[str, Any]:
     if not ENABLE_AUTO_SLEEP:
         return state
 
+    if state.get("state") == "waking":
+        # Safety net for a poll chain that failed to schedule or timed out.
+        return _advance_wake(state)
+
     if state.get("overrideAlwaysOn"):
         if state.get("state") != "active":
             state["state"] = "active"
@@ -167,8 +249,13 @@ def _handle_evaluate_idle(state: Dict[str, Any]) -> Dict[str, Any]:
     return state
 
 
-def _handle_wake_on_demand(state: Dict[str, Any]) -> Dict[str, Any]:
+def _handle_wake_on_demand(state: Dict[str, Any], context=None) -> Dict[str, Any]:
+    """
+    Start the DB and return right away; pollWake invocations (and, as a
+    fallback, evaluateIdle) finish the wake-up once the DB is available.
+    """
     now = _now_iso()
+    last_activity = state.get("lastActivityAt")
     state["lastActivityAt"] = now
 
     if state.get("overrideAlwaysOn"):
@@ -177,23 +264,49 @@ def _handle_wake_on_demand(state: Dict[str, Any]) -> Dict[str, Any]:
             _save_state(state)
         return state
 
-    if state.get("state") == "active":
-        _save_state(state)
-        return state
-
-    if state.get("state") == "waking":
-        _save_state(state)
+    if state.get("state") in ("active", "waking"):
+        if _parse_iso(last_activity) is None or (
+            _minutes_since(last_activity) * 60 >= ACTIVITY_WRITE_INTERVAL_SECONDS
+        ):
+            _save_state(state)
         return state
 
     state["state"] = "waking"
+    state["wakeStartedAt"] = now
+    state["wakePollAttempts"] = 0
     _save_state(state)
 
     _start_db()
-    _wait_for_db_available()
-    _set_mappings_enabled(True)
+    _schedule_poll(context)
+    return state
 
-    state["state"] = "active"
-    _save_state(state)
+
+def _handle_poll_wake(state: Dict[str, Any], context=None) -> Dict[str, Any]:
+    """
+    Poll the DB with exponential backoff for up to WAKE_POLL_BUDGET_SECONDS,
+    then hand over to a new invocation rather than holding this one for the
+    several minutes an RDS start takes. Gives up after WAKE_TIMEOUT_MINUTES.
+    """
+    deadline = time.monotonic() + _poll_budget_seconds(context)
+    while state.get("state") == "waking":
+        state = _advance_wake(state)
+        if state.get("state") != "waking":
+            break
+        if _minutes_since(state.get("wakeStartedAt")) >= WAKE_TIMEOUT_MINUTES:
+            logger.error(
+                "DB %s still %s after %s minutes; leaving the wake-up to evaluateIdle",
+                DB_INSTANCE_IDENTIFIER,
+                state.get("dbStatus"),
+                WAKE_TIMEOUT_MINUTES,
+            )
+            break
+        delay = _poll_delay(state["wakePollAttempts"] - 1)
+        if time.monotonic() + delay > deadline:
+            _schedule_poll(context)
+            break
+        time.sleep(delay)
+        # Reload so activity recorded by concurrent wake calls is not overwritten.
+        state = _load_state()
     return state
 
 
@@ -204,6 +317,7 @@ def lambda_handler(event, context):
     Expected event payloads:
     - {"action": "evaluateIdle"}
     - {"action": "wakeOnDemand"}
+    - {"action": "pollWake"} (sent by this function while the DB starts)
     """
 
     action = (event or {}).get("action") or ""
@@ -214,7 +328,9 @@ def lambda_handler(event, context):
     if action == "evaluateidle":
         state = _handle_evaluate_idle(state)
     elif action == "wakeondemand":
-        state = _handle_wake_on_demand(state)
+        state = _handle_wake_on_demand(state, context)
+    elif action == "pollwake":
+        state = _handle_poll_wake(state, context)
     else:
         logger.info("Unknown or missing action for env_manager: %s", action)
 
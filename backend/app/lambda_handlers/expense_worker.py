@@ -1,19 +1,36 @@
 import json
 import logging
+import os
 from datetime import date
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.db import SessionLocal
 from app.models import Expense, User
 from app.services.currency import resolve_currency
-from app.services.limits import daily_limit_for_user, has_reached_daily_limit
-from app.services.queue import enqueue_outbound_text
+from app.services.limits import daily_limit_for_user
+from app.services.quota import consume_daily_quota, consume_daily_quota_up_to
+from app.services.queue import QueueFlushError, batched_enqueue, enqueue_outbound_text
 
 logger = logging.getLogger(__name__)
 
+_batch_mode = os.getenv("EXPENSE_WORKER_BATCH_MODE", "true").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+
+_INVALID_AMOUNT_TEXT = (
+    "I couldn't find a valid amount in that message. Please include something like 'Lunch 12 USD'."
+)
+
+# (SQS messageId, wa_id, expense payload)
+PendingRecord = Tuple[str, str, Dict[str, Any]]
+
 
 def _parse_date(value: Any) -> date | None:
     if isinstance(value, date):
@@ -38,18 +55,28 @@ def _normalize_amount(value: Any) -> Decimal | None:
     return amount
 
 
-def _persist_expense(db: Session, wa_id: str, expense: Dict[str, Any]) -> Expense:
-    user = db.query(User).filter(User.whatsapp_id == wa_id).first()
-    if not user:
-        user = User(whatsapp_id=wa_id)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+def _limit_text(limit: int) -> str:
+    return (
+        f"You've reached your daily limit of {limit} expenses. "
+        "Try again tomorrow or upgrade for a higher limit."
+    )
 
-    amount = _normalize_amount(expense.get("amount"))
 
+def _confirmation_text(amount: Any, currency: str, merchant: Optional[str], expense_date: date) -> str:
+    return (
+        f"Recorded expense: {amount} {currency}"
+        f" for {merchant or 'your expense'} on {expense_date}."
+    )
+
+
+def _persist_expense(db: Session, user: User, expense: Dict[str, Any]) -> Tuple[Expense, str]:
+    """
+    Insert the expense and any default-currency change on the user in one commit.
+    Returns the record and its confirmation text, built before the commit expires it.
+    """
+    amount = _normalize_amount(expense.get("amount"))
     expense_date = _parse_date(expense.get("expense_date")) or date.today()
-    currency = resolve_currency(db, user, expense.get("currency"), wa_id)
+    currency = resolve_currency(user, expense.get("currency"), user.whatsapp_id)
 
     record = Expense(
         user_id=user.id,
@@ -60,58 +87,218 @@ def _persist_expense(db: Session, wa_id: str, expense: Dict[str, Any]) -> Expens
         notes=expense.get("notes"),
         expense_date=expense_date,
     )
+    confirmation = _confirmation_text(
+        amount.quantize(Decimal("0.01")), currency, record.merchant, expense_date
+    )
     db.add(record)
     db.commit()
-    db.refresh(record)
-    return record
+    return record, confirmation
 
 
-def _handle_record(db: Session, body: Dict[str, Any]):
+def _validate_record(body: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Return (wa_id, expense) for a persistable record, or None if it should be dropped.
+    Records without a usable amount get a hint sent back to the user.
+    """
     if body.get("type") != "expense":
         logger.warning("Unknown message type: %s", body.get("type"))
-        return
+        return None
 
     wa_id = body.get("wa_id")
     expense = body.get("expense") or {}
     if not wa_id:
         logger.warning("Missing wa_id; skipping message")
-        return
+        return None
 
     if _normalize_amount(expense.get("amount")) is None:
-        enqueue_outbound_text(
-            wa_id,
-            "I couldn't find a valid amount in that message. Please include something like 'Lunch 12 USD'.",
-        )
+        enqueue_outbound_text(wa_id, _INVALID_AMOUNT_TEXT)
+        return None
+
+    return wa_id, expense
+
+
+def _handle_record(db: Session, body: Dict[str, Any]):
+    validated = _validate_record(body)
+    if not validated:
         return
+    wa_id, expense = validated
 
     expense_date = _parse_date(expense.get("expense_date")) or date.today()
     user = db.query(User).filter(User.whatsapp_id == wa_id).first()
     if not user:
+        # Flush only; the user is committed together with the expense.
         user = User(whatsapp_id=wa_id)
         db.add(user)
-        db.commit()
-        db.refresh(user)
-    if has_reached_daily_limit(db, user, expense_date):
+        db.flush()
+    if not consume_daily_quota(db, user, expense_date):
         limit = daily_limit_for_user(user)
-        enqueue_outbound_text(
-            wa_id,
-            f"You've reached your daily limit of {limit} expenses. Try again tomorrow or upgrade for a higher limit.",
-        )
+        db.commit()
+        enqueue_outbound_text(wa_id, _limit_text(limit))
         return
 
-    record = _persist_expense(db, wa_id, expense)
-    confirmation = (
-        f"Recorded expense: {record.amount} {record.currency}"
-        f" for {record.merchant or 'your expense'} on {record.expense_date}."
-    )
+    _, confirmation = _persist_expense(db, user, expense)
     enqueue_outbound_text(wa_id, confirmation)
 
 
+def _load_users(db: Session, wa_ids: Iterable[str]) -> Dict[str, User]:
+    """
+    Fetch every user in the batch with one IN query and create the missing ones.
+    New users are flushed, not committed, so they land with the batch transaction.
+    """
+    wa_ids = set(wa_ids)
+    for attempt in range(2):
+        users = {
+            user.whatsapp_id: user
+            for user in db.query(User).filter(User.whatsapp_id.in_(wa_ids)).all()
+        }
+        missing = [User(whatsapp_id=wa_id) for wa_id in wa_ids if wa_id not in users]
+        if not missing:
+            return users
+        db.add_all(missing)
+        try:
+            db.flush()
+        except IntegrityError:
+            if attempt:
+                raise
+            # Another worker created some of these users concurrently; reload them.
+            db.rollback()
+            continue
+        users.update({user.whatsapp_id: user for user in missing})
+        return users
+    return users
+
+
+def _persist_batch(db: Session, pending: List[PendingRecord]) -> List[Tuple[str, str]]:
+    """
+    Reserve quota and insert every accepted expense in a single transaction.
+    Returns the (wa_id, text) replies to send once the commit has succeeded.
+    """
+    users = _load_users(db, (wa_id for _, wa_id, _ in pending))
+    dated = [
+        (users[wa_id], expense, _parse_date(expense.get("expense_date")) or date.today())
+        for _, wa_id, expense in pending
+    ]
+
+    # One atomic quota reservation per (user, day) for all of its records.
+    requested: Dict[Tuple[Any, date], int] = {}
+    for user, _, expense_date in dated:
+        requested[(user.id, expense_date)] = requested.get((user.id, expense_date), 0) + 1
+    granted: Dict[Tuple[Any, date], int] = {}
+    for user, _, expense_date in dated:
+        key = (user.id, expense_date)
+        if key not in granted:
+            granted[key] = consume_daily_quota_up_to(db, user, expense_date, requested[key])
+
+    replies: List[Tuple[str, str]] = []
+    records: List[Expense] = []
+    for user, expense, expense_date in dated:
+        key = (user.id, expense_date)
+        if not granted[key]:
+            replies.append((user.whatsapp_id, _limit_text(daily_limit_for_user(user))))
+            continue
+        granted[key] -= 1
+
+        amount = _normalize_amount(expense.get("amount"))
+        currency = resolve_currency(user, expense.get("currency"), user.whatsapp_id)
+        records.append(
+            Expense(
+                user_id=user.id,
+                amount=amount,
+                currency=currency,
+                category=expense.get("category"),
+                merchant=expense.get("merchant"),
+                notes=expense.get("notes"),
+                expense_date=expense_date,
+            )
+        )
+        replies.append(
+            (
+                user.whatsapp_id,
+                _confirmation_text(
+                    amount.quantize(Decimal("0.01")),
+                    currency,
+                    expense.get("merchant"),
+                    expense_date,
+                ),
+            )
+        )
+
+    db.add_all(records)
+    db.commit()
+    return replies
+
+
+def _process_batch(db: Session, records: List[Dict[str, Any]]) -> List[str]:
+    """Process an SQS batch and return the messageIds that should be retried."""
+    failures: List[str] = []
+    pending: List[PendingRecord] = []
+    for record in records:
+        message_id = record.get("messageId")
+        try:
+            body = json.loads(record.get("body", "{}"))
+            validated = _validate_record(body)
+        except Exception:
+            logger.exception("Failed to read SQS record %s", message_id)
+            failures.append(message_id)
+            continue
+        if validated:
+            pending.append((message_id, *validated))
+
+    if not pending:
+        return failures
+
+    try:
+        replies = _persist_batch(db, pending)
+    except Exception:
+        logger.exception("Batch insert failed; retrying %s records one by one", len(pending))
+        db.rollback()
+        return failures + _process_individually(db, pending)
+
+    for wa_id, text in replies:
+        enqueue_outbound_text(wa_id, text)
+    return failures
+
+
+def _process_individually(db: Session, pending: List[PendingRecord]) -> List[str]:
+    failures: List[str] = []
+    for message_id, wa_id, expense in pending:
+        try:
+            _handle_record(db, {"type": "expense", "wa_id": wa_id, "expense": expense})
+        except Exception:
+            logger.exception("Failed to process SQS record %s", message_id)
+            db.rollback()
+            failures.append(message_id)
+    return failures
+
+
 def lambda_handler(event, context):
+    """
+    SQS consumer for parsed expenses.
+
+    Returns a partial batch response so only failed records are redelivered;
+    the event source mapping must enable ReportBatchItemFailures.
+    """
+    records = event.get("Records", [])
     db = SessionLocal()
     try:
-        for record in event.get("Records", []):
-            body = json.loads(record.get("body", "{}"))
-            _handle_record(db, body)
+        with batched_enqueue():
+            if _batch_mode:
+                failures = _process_batch(db, records)
+            else:
+                failures = []
+                for record in records:
+                    try:
+                        _handle_record(db, json.loads(record.get("body", "{}")))
+                    except Exception:
+                        logger.exception(
+                            "Failed to process SQS record %s", record.get("messageId")
+                        )
+                        db.rollback()
+                        failures.append(record.get("messageId"))
+    except QueueFlushError:
+        # Expenses are already committed; retrying the records would duplicate them.
+        logger.exception("Failed to enqueue some replies")
     finally:
         db.close()
+
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
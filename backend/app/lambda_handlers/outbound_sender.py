@@ -1,27 +1,86 @@
 import asyncio
 import json
 import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.services.http_client import run_sync
 from app.services.whatsapp import whatsapp_service
 
 logger = logging.getLogger(__name__)
 
+_max_concurrency = max(int(os.getenv("OUTBOUND_MAX_CONCURRENCY", "10")), 1)
+# Send budget for this container only; 0 disables throttling. Concurrent
+# containers each send at this rate, so the deployment divides the global
+# budget by the sender's maximum concurrency (see deploy/aws/terraform).
+_requests_per_second = float(os.getenv("OUTBOUND_REQUESTS_PER_SECOND", "50"))
 
-def _handle_message(body):
+
+class _RateLimiter:
+    """Spaces request start times so this container never exceeds `rate` sends per second."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _validate_message(body: Dict[str, Any]) -> Optional[Tuple[str, str]]:
     if body.get("type") != "send_text":
         logger.warning("Unsupported outbound message type: %s", body.get("type"))
-        return
+        return None
 
     wa_id = body.get("wa_id")
     text = body.get("text")
     if not wa_id or not text:
         logger.warning("Missing wa_id or text for outbound message")
-        return
+        return None
+    return wa_id, text
 
-    asyncio.run(whatsapp_service.send_text_message(wa_id, text))
+
+async def _send_batch(records: List[Dict[str, Any]]) -> List[str]:
+    """Send every record concurrently and return the messageIds worth retrying."""
+    semaphore = asyncio.Semaphore(_max_concurrency)
+    limiter = _RateLimiter(_requests_per_second)
+
+    async def send(record: Dict[str, Any]) -> Optional[str]:
+        message_id = record.get("messageId")
+        try:
+            message = _validate_message(json.loads(record.get("body", "{}")))
+            if not message:
+                return None
+            async with semaphore:
+                await limiter.acquire()
+                result = await whatsapp_service.send_text_message(*message, raise_retryable=True)
+        except Exception:
+            logger.exception("Failed to send outbound message %s", message_id)
+            return message_id
+        if result is None:
+            # A 4xx other than 429 (bad recipient, expired token) fails the same
+            # way on every retry, and the queue has no DLQ; acknowledge it.
+            logger.error("Dropping outbound message %s rejected by the Graph API", message_id)
+        return None
+
+    results = await asyncio.gather(*(send(record) for record in records))
+    return [message_id for message_id in results if message_id]
 
 
 def lambda_handler(event, context):
-    for record in event.get("Records", []):
-        body = json.loads(record.get("body", "{}"))
-        _handle_message(body)
+    """
+    SQS consumer for outbound WhatsApp messages.
+
+    The whole batch runs on one event loop sharing one connection pool; only
+    transient failures (network, 5xx, 429) are reported back for retry via
+    batchItemFailures.
+    """
+    failures = run_sync(_send_batch(event.get("Records", [])))
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
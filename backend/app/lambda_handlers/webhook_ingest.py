@@ -5,33 +5,26 @@ import logging
 import os
 from datetime import date, datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
-
-import boto3
-from botocore.config import Config
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.config import settings
-from app.services.queue import enqueue_inbound, enqueue_outbound_text
-from app.services.text_parser import parse_expense_text
+from app.services.activity import signal_activity
+from app.services.http_client import run_sync
+from app.services.queue import batched_enqueue, enqueue_inbound, enqueue_outbound_text
+from app.services.text_parser import parse_expense_text, parse_expense_text_local
 from app.services.whatsapp import whatsapp_service
 
 logger = logging.getLogger(__name__)
 
-_lambda_client = boto3.client(
-    "lambda",
-    config=Config(connect_timeout=1, read_timeout=2, retries={"max_attempts": 0}),
-)
-_env_manager_function_name = os.getenv("ENV_MANAGER_FUNCTION_NAME")
-_enable_auto_sleep = os.getenv("ENABLE_AUTO_SLEEP", "false").strip().lower() in {
-    "1",
-    "true",
-    "yes",
-    "on",
-}
+_parse_concurrency = max(int(os.getenv("WEBHOOK_PARSE_CONCURRENCY", "8")), 1)
+_parse_budget_seconds = float(os.getenv("WEBHOOK_PARSE_BUDGET_SECONDS", "8"))
+
+# (wa_id, message text, reference date)
+TextMessage = Tuple[str, str, Optional[date]]
 
 
 def _run_async(coro):
-    return asyncio.run(coro)
+    return run_sync(coro)
 
 
 def _extract_text_body(message: Dict[str, Any]) -> str:
@@ -72,13 +65,24 @@ def _handle_webhook_payload(
             return {"statusCode": 403, "body": json.dumps({"error": "Bad signature"})}
 
     entries: List[Dict[str, Any]] = payload.get("entry", [])
-    for entry in entries:
-        for change in entry.get("changes", []):
-            value = change.get("value", {})
-            messages = value.get("messages", [])
-            contacts = value.get("contacts", [])
-            for message in messages:
-                _handle_message(message, contacts)
+    # One SendMessageBatch per 10 messages instead of one SQS call per message.
+    with batched_enqueue():
+        texts: List[TextMessage] = []
+        for entry in entries:
+            for change in entry.get("changes", []):
+                value = change.get("value", {})
+                messages = value.get("messages", [])
+                contacts = value.get("contacts", [])
+                for message in messages:
+                    text = _handle_message(message, contacts)
+                    if text:
+                        texts.append(text)
+
+        if texts:
+            parsed_all = _run_async(_parse_all(texts))
+            for (wa_id, body, reference_date), parsed in zip(texts, parsed_all):
+                normalized = _normalize_parsed(parsed, body, reference_date)
+                enqueue_inbound({"type": "expense", "wa_id": wa_id, "expense": normalized})
 
     return {"statusCode": 200, "body": json.dumps({"status": "received"})}
 
@@ -93,27 +97,63 @@ def _message_reference_date(message: Dict[str, Any]) -> Optional[date]:
         return None
 
 
-def _handle_message(message: Dict[str, Any], contacts: List[Dict[str, Any]]):
+def _handle_message(
+    message: Dict[str, Any], contacts: List[Dict[str, Any]]
+) -> Optional[TextMessage]:
+    """Reply to non-text messages directly; return text messages for batch parsing."""
     msg_type = message.get("type")
     wa_id = message.get("from") or (contacts[0].get("wa_id") if contacts else None)
 
     if not wa_id:
         logger.warning("No wa_id found in message; skipping. Message: %s", message)
-        return
+        return None
 
     if msg_type != "text":
         enqueue_outbound_text(
             wa_id, "Thanks! Image and other message types will be supported soon."
         )
-        return
+        return None
 
-    body = _extract_text_body(message)
-    reference_date = _message_reference_date(message)
-    parsed = _run_async(parse_expense_text(body, reference_date=reference_date))
-    normalized = _normalize_parsed(parsed, body, reference_date)
+    return wa_id, _extract_text_body(message), _message_reference_date(message)
+
+
+async def _parse_all(texts: List[TextMessage]) -> List[Dict[str, Any]]:
+    """
+    Parse every text in the delivery concurrently on one loop.
+
+    At most `_parse_concurrency` external parser calls run at once, and the
+    whole step is capped at `_parse_budget_seconds` so Meta gets a fast 200;
+    anything unfinished (or failed) falls back to the local parser.
+    """
+    semaphore = asyncio.Semaphore(_parse_concurrency)
+
+    async def parse(body: str, reference_date: Optional[date]) -> Dict[str, Any]:
+        async with semaphore:
+            return await parse_expense_text(body, reference_date=reference_date)
+
+    tasks = [
+        asyncio.ensure_future(parse(body, reference_date)) for _, body, reference_date in texts
+    ]
+    _, pending = await asyncio.wait(tasks, timeout=_parse_budget_seconds)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(
+            "Parse budget of %ss exceeded; %s message(s) fall back to the local parser",
+            _parse_budget_seconds,
+            len(pending),
+        )
+        await asyncio.gather(*pending, return_exceptions=True)
 
-    payload = {"type": "expense", "wa_id": wa_id, "expense": normalized}
-    enqueue_inbound(payload)
+    results: List[Dict[str, Any]] = []
+    for task, (_, body, reference_date) in zip(tasks, texts):
+        if task.cancelled() or task.exception() is not None:
+            if not task.cancelled():
+                logger.error("Failed to parse message: %s", task.exception())
+            results.append(parse_expense_text_local(body, reference_date=reference_date))
+        else:
+            results.append(task.result())
+    return results
 
 
 def _verify_webhook(query: Dict[str, str]) -> Dict[str, Any]:
@@ -135,15 +175,7 @@ def _verify_webhook(query: Dict[str, str]) -> Dict[str, Any]:
 
 
 def lambda_handler(event, context):
-    if _enable_auto_sleep and _env_manager_function_name:
-        try:
-            _lambda_client.invoke(
-                FunctionName=_env_manager_function_name,
-                InvocationType="Event",
-                Payload=json.dumps({"action": "wakeOnDemand"}),
-            )
-        except Exception as exc:  # pragma: no cover - best-effort
-            logger.warning("Failed to invoke env manager from webhook: %s", exc)
+    signal_activity("webhook")
 
     request_context = event.get("requestContext", {})
     method = request_context.get("http", {}).get("method")
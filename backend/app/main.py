@@ -1,4 +1,5 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,8 +10,9 @@ from app.api.routes.expenses import router as expenses_router
 from app.api.routes.profile import router as profile_router
 from app.api.webhook import router as webhook_router
 from app.core.config import settings
-from app.db import engine
+from app.db import close_async_engine, engine
 from app.models import Base
+from app.services.http_client import close_http_client, get_http_client
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO)
@@ -27,13 +29,30 @@ def _run_migrations() -> None:
     command.upgrade(alembic_cfg, "head")
 
 
-if settings.auto_migrate:
-    _run_migrations()
-else:
-    # Create tables for demo purposes (use migrations in production)
-    Base.metadata.create_all(bind=engine)
+def init_db() -> None:
+    """
+    Bring the schema up to date. Runs at server startup, not at import, so the
+    Lambda handlers do not pay for DDL on every cold start (see
+    app.lambda_handlers.api for how the API Lambda runs it).
+    """
+    if settings.auto_migrate:
+        _run_migrations()
+    else:
+        # Create tables for demo purposes (use migrations in production)
+        Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.app_name, debug=settings.debug)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    # Open the shared outbound HTTP client on the server loop; close it on shutdown.
+    get_http_client()
+    yield
+    await close_http_client()
+    await close_async_engine()
+
+
+app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
 
 # Permissive CORS for local dev; tighten for production.
 app.add_middleware(
@@ -1,8 +1,20 @@
 from app.models.base import Base, TimestampMixin
+from app.models.daily_expense_quota import DailyExpenseQuota
+from app.models.daily_expense_rollup import DailyExpenseRollup
 from app.models.expense import Expense
 from app.models.login_token import LoginToken
 from app.models.refresh_token import RefreshToken
 from app.models.receipt import Receipt
 from app.models.user import User
 
-__all__ = ["Base", "TimestampMixin", "User", "Expense", "Receipt", "LoginToken", "RefreshToken"]
+__all__ = [
+    "Base",
+    "TimestampMixin",
+    "User",
+    "Expense",
+    "DailyExpenseRollup",
+    "DailyExpenseQuota",
+    "Receipt",
+    "LoginToken",
+    "RefreshToken",
+]
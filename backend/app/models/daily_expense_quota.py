@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class DailyExpenseQuota(Base):
+    """Expenses accepted from messages per user and expense date (see app.services.quota)."""
+
+    __tablename__ = "daily_expense_quotas"
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    quota_date = Column(Date, primary_key=True)
+    used = Column(Integer, nullable=False, default=0)
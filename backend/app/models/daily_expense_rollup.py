@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, Numeric, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.models.base import Base
+
+
+class DailyExpenseRollup(Base):
+    """
+    Per-user daily totals, kept in step with `expenses` by app.services.rollups.
+    Uncategorized expenses use category "" since key columns cannot be NULL.
+    """
+
+    __tablename__ = "daily_expense_rollups"
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    expense_date = Column(Date, primary_key=True)
+    currency = Column(String, primary_key=True)
+    category = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+    sum_amount = Column(Numeric(scale=2), nullable=False, default=0)
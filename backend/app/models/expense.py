@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Date, ForeignKey, Numeric, String, Text
+from sqlalchemy import Column, Date, ForeignKey, Index, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -8,6 +8,16 @@ from app.models.base import Base, TimestampMixin
 
 class Expense(Base, TimestampMixin):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Backs keyset pagination over (expense_date, created_at, id) per user.
+        Index(
+            "ix_expenses_user_date_created_id",
+            "user_id",
+            "expense_date",
+            "created_at",
+            "id",
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
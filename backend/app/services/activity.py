@@ -0,0 +1,61 @@
+"""
+Activity signals from the API and webhook Lambdas to the env manager.
+
+With auto-sleep enabled, each request tells the env manager it is in use
+(action wakeOnDemand). signal_activity() sends at most one signal per
+container every WAKE_SIGNAL_INTERVAL_SECONDS. The first request after a
+cold start always signals, so a sleeping environment still wakes at once.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+from app.services.aws import get_client
+
+logger = logging.getLogger(__name__)
+
+ENV_MANAGER_FUNCTION_NAME = os.getenv("ENV_MANAGER_FUNCTION_NAME")
+ENABLE_AUTO_SLEEP = os.getenv("ENABLE_AUTO_SLEEP", "false").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+# Far below IDLE_MINUTES_THRESHOLD, so debouncing never lets an active env look idle.
+WAKE_SIGNAL_INTERVAL_SECONDS = float(os.getenv("WAKE_SIGNAL_INTERVAL_SECONDS", "60"))
+
+_last_signal_at: Optional[float] = None
+
+
+def _lambda_client():
+    return get_client("lambda", connect_timeout=1, read_timeout=2, retries={"max_attempts": 0})
+
+
+def signal_activity(source: str) -> bool:
+    """
+    Invoke the env manager asynchronously unless this container already did
+    within the interval. Returns whether a signal was sent.
+    """
+    global _last_signal_at
+    if not (ENABLE_AUTO_SLEEP and ENV_MANAGER_FUNCTION_NAME):
+        return False
+    now = time.monotonic()
+    if _last_signal_at is not None and now - _last_signal_at < WAKE_SIGNAL_INTERVAL_SECONDS:
+        return False
+
+    _last_signal_at = now
+    try:
+        _lambda_client().invoke(
+            FunctionName=ENV_MANAGER_FUNCTION_NAME,
+            InvocationType="Event",
+            Payload=json.dumps({"action": "wakeOnDemand"}),
+        )
+    except Exception as exc:  # pragma: no cover - best-effort
+        # Let the next request try again rather than waiting out the interval.
+        _last_signal_at = None
+        logger.warning("Failed to invoke env manager from %s: %s", source, exc)
+        return False
+    return True
@@ -1,24 +1,81 @@
+import hashlib
+import json
 import logging
+import time
 import uuid
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db import get_db
+from app.db import get_async_db
 from app.models import User
+from app.services.cache import CacheBackend, LRUCache
+from app.services.user_cache import load_user
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
 
+# Tokens without an `exp` claim are re-verified at least this often.
+_NO_EXP_TTL_SECONDS = 300.0
+
+_token_cache: Optional[CacheBackend] = None
+
+
+def get_token_cache() -> Optional[CacheBackend]:
+    """Return the verified-claims cache, or None when JWT_CACHE_ENABLED is off."""
+    global _token_cache
+    if not settings.jwt_cache_enabled:
+        return None
+    if _token_cache is None:
+        _token_cache = LRUCache(max_entries=settings.jwt_cache_max_entries)
+    return _token_cache
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    jwt.decode with a per-process cache of verified claims, keyed by the token's
+    SHA-256 and kept until `exp`. Only successful decodes are cached, so an altered
+    token always misses and is verified (and rejected) in full. Claims are stored
+    as JSON, per the CacheBackend contract; `exp` and `nbf` are checked again on
+    every hit.
+
+    Raises jwt.PyJWTError like jwt.decode.
+    """
+    cache = get_token_cache()
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    if cache is not None:
+        raw = cache.get(key)
+        if raw is not None:
+            claims = json.loads(raw)
+            now = time.time()
+            exp = claims.get("exp")
+            if exp is not None and exp <= now:
+                cache.delete(key)
+                raise jwt.ExpiredSignatureError("Signature has expired")
+            nbf = claims.get("nbf")
+            if nbf is not None and nbf > now:
+                raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+            return claims
+
+    claims = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    if cache is not None:
+        exp = claims.get("exp")
+        nbf = claims.get("nbf")
+        ttl = exp - time.time() if isinstance(exp, (int, float)) else _NO_EXP_TTL_SECONDS
+        # Never cache a token that is not valid yet.
+        if ttl > 0 and not (isinstance(nbf, (int, float)) and nbf > time.time()):
+            cache.set(key, json.dumps(claims), ttl)
+    return claims
+
 
 async def get_current_user(
     creds: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
     if creds is None:
         logger.warning("get_current_user: no credentials provided")
@@ -29,9 +86,7 @@ async def get_current_user(
 
     token = creds.credentials
     try:
-        payload = jwt.decode(
-            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
-        )
+        payload = decode_access_token(token)
         raw_user_id = payload.get("sub")
     except jwt.PyJWTError:
         logger.warning("get_current_user: token decode failed", exc_info=True)
@@ -59,7 +114,7 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
-    user: Optional[User] = db.query(User).filter(User.id == user_id).first()
+    user: Optional[User] = await load_user(db, user_id)
     if not user:
         logger.warning("get_current_user: user not found for id %s", user_id)
         raise HTTPException(
@@ -0,0 +1,33 @@
+"""
+Lazily created boto3 clients.
+
+Importing boto3 takes ~200 ms and each client another ~50-150 ms, so
+handlers build clients on first use rather than at import. A cold start
+that never calls a service (the API Lambda with auto-sleep off, the worker
+on a batch that sends no replies) does not pay for it.
+"""
+
+import threading
+from typing import Any, Dict, Tuple
+
+_clients: Dict[Tuple[str, str], Any] = {}
+_lock = threading.Lock()
+
+
+def get_client(service: str, **config: Any) -> Any:
+    """
+    Return the container-wide client for `service`. Keyword arguments are
+    passed to botocore's Config, and each distinct config gets its own client.
+    """
+    key = (service, repr(sorted(config.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                import boto3
+                from botocore.config import Config
+
+                client = boto3.client(service, config=Config(**config) if config else None)
+                _clients[key] = client
+    return client
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Minimal string cache interface shared by the in-process and Redis backends."""
+
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class _Stats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with per-entry TTL and least-recently-used eviction.
+    Values are stored as-is, so it can also hold objects that never leave the process.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = _Stats()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+            self._stats.record(entry is not None)
+            return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats.as_dict(), "size": len(self._entries)}
+
+
+class RedisCache:
+    """
+    Shared cache for multiple Lambda instances, backed by any Redis-compatible
+    client (redis-py, or a fake exposing get/set/delete). Backend errors are
+    logged and treated as misses so the cache can never break a request.
+    """
+
+    def __init__(self, client: Any, prefix: str = ""):
+        self._client = client
+        self._prefix = prefix
+        self._stats = _Stats()
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "") -> "RedisCache":
+        import redis
+
+        return cls(redis.Redis.from_url(url, decode_responses=True), prefix=prefix)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self._client.get(self._prefix + key)
+        except Exception as exc:
+            logger.warning("Cache get failed: %s", exc)
+            value = None
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        self._stats.record(value is not None)
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        try:
+            self._client.set(self._prefix + key, value, ex=max(int(ttl_seconds), 1))
+        except Exception as exc:
+            logger.warning("Cache set failed: %s", exc)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self._prefix + key)
+        except Exception as exc:
+            logger.warning("Cache delete failed: %s", exc)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats.as_dict()
+
+
+def build_cache(namespace: str, max_entries: int) -> CacheBackend:
+    """
+    Return the shared Redis backend when CACHE_REDIS_URL is set (and the
+    optional `redis` package is installed), otherwise an in-process LRU.
+    """
+    if settings.cache_redis_url:
+        try:
+            return RedisCache.from_url(settings.cache_redis_url, prefix=f"{namespace}:")
+        except ImportError:
+            logger.warning("CACHE_REDIS_URL is set but 'redis' is not installed; using in-process cache")
+    return LRUCache(max_entries=max_entries)
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy.orm import Session
-
 from app.core.config import settings
 from app.models import User
+from app.services.user_cache import invalidate_user_on_commit
 
 _SYMBOL_MAP = {
     "$": "USD",
@@ -60,18 +59,22 @@ def _infer_currency_from_wa_id(wa_id: Optional[str]) -> Optional[str]:
 
 
 def resolve_currency(
-    db: Session,
     user: User,
     parsed_currency: Optional[str],
     wa_id: Optional[str],
 ) -> str:
+    """
+    Pick the currency for a new expense and update the user's default in memory.
+
+    Nothing is flushed or committed here: the changed `default_currency` marks the
+    user dirty so the caller writes it in the same transaction as the expense, and
+    the cached user is dropped when that transaction commits.
+    """
     normalized = _normalize_currency(parsed_currency)
     if normalized:
         if user.default_currency != normalized:
             user.default_currency = normalized
-            db.add(user)
-            db.commit()
-            db.refresh(user)
+            invalidate_user_on_commit(user)
         return normalized
 
     if user.default_currency:
@@ -80,7 +83,5 @@ def resolve_currency(
     inferred = _infer_currency_from_wa_id(wa_id)
     resolved = inferred or settings.default_currency
     user.default_currency = resolved
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    invalidate_user_on_commit(user)
     return resolved
@@ -0,0 +1,251 @@
+"""
+Streaming CSV / NDJSON expense import for POST /api/expenses/import.
+
+The request body is decoded incrementally and validated in chunks of
+IMPORT_CHUNK_ROWS rows. Each chunk reserves daily quota once per day, then goes
+in with one executemany INSERT (COPY on Postgres) and one rollup upsert. The
+whole import is one transaction, so a failed import can simply be retried.
+"""
+
+import codecs
+import csv
+import io
+import json
+import re
+import uuid
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Expense, User
+from app.models.base import utcnow
+from app.services.quota import consume_daily_quota_bulk
+from app.services.rollups import record_bulk_insert
+
+IMPORT_CHUNK_ROWS = 1000
+MAX_REPORTED_ERRORS = 50
+COLUMNS = ("amount", "currency", "expense_date", "category", "merchant", "notes")
+_COPY_COLUMNS = ("id", "user_id", "created_at") + COLUMNS
+_CURRENCY_RE = re.compile(r"^[A-Z]{3}$")
+
+
+class ImportFormatError(ValueError):
+    """The upload as a whole cannot be imported (bad header, too many rows)."""
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Yield (line number, line) for the decoded stream, split on newlines only."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    line_no = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_no + 1, pending
+
+
+def _csv_record(lines: List[str]) -> Optional[List[str]]:
+    """
+    Parse buffered lines as one CSV record, or return None while a quoted
+    field is still open and the record needs the next line.
+    """
+    try:
+        return next(csv.reader([line + "\n" for line in lines], strict=True), [])
+    except csv.Error as exc:
+        if "unexpected end of data" in str(exc):
+            return None
+        raise ValueError(f"malformed CSV: {exc}")
+
+
+async def _iter_csv_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (line number, values) per non-blank CSV record; values is an error
+    string when the record cannot be parsed. csv.reader decides where a
+    record ends, so quoted fields may span lines.
+    """
+    record: List[str] = []
+    start_line = 0
+    async for line_no, line in _iter_lines(chunks):
+        if not record:
+            if not line.strip():
+                continue
+            start_line = line_no
+        record.append(line)
+        try:
+            values = _csv_record(record)
+        except ValueError as exc:
+            record = []
+            yield start_line, str(exc)
+            continue
+        if values is not None:
+            record = []
+            yield start_line, values
+    if record:
+        yield start_line, "unterminated quoted field"
+
+
+async def _iter_rows(
+    chunks: AsyncIterator[bytes], fmt: str
+) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (line number, dict) per row; the dict is replaced by an error string when unreadable."""
+    if fmt == "ndjson":
+        # One JSON document per line; quotes inside strings never join lines.
+        async for line_no, line in _iter_lines(chunks):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, "invalid JSON"
+                continue
+            yield line_no, row if isinstance(row, dict) else "expected a JSON object"
+        return
+
+    header: Optional[List[str]] = None
+    async for line_no, values in _iter_csv_records(chunks):
+        if isinstance(values, str):
+            if header is None:
+                raise ImportFormatError(f"CSV header is unreadable: {values}")
+            yield line_no, values
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            missing = {"amount", "expense_date"} - set(header)
+            if missing:
+                raise ImportFormatError(f"CSV header is missing: {', '.join(sorted(missing))}")
+            continue
+        if len(values) != len(header):
+            yield line_no, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield line_no, dict(zip(header, values))
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def validate_row(raw: Dict[str, Any], default_currency: str) -> Dict[str, Any]:
+    """Normalize one uploaded row into Expense column values; raise ValueError if invalid."""
+    try:
+        amount = Decimal(str(raw.get("amount")).strip()).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        # Also raised by quantize() for values too large to hold two decimals.
+        raise ValueError("amount is not a number")
+    if not amount.is_finite() or amount <= 0:
+        raise ValueError("amount must be greater than zero")
+
+    raw_date = _text(raw.get("expense_date"))
+    if not raw_date:
+        raise ValueError("expense_date is required")
+    try:
+        expense_date = date.fromisoformat(raw_date)
+    except ValueError:
+        raise ValueError("expense_date must be YYYY-MM-DD")
+
+    currency = (_text(raw.get("currency")) or default_currency).upper()
+    if not _CURRENCY_RE.match(currency):
+        raise ValueError("currency must be a 3-letter code")
+
+    category = _text(raw.get("category"))
+    return {
+        "amount": amount,
+        "currency": currency,
+        "expense_date": expense_date,
+        "category": category.lower() if category else None,
+        "merchant": _text(raw.get("merchant")),
+        "notes": _text(raw.get("notes")),
+    }
+
+
+def _copy_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    now = utcnow()
+    for row in rows:
+        row["id"] = uuid.uuid4()
+        row["created_at"] = now
+        writer.writerow([row[column] for column in _COPY_COLUMNS])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY expenses ({', '.join(_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_chunk(db: Session, user: User, rows: List[Dict[str, Any]], summary: Dict) -> None:
+    requested: Dict[date, int] = {}
+    for row in rows:
+        requested[row["expense_date"]] = requested.get(row["expense_date"], 0) + 1
+    granted = consume_daily_quota_bulk(db, user, requested)
+
+    accepted: List[Dict[str, Any]] = []
+    for row in rows:
+        if granted[row["expense_date"]]:
+            granted[row["expense_date"]] -= 1
+            accepted.append({**row, "user_id": user.id})
+        else:
+            summary["over_limit"] += 1
+    if not accepted:
+        return
+
+    if db.get_bind().dialect.name == "postgresql":
+        _copy_rows(db, accepted)
+    else:
+        db.execute(insert(Expense.__table__), accepted)
+    record_bulk_insert(db, accepted)
+    summary["imported"] += len(accepted)
+
+
+async def import_expenses(
+    db: Session, user: User, chunks: AsyncIterator[bytes], fmt: str
+) -> Dict[str, Any]:
+    """
+    Import every valid row and commit once. Invalid rows and rows over the
+    daily limit are skipped and counted; the first MAX_REPORTED_ERRORS
+    problems are listed with their line numbers. Database work runs in the
+    threadpool so the blocking Session does not stall the event loop.
+    """
+    default_currency = user.default_currency or settings.default_currency
+    summary: Dict[str, Any] = {"imported": 0, "invalid": 0, "over_limit": 0, "errors": []}
+    batch: List[Dict[str, Any]] = []
+    total = 0
+
+    async for line_no, raw in _iter_rows(chunks, fmt):
+        total += 1
+        if total > settings.import_max_rows:
+            raise ImportFormatError(f"Imports are limited to {settings.import_max_rows} rows")
+        try:
+            if isinstance(raw, str):
+                raise ValueError(raw)
+            batch.append(validate_row(raw, default_currency))
+        except ValueError as exc:
+            summary["invalid"] += 1
+            if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                summary["errors"].append({"line": line_no, "error": str(exc)})
+            continue
+        if len(batch) >= IMPORT_CHUNK_ROWS:
+            await run_in_threadpool(_insert_chunk, db, user, batch, summary)
+            batch = []
+
+    if batch:
+        await run_in_threadpool(_insert_chunk, db, user, batch, summary)
+    await run_in_threadpool(db.commit)
+    return summary
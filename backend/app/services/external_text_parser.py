@@ -5,9 +5,19 @@ from typing import Any, Dict, Optional
 import httpx
 
 from app.core.config import settings
+from app.services.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
+REQUIRED_KEYS = {"amount", "currency", "expense_date", "category", "merchant", "notes"}
+
+
+def _headers() -> Dict[str, str]:
+    headers: Dict[str, str] = {"Content-Type": "application/json"}
+    if settings.external_text_parser_api_key:
+        headers["Authorization"] = f"Bearer {settings.external_text_parser_api_key}"
+    return headers
+
 
 async def call_external_text_parser(
     message: str, reference_date: Optional[date] = None
@@ -35,28 +45,23 @@ async def call_external_text_parser(
     payload: Dict[str, Any] = {"text": message}
     if reference_date:
         payload["reference_date"] = reference_date.isoformat()
-    headers: Dict[str, str] = {"Content-Type": "application/json"}
-    if settings.external_text_parser_api_key:
-        headers["Authorization"] = f"Bearer {settings.external_text_parser_api_key}"
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                settings.external_text_parser_url, json=payload, headers=headers
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        client = get_http_client()
+        resp = await client.post(
+            settings.external_text_parser_url, json=payload, headers=_headers()
+        )
+        resp.raise_for_status()
+        data = resp.json()
     except httpx.HTTPError as exc:
         logger.error("External text parser call failed: %s", exc)
         return None
 
     # Basic validation: ensure required keys exist; let local parser fill gaps if needed.
-    required_keys = {"amount", "currency", "expense_date", "category", "merchant", "notes"}
-    if not required_keys.issubset(data.keys()):
+    if not REQUIRED_KEYS.issubset(data.keys()):
         logger.warning(
             "External text parser returned incomplete data: keys=%s", list(data.keys())
         )
         return None
 
     return data
-
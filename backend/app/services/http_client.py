@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Any, Coroutine, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# One client per event loop: pooled connections belong to the loop that opened them.
+_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http2_available() -> bool:
+    if not settings.http2_enabled:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is missing; using HTTP/1.1")
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=settings.http_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        http2=_http2_available(),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide AsyncClient so outbound calls reuse pooled
+    keep-alive connections instead of paying a TCP+TLS handshake each time.
+
+    Each event loop gets its own client, kept until close_http_client() runs
+    on that loop, so switching loops never abandons a live pool. Clients of
+    loops that have been closed can no longer be awaited; they are dropped
+    and their transports close the sockets when collected.
+    """
+    loop = asyncio.get_running_loop()
+    for other in [other for other in _clients if other.is_closed()]:
+        del _clients[other]
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = _build_client()
+    return client
+
+
+async def close_http_client() -> None:
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine from a synchronous Lambda handler.
+
+    Unlike asyncio.run, the loop survives across warm invocations, so the
+    shared client (and its open connections) is reused between events.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
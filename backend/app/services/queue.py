@@ -1,26 +1,150 @@
 import json
+import logging
 import os
-from typing import Any, Dict, Optional
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import boto3
+from app.services.aws import get_client
+
+logger = logging.getLogger(__name__)
 
 INBOUND_QUEUE_URL = os.environ.get("INBOUND_QUEUE_URL")
 OUTBOUND_QUEUE_URL = os.environ.get("OUTBOUND_QUEUE_URL")
 
-sqs = boto3.client("sqs")
+# SQS SendMessageBatch limits.
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+# Created on first send; see _sqs().
+sqs = None
+
+
+def _sqs():
+    global sqs
+    if sqs is None:
+        sqs = get_client("sqs")
+    return sqs
+
+
+class QueueFlushError(Exception):
+    """Raised when some buffered messages could not be sent even after retrying."""
+
+    def __init__(self, failed: List[Tuple[str, str]]):
+        super().__init__(f"{len(failed)} message(s) could not be enqueued")
+        self.failed = failed
+
+
+class BatchingProducer:
+    """
+    Buffer messages per queue and send them with SendMessageBatch.
+
+    A queue's buffer is flushed when it reaches 10 entries, when the next
+    message would push it past 256 KB, when its oldest entry is older than
+    `max_delay_seconds` (checked on each add), or on an explicit flush().
+    Entries the batch call rejects are retried one by one with SendMessage.
+    """
+
+    def __init__(self, client=None, max_delay_seconds: float = 1.0):
+        self._client = client
+        self._max_delay_seconds = max_delay_seconds
+        self._buffers: Dict[str, List[str]] = {}
+        self._buffer_bytes: Dict[str, int] = {}
+        self._buffer_started: Dict[str, float] = {}
+        self._failed: List[Tuple[str, str]] = []
+
+    def add(self, queue_url: str, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload)
+        size = len(body.encode("utf-8"))
+        buffer = self._buffers.setdefault(queue_url, [])
+        if buffer and self._buffer_bytes[queue_url] + size > MAX_BATCH_BYTES:
+            self._flush_queue(queue_url)
+            buffer = self._buffers.setdefault(queue_url, [])
+
+        if not buffer:
+            self._buffer_started[queue_url] = time.monotonic()
+            self._buffer_bytes[queue_url] = 0
+        buffer.append(body)
+        self._buffer_bytes[queue_url] += size
+
+        if (
+            len(buffer) >= MAX_BATCH_ENTRIES
+            or time.monotonic() - self._buffer_started[queue_url] >= self._max_delay_seconds
+        ):
+            self._flush_queue(queue_url)
+
+    def flush(self) -> None:
+        """Send everything still buffered; raise QueueFlushError if any message was lost."""
+        for queue_url in list(self._buffers):
+            self._flush_queue(queue_url)
+        if self._failed:
+            failed, self._failed = self._failed, []
+            raise QueueFlushError(failed)
+
+    def _flush_queue(self, queue_url: str) -> None:
+        bodies = self._buffers.pop(queue_url, [])
+        self._buffer_bytes.pop(queue_url, None)
+        self._buffer_started.pop(queue_url, None)
+        if not bodies:
+            return
+
+        client = self._client or _sqs()
+        entries = [{"Id": str(i), "MessageBody": body} for i, body in enumerate(bodies)]
+        try:
+            resp = client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+            retry = [bodies[int(failed["Id"])] for failed in resp.get("Failed", [])]
+        except Exception as exc:
+            logger.warning("SendMessageBatch to %s failed: %s", queue_url, exc)
+            retry = bodies
+
+        for body in retry:
+            try:
+                client.send_message(QueueUrl=queue_url, MessageBody=body)
+            except Exception as exc:
+                logger.error("Failed to enqueue message to %s: %s", queue_url, exc)
+                self._failed.append((queue_url, body))
+
+
+_active_producer: ContextVar[Optional[BatchingProducer]] = ContextVar(
+    "active_producer", default=None
+)
+
+
+@contextmanager
+def batched_enqueue(client=None, max_delay_seconds: float = 1.0) -> Iterator[BatchingProducer]:
+    """
+    Buffer every enqueue_* call made inside the block and flush on exit,
+    so a webhook delivery or Lambda invocation makes one SQS call per 10 messages.
+    """
+    producer = BatchingProducer(client=client, max_delay_seconds=max_delay_seconds)
+    token = _active_producer.set(producer)
+    try:
+        yield producer
+    finally:
+        _active_producer.reset(token)
+        producer.flush()
+
+
+def _send(queue_url: str, payload: Dict[str, Any]) -> None:
+    producer = _active_producer.get()
+    if producer is not None:
+        producer.add(queue_url, payload)
+        return
+    _sqs().send_message(QueueUrl=queue_url, MessageBody=json.dumps(payload))
 
 
 def enqueue_inbound(payload: Dict[str, Any]) -> bool:
     if not INBOUND_QUEUE_URL:
         return False
-    sqs.send_message(QueueUrl=INBOUND_QUEUE_URL, MessageBody=json.dumps(payload))
+    _send(INBOUND_QUEUE_URL, payload)
     return True
 
 
 def enqueue_outbound(payload: Dict[str, Any]) -> bool:
     if not OUTBOUND_QUEUE_URL:
         return False
-    sqs.send_message(QueueUrl=OUTBOUND_QUEUE_URL, MessageBody=json.dumps(payload))
+    _send(OUTBOUND_QUEUE_URL, payload)
     return True
 
 
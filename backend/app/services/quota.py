@@ -0,0 +1,120 @@
+"""
+Atomic daily expense quotas.
+
+Each (user_id, date) has a counter row in `daily_expense_quotas`. Consuming
+quota is a single upsert that only increments while the result stays within
+the limit:
+
+    INSERT ... VALUES (:user_id, :date, :n)
+    ON CONFLICT (user_id, quota_date) DO UPDATE SET used = used + :n
+        WHERE used + :n <= :limit
+    RETURNING used
+
+No row comes back when the limit would be exceeded. The row lock taken by the
+upsert serializes concurrent workers for the same user and day, and the
+increment runs in the caller's transaction, so a rolled-back insert never
+uses quota. Moving an expense to another date (PATCH /api/expenses/{id})
+releases its slot on the old date and reserves one on the new date.
+"""
+
+from datetime import date
+from typing import Dict
+import uuid
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.db.dialects import upsert_insert
+from app.models import DailyExpenseQuota, User
+from app.services.limits import daily_limit_for_user
+
+
+def consume_statement(dialect: str, user_id: uuid.UUID, day: date, limit: int, count: int):
+    table = DailyExpenseQuota.__table__
+    stmt = upsert_insert(dialect)(table).values(user_id=user_id, quota_date=day, used=count)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.quota_date],
+        set_={"used": table.c.used + stmt.excluded.used},
+        where=table.c.used + stmt.excluded.used <= limit,
+    ).returning(table.c.used)
+
+
+def consume_many_statement(dialect: str, user_id: uuid.UUID, counts: Dict[date, int], limit: int):
+    """Multi-day form of consume_statement; RETURNING lists the days that were granted."""
+    table = DailyExpenseQuota.__table__
+    stmt = upsert_insert(dialect)(table).values(
+        [{"user_id": user_id, "quota_date": day, "used": count} for day, count in counts.items()]
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.quota_date],
+        set_={"used": table.c.used + stmt.excluded.used},
+        where=table.c.used + stmt.excluded.used <= limit,
+    ).returning(table.c.quota_date)
+
+
+def release_statement(user_id: uuid.UUID, day: date, count: int = 1):
+    """Give back `count` reserved expenses on `day`, never going below zero."""
+    table = DailyExpenseQuota.__table__
+    return (
+        update(table)
+        .where(table.c.user_id == user_id, table.c.quota_date == day, table.c.used >= count)
+        .values(used=table.c.used - count)
+    )
+
+
+def try_consume(db: Session, user_id: uuid.UUID, day: date, limit: int, count: int = 1) -> bool:
+    """Atomically add `count` to the day's counter unless that would exceed `limit`."""
+    if count < 1 or count > limit:
+        return False
+    stmt = consume_statement(db.get_bind().dialect.name, user_id, day, limit, count)
+    return db.execute(stmt).first() is not None
+
+
+def consume_daily_quota(db: Session, user: User, day: date) -> bool:
+    """Reserve one expense for `user` on `day`; False once the daily limit is reached."""
+    return try_consume(db, user.id, day, daily_limit_for_user(user))
+
+
+def consume_daily_quota_up_to(db: Session, user: User, day: date, requested: int) -> int:
+    """
+    Reserve up to `requested` expenses and return how many were granted. Tries
+    the whole amount in one statement; near the limit it reads what is left and
+    reserves that, retrying if a concurrent worker got there first.
+    """
+    limit = daily_limit_for_user(user)
+    if try_consume(db, user.id, day, limit, requested):
+        return requested
+
+    granted = 0
+    while granted < requested:
+        used = db.execute(
+            select(DailyExpenseQuota.used).where(
+                DailyExpenseQuota.user_id == user.id, DailyExpenseQuota.quota_date == day
+            )
+        ).scalar()
+        want = min(requested - granted, limit - (used or 0))
+        if want <= 0:
+            break
+        if try_consume(db, user.id, day, limit, want):
+            granted += want
+    return granted
+
+
+def consume_daily_quota_bulk(db: Session, user: User, requested: Dict[date, int]) -> Dict[date, int]:
+    """
+    Reserve quota on many days at once and return what each day was granted.
+    Days whose whole request fits are reserved with a single statement; the
+    rest fall back to consume_daily_quota_up_to.
+    """
+    limit = daily_limit_for_user(user)
+    # Sorted so concurrent imports lock the counter rows in the same order.
+    fits = {day: count for day, count in sorted(requested.items()) if 0 < count <= limit}
+    granted: Dict[date, int] = {day: 0 for day in requested}
+    if fits:
+        stmt = consume_many_statement(db.get_bind().dialect.name, user.id, fits, limit)
+        for day in db.execute(stmt).scalars():
+            granted[day] = fits[day]
+    for day, count in requested.items():
+        if not granted[day] and count > 0:
+            granted[day] = consume_daily_quota_up_to(db, user, day, count)
+    return granted
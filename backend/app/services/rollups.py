@@ -0,0 +1,271 @@
+"""
+Maintain `daily_expense_rollups` from ORM writes to `expenses`.
+
+Importing this module registers Session hooks; app.db imports it, so every
+process that writes through a session has them. Before each flush the
+inserted, updated and deleted Expense rows are turned into per-key (count,
+sum) deltas, and after the flush they are applied with one upsert, so the
+rollups always change in the same transaction as the expenses. Writes that
+bypass the ORM (raw SQL, bulk UPDATE/DELETE) are not tracked;
+scripts/rebuild_daily_rollups.py repairs any drift.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import uuid
+
+from sqlalchemy import Date, Integer, cast, delete, event, func, inspect, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.db.dialects import upsert_insert
+from app.models import DailyExpenseRollup, Expense
+
+# (user_id, expense_date, currency, category)
+RollupKey = Tuple[uuid.UUID, date, str, str]
+
+_TRACKED = ("user_id", "expense_date", "currency", "category", "amount")
+_DELTAS_KEY = "daily_rollup_deltas"
+
+
+def _on_set(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+# active_history loads the previous value even when an expired attribute is
+# overwritten, so an update can always be subtracted from its old key.
+for _name in _TRACKED:
+    event.listen(getattr(Expense, _name), "set", _on_set, active_history=True)
+
+
+def _key(user_id, expense_date, currency, category) -> RollupKey:
+    return (user_id, expense_date, currency, category or "")
+
+
+def _previous(expense: Expense) -> Tuple[RollupKey, Decimal]:
+    state = inspect(expense)
+    values = {}
+    for name in _TRACKED:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(expense, name)
+    key = _key(values["user_id"], values["expense_date"], values["currency"], values["category"])
+    return key, Decimal(str(values["amount"]))
+
+
+def _current(expense: Expense) -> Tuple[RollupKey, Decimal]:
+    key = _key(expense.user_id, expense.expense_date, expense.currency, expense.category)
+    return key, Decimal(str(expense.amount))
+
+
+def _add(deltas: Dict[RollupKey, List], key: RollupKey, count: int, amount: Decimal) -> None:
+    delta = deltas.setdefault(key, [0, Decimal("0")])
+    delta[0] += count
+    delta[1] += amount
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deltas(session: Session, flush_context, instances) -> None:
+    deltas: Dict[RollupKey, List] = session.info.setdefault(_DELTAS_KEY, {})
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            key, amount = _current(obj)
+            _add(deltas, key, 1, amount)
+    for obj in session.deleted:
+        if isinstance(obj, Expense):
+            key, amount = _previous(obj)
+            _add(deltas, key, -1, -amount)
+    for obj in session.dirty:
+        if not isinstance(obj, Expense) or obj in session.deleted:
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[name].history.has_changes() for name in _TRACKED):
+            continue
+        old_key, old_amount = _previous(obj)
+        new_key, new_amount = _current(obj)
+        _add(deltas, old_key, -1, -old_amount)
+        _add(deltas, new_key, 1, new_amount)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_deltas(session: Session, flush_context) -> None:
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if deltas:
+        _write_deltas(session, deltas)
+
+
+def _write_deltas(session: Session, deltas: Dict[RollupKey, List]) -> None:
+    rows = [
+        {
+            "user_id": key[0],
+            "expense_date": key[1],
+            "currency": key[2],
+            "category": key[3],
+            "count": count,
+            "sum_amount": amount,
+        }
+        # Stable key order keeps concurrent upserts from deadlocking each other.
+        for key, (count, amount) in sorted(deltas.items(), key=lambda item: str(item[0]))
+        if count or amount
+    ]
+    if rows:
+        connection = session.connection()
+        connection.execute(_upsert(connection.dialect.name), rows)
+
+
+def record_bulk_insert(db: Session, rows: Iterable[dict]) -> None:
+    """
+    Add Core-inserted expense rows (dicts with user_id, expense_date, currency,
+    category and amount) to the rollups; bulk inserts bypass the flush hooks.
+    """
+    deltas: Dict[RollupKey, List] = {}
+    for row in rows:
+        key = _key(row["user_id"], row["expense_date"], row["currency"], row.get("category"))
+        _add(deltas, key, 1, Decimal(str(row["amount"])))
+    if deltas:
+        _write_deltas(db, deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_deltas(session: Session) -> None:
+    session.info.pop(_DELTAS_KEY, None)
+
+
+def _upsert(dialect: str):
+    # Executed with a parameter list (executemany): dialect upserts are not in
+    # SQLAlchemy's statement cache, and a multi-VALUES compile grows with the row count.
+    table = DailyExpenseRollup.__table__
+    stmt = upsert_insert(dialect)(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.expense_date, table.c.currency, table.c.category],
+        set_={
+            "count": table.c.count + stmt.excluded.count,
+            "sum_amount": table.c.sum_amount + stmt.excluded.sum_amount,
+        },
+    )
+
+
+def daily_counts(
+    db: Session, user_ids: Iterable[uuid.UUID], expense_dates: Iterable[date]
+) -> Dict[Tuple[uuid.UUID, date], int]:
+    """Expense count per (user_id, expense_date), read from the rollups."""
+    user_ids = list(set(user_ids))
+    expense_dates = list(set(expense_dates))
+    if not user_ids or not expense_dates:
+        return {}
+
+    rows = db.execute(
+        select(
+            DailyExpenseRollup.user_id,
+            DailyExpenseRollup.expense_date,
+            func.sum(DailyExpenseRollup.count),
+        )
+        .where(
+            DailyExpenseRollup.user_id.in_(user_ids),
+            DailyExpenseRollup.expense_date.in_(expense_dates),
+        )
+        .group_by(DailyExpenseRollup.user_id, DailyExpenseRollup.expense_date)
+    ).all()
+    return {(user_id, expense_date): int(count) for user_id, expense_date, count in rows if count}
+
+
+def _period_start(period: str, dialect: str):
+    """SQL expression for the first day of the day/week (ISO, Monday)/month bucket."""
+    column = DailyExpenseRollup.expense_date
+    if period == "day":
+        return column
+    if dialect == "postgresql":
+        # Inline the (validated) unit: a bind parameter would make the SELECT and
+        # GROUP BY expressions differ and Postgres would reject the query.
+        return cast(func.date_trunc(literal_column(f"'{period}'"), column), Date)
+    # SQLite (local dev and tests).
+    if period == "month":
+        return func.date(column, "start of month")
+    days_since_monday = (cast(func.strftime("%w", column), Integer) + 6) % 7
+    return func.date(column, func.printf("-%d days", days_since_monday))
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def summarize(
+    db: Session,
+    user_id: uuid.UUID,
+    start: date,
+    end: date,
+    period: str,
+    by_category: bool,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """
+    Totals per period bucket, currency and (optionally) category over start..end
+    inclusive, ordered by those keys. `period` must be "day", "week" or "month".
+    """
+    bucket = _period_start(period, db.get_bind().dialect.name).label("period_start")
+    group_columns = [bucket, DailyExpenseRollup.currency]
+    if by_category:
+        group_columns.append(DailyExpenseRollup.category)
+
+    query = (
+        select(
+            *group_columns,
+            func.sum(DailyExpenseRollup.sum_amount).label("total"),
+            func.sum(DailyExpenseRollup.count).label("count"),
+        )
+        .where(
+            DailyExpenseRollup.user_id == user_id,
+            DailyExpenseRollup.expense_date >= start,
+            DailyExpenseRollup.expense_date <= end,
+        )
+        .group_by(*group_columns)
+        .having(func.sum(DailyExpenseRollup.count) > 0)
+        .order_by(*group_columns)
+        .limit(limit)
+    )
+    return [
+        {
+            "period_start": _as_date(row.period_start),
+            "currency": row.currency,
+            "category": (row.category or None) if by_category else None,
+            "total": Decimal(str(row.total)),
+            "count": int(row.count),
+        }
+        for row in db.execute(query)
+    ]
+
+
+def rebuild_rollups(db: Session, user_id: Optional[uuid.UUID] = None) -> int:
+    """
+    Recompute rollups from `expenses` (for one user, or everyone) inside the
+    caller's transaction. Returns the number of rollup rows written.
+    """
+    category = func.coalesce(Expense.category, "")
+    source = select(
+        Expense.user_id,
+        Expense.expense_date,
+        Expense.currency,
+        category,
+        func.count(Expense.id),
+        func.sum(Expense.amount),
+    ).group_by(Expense.user_id, Expense.expense_date, Expense.currency, category)
+    clear = delete(DailyExpenseRollup)
+    if user_id is not None:
+        source = source.where(Expense.user_id == user_id)
+        clear = clear.where(DailyExpenseRollup.user_id == user_id)
+
+    db.execute(clear)
+    result = db.execute(
+        DailyExpenseRollup.__table__.insert().from_select(
+            ["user_id", "expense_date", "currency", "category", "count", "sum_amount"], source
+        )
+    )
+    return result.rowcount
@@ -1,23 +1,57 @@
+import hashlib
+import json
 import re
+from collections import deque
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
+from app.core.config import settings
+from app.services.cache import CacheBackend, build_cache
 from app.services.external_text_parser import call_external_text_parser
 
-CURRENCY_PATTERN = r"(?P<currency>[A-Za-z]{3}|\$|€|£|¥|₹)"
-AMOUNT_PATTERN = r"(?P<amount>\d+[.,]?\d*)"
-DATE_PATTERNS = [
-    r"(?P<date>\d{4}-\d{2}-\d{2})",
-    r"(?P<date>\d{2}/\d{2}/\d{4})",
-]
-
 CATEGORY_KEYWORDS = {
-    "grocery": {"market, grocery", "supermarket"},
+    "grocery": {"grocery", "groceries", "market", "supermarket"},
     "transport": {"uber", "taxi", "train", "bus"},
     "food": {"dinner", "lunch", "breakfast", "restaurant"},
 }
 
+# Currencies we accept as an explicit mention. Codes that double as common
+# English words (ALL, TRY, ...) are left out so "try 5" is not read as lira.
+KNOWN_CURRENCY_CODES = {
+    "AED", "AUD", "BRL", "CAD", "CHF", "CNY", "CZK", "DKK", "EGP", "EUR",
+    "GBP", "HKD", "IDR", "ILS", "INR", "JPY", "KES", "KRW", "MXN", "MYR",
+    "NGN", "NOK", "NZD", "PHP", "PKR", "PLN", "QAR", "SAR", "SEK", "SGD",
+    "THB", "TWD", "USD", "VND", "ZAR",
+}
+CURRENCY_WORDS = {
+    "$": "USD",
+    "€": "EUR",
+    "£": "GBP",
+    "¥": "JPY",
+    "₹": "INR",
+    "yen": "JPY",
+    "euro": "EUR",
+    "euros": "EUR",
+    "rupee": "INR",
+    "rupees": "INR",
+}
+# Single-pass tokenizer: dates must come before amounts so "2025-01-03" is
+# not read as the number 2025. An amount has comma thousands groups and at
+# most one decimal part, so every amount token is a valid Decimal.
+TOKEN_RE = re.compile(
+    r"(?P<date>\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}\.\d{2}\.\d{4})"
+    r"|(?P<amount>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?)"
+    r"|(?P<symbol>[$€£¥₹])"
+    r"|(?P<word>[A-Za-z]+)"
+)
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d.%m.%Y")
+
+# Weights for the local parser's confidence score (they sum to 1.0).
+AMOUNT_CONFIDENCE = 0.4
+CURRENCY_CONFIDENCE = 0.3
+CATEGORY_CONFIDENCE = 0.3
+
 
 async def parse_expense_text(
     message: str, reference_date: Optional[date] = None
@@ -26,9 +60,25 @@ async def parse_expense_text(
     Parse a free-form expense text into structured fields.
 
     Flow:
-    1. Try external text parser (AWS / GCP / custom) if configured.
-    2. Fallback to local regex-based heuristic parser.
+    1. Run the local regex-based parser; if its confidence meets
+       LOCAL_PARSER_CONFIDENCE_THRESHOLD, return it without a network call.
+    2. Otherwise try the external text parser (AWS / GCP / custom) if configured.
+    3. Fall back to the local result.
+
+    External results are cached by normalized text and reference date (see
+    get_parse_cache); failed external calls are not cached.
     """
+    local = _parse_local(message, reference_date=reference_date)
+    if local["confidence"] >= settings.local_parser_confidence_threshold:
+        return local
+
+    cache_key = _parse_cache_key(message, reference_date)
+    cache = get_parse_cache()
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return _load_cached_parse(cached, message)
+
     external = await call_external_text_parser(message, reference_date=reference_date)
     if external:
         # Normalize external response types
@@ -46,38 +96,178 @@ async def parse_expense_text(
         if not isinstance(raw_amount, Decimal) and raw_amount is not None:
             external["amount"] = Decimal(str(raw_amount))
 
+        if cache is not None:
+            cache.set(cache_key, _dump_cached_parse(external), settings.parse_cache_ttl_seconds)
         return external
 
+    return local
+
+
+_parse_cache: Optional[CacheBackend] = None
+
+
+def get_parse_cache() -> Optional[CacheBackend]:
+    """Return the parse-result cache, or None when PARSE_CACHE_ENABLED is off."""
+    global _parse_cache
+    if not settings.parse_cache_enabled:
+        return None
+    if _parse_cache is None:
+        _parse_cache = build_cache("parse", settings.parse_cache_max_entries)
+    return _parse_cache
+
+
+def parse_cache_stats() -> Dict[str, Any]:
+    cache = get_parse_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def _parse_cache_key(message: str, reference_date: Optional[date]) -> str:
+    # Relative dates ("yesterday") depend on the reference date, so it is part of the key.
+    normalized = " ".join(message.split()).casefold()
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"v1:{(reference_date or date.today()).isoformat()}:{digest}"
+
+
+def _dump_cached_parse(parsed: Dict[str, Any]) -> str:
+    return json.dumps(
+        {
+            **parsed,
+            "amount": str(parsed["amount"]) if parsed.get("amount") is not None else None,
+            "expense_date": parsed["expense_date"].isoformat()
+            if isinstance(parsed.get("expense_date"), date)
+            else parsed.get("expense_date"),
+        }
+    )
+
+
+def _load_cached_parse(raw: str, message: str) -> Dict[str, Any]:
+    parsed = json.loads(raw)
+    if parsed.get("amount") is not None:
+        parsed["amount"] = Decimal(parsed["amount"])
+    if isinstance(parsed.get("expense_date"), str):
+        parsed["expense_date"] = date.fromisoformat(parsed["expense_date"])
+    parsed["notes"] = message
+    parsed["merchant"] = _merchant_in_message(parsed.get("merchant"), message)
+    return parsed
+
+
+def _merchant_in_message(merchant: Optional[str], message: str) -> Optional[str]:
+    # The cache key ignores case and spacing, so a cached merchant carries the
+    # spelling of whoever sent the message first; take this message's own span.
+    words = merchant.split() if merchant else []
+    if not words:
+        return merchant
+    pattern = r"\s+".join(re.escape(word) for word in words)
+    match = re.search(pattern, message, re.IGNORECASE)
+    return match.group() if match else merchant
+
+
+def parse_expense_text_local(
+    message: str, reference_date: Optional[date] = None
+) -> Dict[str, Any]:
+    """Parse with the local heuristics only, skipping the external parser."""
     return _parse_local(message, reference_date=reference_date)
 
 
-def _parse_local(message: str, reference_date: Optional[date] = None) -> Dict[str, Any]:
-    lowered = message.lower()
+class _KeywordMatcher:
+    """
+    Aho-Corasick automaton over the category keywords: one scan of the
+    lowered message finds every keyword occurrence (substring semantics,
+    like the `in` checks it replaces) together with its position.
+    """
+
+    def __init__(self, keywords: Dict[str, Set[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, int]]] = [[]]
+        for category, words in keywords.items():
+            for word in words:
+                self._add(word, category)
+        self._build_failure_links()
+
+    def _add(self, word: str, category: str) -> None:
+        node = 0
+        for ch in word:
+            if ch not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][ch] = len(self._goto) - 1
+            node = self._goto[node][ch]
+        self._out[node].append((category, len(word)))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
 
-    currency_match = re.search(CURRENCY_PATTERN, message)
-    amount_match = re.search(AMOUNT_PATTERN, message)
+    def find(self, text: str) -> Iterator[Tuple[str, int, int]]:
+        """Yield (category, start, end) for every keyword occurrence in `text`."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for category, length in self._out[node]:
+                yield category, i + 1 - length, i + 1
 
-    parsed_date = _extract_date(message)
 
-    category = None
-    for cat, keywords in CATEGORY_KEYWORDS.items():
-        if any(word in lowered for word in keywords):
-            category = cat
-            break
+_CATEGORY_MATCHER = _KeywordMatcher(CATEGORY_KEYWORDS)
+_CATEGORY_ORDER = list(CATEGORY_KEYWORDS)
+
+
+def _parse_local(message: str, reference_date: Optional[date] = None) -> Dict[str, Any]:
+    parsed_date: Optional[date] = None
+    amounts: List[re.Match] = []
+    explicit_currencies: Set[str] = set()
+    fallback_currency: Optional[str] = None
+
+    for match in TOKEN_RE.finditer(message):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == "date":
+            if parsed_date is None:
+                parsed_date = _parse_date_token(value)
+        elif kind == "amount":
+            amounts.append(match)
+        elif kind == "symbol":
+            explicit_currencies.add(CURRENCY_WORDS[value])
+            fallback_currency = fallback_currency or value
+        else:
+            if value.upper() in KNOWN_CURRENCY_CODES:
+                explicit_currencies.add(value.upper())
+            elif value.lower() in CURRENCY_WORDS:
+                explicit_currencies.add(CURRENCY_WORDS[value.lower()])
+            if fallback_currency is None and len(value) >= 3:
+                fallback_currency = value[:3]
+
+    lowered = message.lower()
+    matched: Dict[str, bool] = {}
+    for cat, start, end in _CATEGORY_MATCHER.find(lowered):
+        whole_word = (start == 0 or not lowered[start - 1].isalpha()) and (
+            end == len(lowered) or not lowered[end].isalpha()
+        )
+        matched[cat] = matched.get(cat, False) or whole_word
+    category = next((cat for cat in _CATEGORY_ORDER if cat in matched), None)
 
     merchant = None
     tokens = message.split()
     if tokens:
         merchant = tokens[0].strip()
 
-    currency = None
-    if currency_match:
-        currency = currency_match.group("currency")
+    explicit_currency = explicit_currencies.pop() if len(explicit_currencies) == 1 else None
+    currency = explicit_currency or fallback_currency
 
     amount = None
-    if amount_match:
-        amount_raw = amount_match.group("amount").replace(",", "")
-        amount = Decimal(amount_raw)
+    if amounts:
+        amount = Decimal(amounts[0].group().replace(",", ""))
 
     return {
         "amount": amount,
@@ -86,17 +276,43 @@ def _parse_local(message: str, reference_date: Optional[date] = None) -> Dict[st
         "category": category or "general",
         "merchant": merchant,
         "notes": message,
+        "confidence": _local_confidence(
+            message, amounts, explicit_currency, bool(category and matched[category])
+        ),
     }
 
 
-def _extract_date(message: str) -> Optional[date]:
-    for pattern in DATE_PATTERNS:
-        match = re.search(pattern, message)
-        if match:
-            raw_date = match.group("date")
-            for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
-                try:
-                    return datetime.strptime(raw_date, fmt).date()
-                except ValueError:
-                    continue
+def _local_confidence(
+    message: str,
+    amounts: List[re.Match],
+    explicit_currency: Optional[str],
+    category_whole_word: bool,
+) -> float:
+    """
+    Score how safe it is to trust the local parse without the external parser:
+    the amount is the only number outside any date and is not glued to a unit
+    ("2kg") or written with a comma, the currency is named explicitly, and a
+    category keyword matches a whole word.
+    """
+    score = 0.0
+    if len(amounts) == 1:
+        start, end = amounts[0].span()
+        glued = (start > 0 and message[start - 1].isalpha()) or (
+            end < len(message) and message[end].isalpha()
+        )
+        if not glued and "," not in amounts[0].group():
+            score += AMOUNT_CONFIDENCE
+    if explicit_currency:
+        score += CURRENCY_CONFIDENCE
+    if category_whole_word:
+        score += CATEGORY_CONFIDENCE
+    return round(score, 2)
+
+
+def _parse_date_token(raw_date: str) -> Optional[date]:
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(raw_date, fmt).date()
+        except ValueError:
+            continue
     return None
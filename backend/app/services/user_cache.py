@@ -0,0 +1,117 @@
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import DateTime, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.core.config import settings
+from app.models import User
+from app.services.cache import CacheBackend, build_cache
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "user_cache_invalidate"
+
+_user_cache: Optional[CacheBackend] = None
+
+
+def get_user_cache() -> Optional[CacheBackend]:
+    """Return the user cache, or None when USER_CACHE_ENABLED is off."""
+    global _user_cache
+    if not settings.user_cache_enabled:
+        return None
+    if _user_cache is None:
+        _user_cache = build_cache("user", settings.user_cache_max_entries)
+    return _user_cache
+
+
+def user_cache_stats() -> Dict[str, Any]:
+    cache = get_user_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def _user_key(user_id: uuid.UUID) -> str:
+    return f"v1:{user_id}"
+
+
+def _dump_user(user: User) -> str:
+    data: Dict[str, Any] = {}
+    for column in User.__table__.columns:
+        value = getattr(user, column.key)
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        data[column.key] = value
+    return json.dumps(data)
+
+
+def _load_user(raw: str) -> User:
+    data = json.loads(raw)
+    for column in User.__table__.columns:
+        value = data.get(column.key)
+        if value is None:
+            continue
+        if column.key == "id":
+            data["id"] = uuid.UUID(value)
+        elif isinstance(column.type, DateTime):
+            data[column.key] = datetime.fromisoformat(value)
+    return User(**data)
+
+
+async def load_user(db: AsyncSession, user_id: uuid.UUID) -> Optional[User]:
+    """
+    Cache-aside lookup by primary key.
+
+    On a hit the cached row is attached to `db` as a persistent object without
+    a SELECT, so callers can modify and commit it as usual.
+    """
+    cache = get_user_cache()
+    if cache is not None:
+        raw = cache.get(_user_key(user_id))
+        if raw is not None:
+            try:
+                user = _load_user(raw)
+            except Exception:
+                logger.warning("Discarding unreadable cached user %s", user_id, exc_info=True)
+                cache.delete(_user_key(user_id))
+            else:
+                make_transient_to_detached(user)
+                return await db.merge(user, load=False)
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+    if user is not None and cache is not None:
+        cache.set(_user_key(user_id), _dump_user(user), settings.user_cache_ttl_seconds)
+    return user
+
+
+def invalidate_user(user_id: Optional[uuid.UUID]) -> None:
+    cache = get_user_cache()
+    if cache is not None and user_id is not None:
+        cache.delete(_user_key(user_id))
+
+
+def invalidate_user_on_commit(user: User) -> None:
+    """
+    Drop the cached user once the current transaction commits, for writers
+    that change a user without committing themselves (e.g. resolve_currency).
+    A rolled-back change just costs one extra cache miss later.
+    """
+    if user.id is None:
+        # Not flushed yet, so it cannot be cached.
+        return
+    session = object_session(user)
+    if session is None:
+        invalidate_user(user.id)
+        return
+    session.info.setdefault(_PENDING_KEY, set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(user_id)
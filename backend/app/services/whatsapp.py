@@ -7,10 +7,22 @@ from typing import Any, Dict, Optional
 import httpx
 
 from app.core.config import settings
+from app.services.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
 
+class WhatsAppSendError(Exception):
+    """A send failed in a way a retry may fix: network error, 5xx or 429."""
+
+
+def _is_retryable(exc: httpx.HTTPError) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return True
+
+
 class WhatsAppService:
     def __init__(self, access_token: str, phone_number_id: str):
         self.access_token = access_token
@@ -33,7 +45,14 @@ class WhatsAppService:
         
         return hmac.compare_digest(expected, signature_clean)
 
-    async def send_text_message(self, wa_id: str, text: str) -> Optional[Dict[str, Any]]:
+    async def send_text_message(
+        self, wa_id: str, text: str, raise_retryable: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a text message; returns None when the Graph API rejects it. With
+        raise_retryable, transient failures raise WhatsAppSendError instead,
+        so queue consumers can retry those and drop permanent rejections.
+        """
         url = f"{self.base_url}/{self.phone_number_id}/messages"
         headers = {
             "Authorization": f"Bearer {self.access_token}",
@@ -46,14 +65,16 @@ class WhatsAppService:
             "text": {"body": text},
         }
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            try:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as exc:
-                logger.error("Failed to send WhatsApp message: %s", exc)
-                return None
+        client = get_http_client()
+        try:
+            response = await client.post(url, headers=headers, json=payload)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as exc:
+            logger.error("Failed to send WhatsApp message: %s", exc)
+            if raise_retryable and _is_retryable(exc):
+                raise WhatsAppSendError(str(exc)) from exc
+            return None
 
 
 whatsapp_service = WhatsAppService(
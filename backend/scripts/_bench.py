@@ -0,0 +1,55 @@
+"""Shared helpers for the local benchmark scripts in this directory."""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+_BENCH_ENV = {
+    "APP_NAME": "WA Expense Bench",
+    "DEBUG": "false",
+    "WHATSAPP_VERIFY_TOKEN": "bench-token",
+    "WHATSAPP_APP_SECRET": "bench-secret",
+    "WHATSAPP_ACCESS_TOKEN": "bench-access",
+    "WHATSAPP_PHONE_NUMBER_ID": "1234567890",
+    "JWT_SECRET_KEY": "bench-jwt-secret",
+    "JWT_ALGORITHM": "HS256",
+    "EXTERNAL_TEXT_PARSER_URL": "",
+    "AWS_DEFAULT_REGION": "us-east-1",
+}
+
+
+def configure_env(database_url: str = "") -> str:
+    """
+    Populate the settings env vars before `app` is imported.
+
+    Defaults to a throwaway SQLite file so benchmarks never touch a real DB.
+    """
+    if not database_url:
+        path = Path(tempfile.gettempdir()) / "waexpense_bench.db"
+        if path.exists():
+            path.unlink()
+        database_url = f"sqlite+pysqlite:///{path}"
+    os.environ["DATABASE_URL"] = database_url
+    for key, value in _BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    return database_url
+
+
+def timed(fn: Callable[[], object], repeat: int = 20) -> Dict[str, float]:
+    """Run `fn` `repeat` times and return latency stats in milliseconds."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
@@ -0,0 +1,69 @@
+"""
+Time the get_current_user dependency with and without the JWT and user caches.
+
+    python scripts/bench_auth.py --calls 5000
+
+Calls the dependency directly (no HTTP stack) against a throwaway SQLite DB,
+so the numbers isolate token verification and the user lookup.
+"""
+
+import argparse
+import asyncio
+import time
+
+from _bench import configure_env
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.api.routes.auth import _create_jwt
+    from app.core.config import settings
+    from app.db import SessionLocal, engine, get_async_db
+    from app.models import Base, User
+    from app.services import auth, user_cache
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(whatsapp_id="15550009999")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=_create_jwt(str(user_id)))
+
+    async def run(jwt_cache: bool, user_cache_on: bool) -> float:
+        settings.jwt_cache_enabled = jwt_cache
+        settings.user_cache_enabled = user_cache_on
+        auth._token_cache = None
+        user_cache._user_cache = None
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            # Each request gets a fresh session in the API; emulate that.
+            sessions = get_async_db()
+            db = await sessions.__anext__()
+            await auth.get_current_user(creds=creds, db=db)
+            await sessions.aclose()
+        return (time.perf_counter() - start) / args.calls * 1e6
+
+    cases = [(False, False), (True, False), (False, True), (True, True)]
+
+    def label(enabled: bool) -> str:
+        return "on " if enabled else "off"
+
+    for jwt_cache, user_cache_on in cases:
+        per_call = asyncio.run(run(jwt_cache, user_cache_on))
+        print(
+            f"jwt_cache={label(jwt_cache)} user_cache={label(user_cache_on)}"
+            f"  {per_call:8.1f} us/call"
+        )
+
+
+if __name__ == "__main__":
+    main()
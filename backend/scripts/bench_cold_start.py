@@ -0,0 +1,96 @@
+"""
+Measure Lambda handler import (init) time with `python -X importtime`.
+
+    python scripts/bench_cold_start.py --repeat 5
+
+Imports each handler module in a fresh interpreter, as a cold Lambda
+container does, and reports the median cumulative import time of the
+handler plus the packages that spent the most time importing. Use --top to show
+more packages and --handler to measure a single module.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from _bench import configure_env
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+TEXT_PARSER_DIR = BACKEND_DIR.parent / "lambda" / "text_parser"
+
+HANDLERS: Dict[str, Path] = {
+    "app.lambda_handlers.api": BACKEND_DIR,
+    "app.lambda_handlers.webhook_ingest": BACKEND_DIR,
+    "app.lambda_handlers.expense_worker": BACKEND_DIR,
+    "app.lambda_handlers.outbound_sender": BACKEND_DIR,
+    "app.lambda_handlers.env_manager": BACKEND_DIR,
+    "handler": TEXT_PARSER_DIR,
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)")
+
+
+def _import_once(module: str, cwd: Path, env: Dict[str, str]) -> Tuple[int, Dict[str, int]]:
+    """Return (cumulative µs for `module`, self µs summed per top-level package)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    total = 0
+    packages: Dict[str, int] = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, name = int(match.group(1)), int(match.group(2)), match.group(3)
+        if name == module:
+            total = cumulative
+        packages[name.split(".")[0]] += own
+    return total, packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=4)
+    parser.add_argument("--handler", choices=sorted(HANDLERS))
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+    env = os.environ.copy()
+    env.setdefault("AWS_LAMBDA_FUNCTION_NAME", "bench-cold-start")
+    # A warm-up connection would time the database, not the imports.
+    env.setdefault("DB_WARM_UP", "false")
+
+    modules = [args.handler] if args.handler else list(HANDLERS)
+    for module in modules:
+        totals: List[int] = []
+        by_package: Dict[str, List[int]] = defaultdict(list)
+        for _ in range(args.repeat):
+            total, packages = _import_once(module, HANDLERS[module], env)
+            totals.append(total)
+            for name, value in packages.items():
+                by_package[name].append(value)
+        heaviest = sorted(
+            ((statistics.median(values), name) for name, values in by_package.items()),
+            reverse=True,
+        )[: args.top]
+        detail = ", ".join(f"{name} {value / 1000:.0f}" for value, name in heaviest)
+        print(f"{module:<38} {statistics.median(totals) / 1000:7.1f} ms  ({detail})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Measure bulk import throughput against one-ORM-insert-per-row.
+
+    python scripts/bench_expense_import.py --rows 100000
+
+Posts generated CSV and NDJSON bodies to POST /api/expenses/import through
+TestClient (streamed in 64 KB chunks) against a throwaway SQLite DB, and
+compares with adding the same rows as Expense objects and committing each.
+Pass --database-url to run against Postgres, where the import uses COPY.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from _bench import configure_env
+
+CHUNK_BYTES = 64 * 1024
+
+
+def _rows(count: int):
+    rng = random.Random(7)
+    start = date(2024, 1, 1)
+    for i in range(count):
+        yield {
+            "amount": f"{rng.uniform(1, 200):.2f}",
+            "currency": "USD",
+            "expense_date": (start + timedelta(days=i % 365)).isoformat(),
+            "category": rng.choice(["food", "transport", "rent", ""]),
+            "merchant": f"Shop {i % 97}",
+            "notes": "bench",
+        }
+
+
+def _csv_body(count: int) -> bytes:
+    lines = ["amount,currency,expense_date,category,merchant,notes"]
+    lines += [",".join(row.values()) for row in _rows(count)]
+    return "\n".join(lines).encode("utf-8")
+
+
+def _ndjson_body(count: int) -> bytes:
+    return "\n".join(json.dumps(row) for row in _rows(count)).encode("utf-8")
+
+
+def _chunks(body: bytes):
+    for i in range(0, len(body), CHUNK_BYTES):
+        yield body[i : i + CHUNK_BYTES]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--baseline-rows", type=int, default=5_000)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+    os.environ["DAILY_LIMIT_FREE"] = str(args.rows)
+    os.environ["IMPORT_MAX_ROWS"] = str(args.rows)
+
+    from fastapi.testclient import TestClient
+
+    from app.api.routes.auth import _create_jwt
+    from app.db import SessionLocal, engine
+    from app.main import app
+    from app.models import Base, Expense, User
+
+    client = TestClient(app)
+
+    def fresh_user(wa_id: str) -> User:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            user = User(whatsapp_id=wa_id)
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+            db.expunge(user)
+        return user
+
+    for fmt, content_type, body in (
+        ("csv", "text/csv", _csv_body(args.rows)),
+        ("ndjson", "application/x-ndjson", _ndjson_body(args.rows)),
+    ):
+        user = fresh_user(f"1555000{fmt}")
+        headers = {
+            "Authorization": f"Bearer {_create_jwt(str(user.id))}",
+            "Content-Type": content_type,
+        }
+        start = time.perf_counter()
+        res = client.post("/api/expenses/import", content=_chunks(body), headers=headers)
+        elapsed = time.perf_counter() - start
+        res.raise_for_status()
+        imported = res.json()["imported"]
+        print(f"import {fmt:<7} {imported:>7} rows  {elapsed:7.2f} s  {imported / elapsed:9.0f} rows/s")
+
+    user = fresh_user("15550000orm")
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        for row in _rows(args.baseline_rows):
+            db.add(
+                Expense(
+                    user_id=user.id,
+                    amount=row["amount"],
+                    currency=row["currency"],
+                    expense_date=date.fromisoformat(row["expense_date"]),
+                    category=row["category"] or None,
+                    merchant=row["merchant"],
+                    notes=row["notes"],
+                )
+            )
+            db.commit()
+        elapsed = time.perf_counter() - start
+    print(
+        f"orm per-row {args.baseline_rows:>7} rows  {elapsed:7.2f} s"
+        f"  {args.baseline_rows / elapsed:9.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compare page-N latency of GET /api/expenses in offset vs cursor mode.
+
+    python scripts/bench_expense_pagination.py --rows 50000 --limit 50
+
+Offset pages get slower the deeper they go because the DB still walks and
+discards every skipped row; cursor pages seek straight to the sort key, so
+their latency should stay flat.
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta
+
+from _bench import configure_env, timed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+
+    from sqlalchemy import insert
+
+    from app.api.routes.expenses import _encode_cursor, list_expenses
+    from app.db import SessionLocal, engine
+    from app.models import Base, Expense, User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(whatsapp_id=f"bench-{uuid.uuid4().hex[:8]}")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+        start_date = date(2020, 1, 1)
+        created = datetime(2020, 1, 1)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "user_id": user.id,
+                "amount": 1 + (i % 100),
+                "currency": "USD",
+                "category": "food",
+                "merchant": "Bench",
+                "notes": "bench",
+                "expense_date": start_date + timedelta(days=i // 20),
+                "created_at": created + timedelta(seconds=i),
+            }
+            for i in range(args.rows)
+        ]
+        db.execute(insert(Expense), rows)
+        db.commit()
+
+        def fetch(**params):
+            return asyncio.run(
+                list_expenses(
+                    db=db,
+                    current_user=user,
+                    limit=args.limit,
+                    offset=params.get("offset", 0),
+                    cursor=params.get("cursor"),
+                    category=None,
+                )
+            )
+
+        total_pages = args.rows // args.limit
+        pages = sorted({0, 10, total_pages // 4, total_pages // 2, total_pages - 1})
+        print(f"rows={args.rows} limit={args.limit}")
+        print(f"{'page':>8} {'offset med ms':>14} {'cursor med ms':>14}")
+        for page in pages:
+            offset = page * args.limit
+            cursor = None
+            if offset:
+                # Cursor for page N is the sort key of the last row of page N-1.
+                previous = (
+                    db.query(Expense)
+                    .filter(Expense.user_id == user.id)
+                    .order_by(
+                        Expense.expense_date.desc(),
+                        Expense.created_at.desc(),
+                        Expense.id.desc(),
+                    )
+                    .offset(offset - 1)
+                    .first()
+                )
+                cursor = _encode_cursor(previous)
+
+            offset_stats = timed(lambda: fetch(offset=offset), args.repeat)
+            cursor_stats = timed(lambda: fetch(cursor=cursor), args.repeat)
+            print(
+                f"{page:>8} {offset_stats['median_ms']:>14.2f}"
+                f" {cursor_stats['median_ms']:>14.2f}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
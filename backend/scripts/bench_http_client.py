@@ -0,0 +1,95 @@
+"""
+Compare outbound messages/second with a fresh AsyncClient per call vs the shared client.
+
+    python scripts/bench_http_client.py --messages 500 --concurrency 10
+
+Runs against a local keep-alive stub of the Graph API, so there is no TLS
+handshake in the "before" numbers; against graph.facebook.com the gap is wider.
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from _bench import configure_env
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = json.dumps({"messages": [{"id": "wamid.stub"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_stub() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _run(send, messages: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await send("15551234567", f"message {i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(messages)))
+    return messages / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    configure_env()
+
+    import httpx
+
+    from app.services.http_client import close_http_client
+    from app.services.whatsapp import whatsapp_service
+
+    server = _start_stub()
+    whatsapp_service.base_url = f"http://127.0.0.1:{server.server_port}"
+
+    async def send_with_fresh_client(wa_id: str, text: str):
+        # Pre-pooling behaviour: one client (and connection) per message.
+        url = f"{whatsapp_service.base_url}/{whatsapp_service.phone_number_id}/messages"
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.post(url, json={"to": wa_id, "text": {"body": text}})
+            response.raise_for_status()
+
+    async def bench():
+        before = await _run(send_with_fresh_client, args.messages, args.concurrency)
+        after = await _run(whatsapp_service.send_text_message, args.messages, args.concurrency)
+        await close_http_client()
+        return before, after
+
+    try:
+        before, after = asyncio.run(bench())
+    finally:
+        server.shutdown()
+
+    print(f"messages={args.messages} concurrency={args.concurrency}")
+    print(f"fresh client per call: {before:8.1f} msg/s")
+    print(f"shared pooled client:  {after:8.1f} msg/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
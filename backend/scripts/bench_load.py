@@ -0,0 +1,159 @@
+"""
+Load-test the API under uvicorn with concurrent clients.
+
+    python scripts/bench_load.py --concurrency 50 --duration 10
+
+Starts uvicorn (one worker) on a throwaway SQLite DB unless --database-url is
+given, seeds one user with some expenses, then has `--concurrency` clients
+loop over GET /api/expenses, PATCH /api/expenses/{id} and GET /api/profile
+for `--duration` seconds. Prints requests/second and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import List
+
+import httpx
+
+from _bench import configure_env
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _seed(expenses: int):
+    from app.api.routes.auth import _create_jwt
+    from app.db import SessionLocal, engine
+    from app.models import Base, Expense, User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = User(whatsapp_id="15550001111", name="Load")
+        db.add(user)
+        db.flush()
+        records = [
+            Expense(
+                user_id=user.id,
+                amount=Decimal("5.00") + i,
+                currency="USD",
+                category="food",
+                merchant=f"Shop {i}",
+                expense_date=date(2025, 1, 1) + timedelta(days=i % 90),
+            )
+            for i in range(expenses)
+        ]
+        db.add_all(records)
+        db.commit()
+        return _create_jwt(str(user.id)), [str(r.id) for r in records[:20]]
+
+
+async def _wait_ready(base_url: str, proc: subprocess.Popen) -> None:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            if proc.poll() is not None:
+                raise SystemExit("uvicorn exited during startup")
+            try:
+                await client.get("/docs")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise SystemExit("uvicorn did not start")
+
+
+async def _load(base_url: str, token: str, expense_ids: List[str], args) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=args.concurrency)
+    deadline = time.perf_counter() + args.duration
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+
+        async def worker(n: int) -> None:
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                i += 1
+                start = time.perf_counter()
+                try:
+                    if i % 10 == 0:
+                        res = await client.patch(
+                            f"/api/expenses/{expense_ids[i % len(expense_ids)]}",
+                            json={"notes": f"load {i}"},
+                        )
+                    elif i % 5 == 0:
+                        res = await client.get("/api/profile")
+                    else:
+                        res = await client.get("/api/expenses", params={"limit": 20})
+                    ok = res.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append((time.perf_counter() - start) * 1000)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"concurrency={args.concurrency} requests={len(latencies)} errors={errors}"
+        f"  {len(latencies) / elapsed:7.1f} req/s"
+        f"  p50={statistics.median(latencies):6.1f} ms"
+        f"  p95={latencies[int(len(latencies) * 0.95)]:6.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--expenses", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout (s)")
+    parser.add_argument("--database-url", default="")
+    args = parser.parse_args()
+
+    configure_env(args.database_url)
+    token, expense_ids = _seed(args.expenses)
+
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)]
+        + ["--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(_wait_ready(base_url, proc))
+        asyncio.run(_load(base_url, token, expense_ids, args))
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            # A server whose event loop is stuck in a blocking call ignores SIGTERM.
+            proc.kill()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
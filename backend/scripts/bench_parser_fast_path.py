@@ -0,0 +1,79 @@
+"""
+Report how much of the labelled corpus the local fast path handles and the latency saved.
+
+    python scripts/bench_parser_fast_path.py --external-latency-ms 900
+
+The external parser is replaced by a stub that sleeps for the given latency
+(roughly a Bedrock round-trip) and returns the corpus label, so the numbers
+show what skipping it is worth without calling AWS.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from _bench import configure_env
+
+CORPUS = Path(__file__).resolve().parents[1] / "tests" / "data" / "parser_corpus.jsonl"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--external-latency-ms", type=float, default=900.0)
+    parser.add_argument("--corpus", default=str(CORPUS))
+    args = parser.parse_args()
+
+    configure_env()
+
+    from app.core.config import settings
+    from app.services import text_parser
+
+    with open(args.corpus, encoding="utf-8") as fh:
+        corpus = [json.loads(line) for line in fh if line.strip()]
+    labels = {item["text"]: item for item in corpus}
+    external_calls = []
+
+    async def stub_external(message, reference_date=None):
+        external_calls.append(message)
+        await asyncio.sleep(args.external_latency_ms / 1000)
+        item = labels[message]
+        return {
+            "amount": item["amount"],
+            "currency": item["currency"],
+            "expense_date": None,
+            "category": item["category"],
+            "merchant": None,
+            "notes": message,
+        }
+
+    text_parser.call_external_text_parser = stub_external
+
+    async def run():
+        correct = 0
+        start = time.perf_counter()
+        for item in corpus:
+            parsed = await text_parser.parse_expense_text(item["text"])
+            correct += (
+                parsed["amount"] == Decimal(str(item["amount"]))
+                and parsed["currency"] == item["currency"]
+                and parsed["category"] == item["category"]
+            )
+        return correct, time.perf_counter() - start
+
+    correct, elapsed = asyncio.run(run())
+    total = len(corpus)
+    local = total - len(external_calls)
+    baseline = total * args.external_latency_ms / 1000
+
+    print(f"threshold={settings.local_parser_confidence_threshold} messages={total}")
+    print(f"handled locally:  {local}/{total} ({local / total:.0%})")
+    print(f"accuracy:         {correct}/{total}")
+    print(f"total latency:    {elapsed:.2f}s vs {baseline:.2f}s all-external")
+    print(f"saved per msg:    {(baseline - elapsed) / total * 1000:.0f} ms on average")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Measure local parser throughput on the labelled corpus and on a long message.
+
+    python scripts/bench_parser_throughput.py --rounds 50 --min-rate 5000
+
+Exits non-zero when --min-rate is given and either rate falls below it (the
+long message gets a tenth of the floor), so it can gate a dedicated
+benchmark job without making the unit tests timing-sensitive.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from _bench import configure_env
+
+CORPUS = Path(__file__).resolve().parents[1] / "tests" / "data" / "parser_corpus.jsonl"
+LONG_MESSAGE = " ".join(["nothing relevant here"] * 50 + ["supermarket"])
+
+
+def _messages_per_second(fn, messages, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            fn(message)
+    return rounds * len(messages) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=str(CORPUS))
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--min-rate", type=float, default=0.0, help="messages/s floor")
+    args = parser.parse_args()
+
+    configure_env()
+
+    from app.services import text_parser
+
+    with open(args.corpus, encoding="utf-8") as fh:
+        messages = [json.loads(line)["text"] for line in fh if line.strip()]
+
+    corpus_rate = _messages_per_second(text_parser._parse_local, messages, args.rounds)
+    long_rate = _messages_per_second(text_parser._parse_local, [LONG_MESSAGE], args.rounds * 10)
+    print(f"_parse_local corpus:       {corpus_rate:>10,.0f} messages/s")
+    print(f"_parse_local long message: {long_rate:>10,.0f} messages/s")
+
+    if args.min_rate and (corpus_rate < args.min_rate or long_rate < args.min_rate / 10):
+        print(f"below the {args.min_rate:,.0f} messages/s floor", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
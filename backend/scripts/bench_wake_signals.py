@@ -0,0 +1,115 @@
+"""
+Count env manager invocations and SSM writes for a synthetic request stream.
+
+    python scripts/bench_wake_signals.py --rate 5 --minutes 60 --containers 4
+
+Replays Poisson-distributed requests, spread over warm API/webhook
+containers, through app.services.activity and the env manager with stubbed
+AWS clients on a simulated clock. It runs once with every request
+signalling and writing (no debounce) and once with the given intervals.
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+import _bench  # noqa: F401 - puts backend/ on sys.path
+
+from app.lambda_handlers import env_manager
+from app.services import activity
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class _SSM:
+    class exceptions:
+        class ParameterNotFound(Exception):
+            pass
+
+    def __init__(self, state):
+        self.value = json.dumps(state)
+        self.puts = 0
+
+    def get_parameter(self, Name):
+        return {"Parameter": {"Value": self.value}}
+
+    def put_parameter(self, Name, Type, Value, Overwrite):
+        self.value = Value
+        self.puts += 1
+
+
+class _EnvManagerFunction:
+    """Stands in for the Lambda client: runs the env manager in-process."""
+
+    def __init__(self):
+        self.invocations = 0
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        self.invocations += 1
+        env_manager.lambda_handler(json.loads(Payload), None)
+
+
+def simulate(args, signal_interval: float, write_interval: float) -> Tuple[int, int, int]:
+    """Return (requests, env manager invocations, SSM writes)."""
+    clock = _Clock()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    ssm = _SSM({"state": "active", "lastActivityAt": start.isoformat()})
+    target = _EnvManagerFunction()
+
+    activity.time = clock
+    activity._lambda_client = lambda: target
+    activity.ENABLE_AUTO_SLEEP = True
+    activity.ENV_MANAGER_FUNCTION_NAME = "env-manager"
+    activity.WAKE_SIGNAL_INTERVAL_SECONDS = signal_interval
+    env_manager.get_client = lambda service: ssm
+    env_manager.ENV_STATE_SSM_PARAMETER_NAME = "/bench/env_state"
+    env_manager.ACTIVITY_WRITE_INTERVAL_SECONDS = write_interval
+    env_manager._now = lambda: start + timedelta(seconds=clock.now)
+
+    rng = random.Random(args.seed)
+    # Each warm container keeps its own debounce timestamp.
+    last_signal: List[Optional[float]] = [None] * args.containers
+    requests = 0
+    while True:
+        clock.now += rng.expovariate(args.rate)
+        if clock.now > args.minutes * 60:
+            break
+        container = rng.randrange(args.containers)
+        activity._last_signal_at = last_signal[container]
+        activity.signal_activity("bench")
+        last_signal[container] = activity._last_signal_at
+        requests += 1
+    return requests, target.invocations, ssm.puts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=5.0, help="requests per second")
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--containers", type=int, default=4)
+    parser.add_argument("--signal-interval", type=float, default=60.0)
+    parser.add_argument("--write-interval", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    baseline = simulate(args, 0.0, 0.0)
+    debounced = simulate(args, args.signal_interval, args.write_interval)
+    print(f"{'':<12} {'requests':>9} {'invokes':>9} {'ssm puts':>9}")
+    for label, (requests, invokes, puts) in (("every req", baseline), ("debounced", debounced)):
+        print(f"{label:<12} {requests:>9} {invokes:>9} {puts:>9}")
+    print(
+        f"invocations -{1 - debounced[1] / baseline[1]:.1%}, "
+        f"SSM writes -{1 - debounced[2] / baseline[2]:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
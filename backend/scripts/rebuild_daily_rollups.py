@@ -0,0 +1,44 @@
+"""
+Recompute daily_expense_rollups from the expenses table.
+
+    python scripts/rebuild_daily_rollups.py                      # every user
+    python scripts/rebuild_daily_rollups.py --whatsapp-id <wa_id>  # one user
+
+Rollups are normally maintained on every ORM write; run this after bulk SQL
+changes to expenses, or to repair drift. Each run is one transaction.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.db import SessionLocal
+from app.models import User
+from app.services.rollups import rebuild_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--whatsapp-id", help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id = None
+        if args.whatsapp_id:
+            user = db.query(User).filter(User.whatsapp_id == args.whatsapp_id).first()
+            if not user:
+                raise SystemExit("User not found")
+            user_id = user.id
+
+        rows = rebuild_rollups(db, user_id)
+        db.commit()
+        print(f"Rebuilt {rows} rollup row(s).")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
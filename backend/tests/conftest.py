@@ -17,6 +17,7 @@ os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret")
 os.environ.setdefault("JWT_ALGORITHM", "HS256")
 os.environ.setdefault("EXTERNAL_TEXT_PARSER_URL", "http://localhost:9999/parser")
 os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
 
 from app.db import SessionLocal, engine, get_db
 from app.main import app
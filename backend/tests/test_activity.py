@@ -0,0 +1,42 @@
+import json
+
+from app.services import activity
+
+
+class StubLambda:
+    def __init__(self):
+        self.invokes = []
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        self.invokes.append((FunctionName, InvocationType, json.loads(Payload)))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_signal_activity_is_debounced_per_container(monkeypatch):
+    stub, clock = StubLambda(), FakeClock()
+    monkeypatch.setattr(activity, "_lambda_client", lambda: stub)
+    monkeypatch.setattr(activity, "time", clock)
+    monkeypatch.setattr(activity, "_last_signal_at", None)
+    monkeypatch.setattr(activity, "ENABLE_AUTO_SLEEP", True)
+    monkeypatch.setattr(activity, "ENV_MANAGER_FUNCTION_NAME", "wa-env-manager")
+    monkeypatch.setattr(activity, "WAKE_SIGNAL_INTERVAL_SECONDS", 60)
+
+    sent = []
+    for second in range(0, 150, 5):
+        clock.now = 1000.0 + second
+        sent.append(activity.signal_activity("API"))
+
+    assert sent.count(True) == 3  # t=0, 60, 120
+    assert stub.invokes[0] == ("wa-env-manager", "Event", {"action": "wakeOnDemand"})
+
+
+def test_signal_activity_is_off_without_auto_sleep(monkeypatch):
+    monkeypatch.setattr(activity, "ENABLE_AUTO_SLEEP", False)
+    assert activity.signal_activity("webhook") is False
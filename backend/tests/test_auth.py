@@ -1,7 +1,14 @@
+import json
+import time
 from datetime import datetime, timedelta, timezone
 
+import jwt
+
 from app.api.routes.auth import _create_jwt, _create_refresh_token
+from app.core.config import settings
 from app.models import LoginToken, User
+from app.services import auth as auth_service
+from app.services.cache import LRUCache
 
 
 def test_verify_code_returns_tokens(client, db_session):
@@ -36,8 +43,78 @@ def test_refresh_tokens_rotates(client, db_session):
     db_session.refresh(user)
 
     refresh_token = _create_refresh_token(user.id, db_session)
+    db_session.commit()
     res = client.post("/auth/refresh", json={"refresh_token": refresh_token})
     assert res.status_code == 200
     data = res.json()
     assert "access_token" in data
     assert "refresh_token" in data
+
+
+def _access_headers(db_session, monkeypatch):
+    monkeypatch.setattr(auth_service, "_token_cache", LRUCache(max_entries=16))
+    user = User(whatsapp_id="15553330000")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user, {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+
+
+def test_access_token_claims_are_cached(client, db_session, monkeypatch):
+    _, headers = _access_headers(db_session, monkeypatch)
+    decodes = []
+    real_decode = auth_service.jwt.decode
+    monkeypatch.setattr(
+        auth_service.jwt, "decode", lambda *a, **kw: decodes.append(1) or real_decode(*a, **kw)
+    )
+
+    for _ in range(3):
+        assert client.get("/api/profile", headers=headers).status_code == 200
+    assert len(decodes) == 1
+
+
+def test_cached_token_rejected_after_exp(client, db_session, monkeypatch):
+    _, headers = _access_headers(db_session, monkeypatch)
+    assert client.get("/api/profile", headers=headers).status_code == 200
+
+    later = time.time() + settings.access_token_expiry_minutes * 60 + 1
+    monkeypatch.setattr(auth_service.time, "time", lambda: later)
+    res = client.get("/api/profile", headers=headers)
+    assert res.status_code == 401
+    assert res.json()["detail"] == "Invalid token"
+
+
+def test_cached_claims_are_json_and_nbf_is_rechecked(client, db_session, monkeypatch):
+    user, _ = _access_headers(db_session, monkeypatch)
+    now = time.time()
+    token = jwt.encode(
+        {"sub": str(user.id), "nbf": int(now) - 5, "exp": int(now) + 60},
+        settings.jwt_secret_key,
+        algorithm=settings.jwt_algorithm,
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/profile", headers=headers).status_code == 200
+    (raw,) = [value for _, value in auth_service._token_cache._entries.values()]
+    assert isinstance(raw, str) and json.loads(raw)["sub"] == str(user.id)
+
+    monkeypatch.setattr(auth_service.time, "time", lambda: now - 60)
+    assert client.get("/api/profile", headers=headers).status_code == 401
+
+
+def test_expired_and_tampered_tokens_rejected(client, db_session, monkeypatch):
+    user, headers = _access_headers(db_session, monkeypatch)
+    assert client.get("/api/profile", headers=headers).status_code == 200
+
+    token = headers["Authorization"].split(" ", 1)[1]
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, ("A" if signature[0] != "A" else "B") + signature[1:]])
+    res = client.get("/api/profile", headers={"Authorization": f"Bearer {tampered}"})
+    assert res.status_code == 401
+
+    expired = jwt.encode(
+        {"sub": str(user.id), "exp": datetime.now(timezone.utc) - timedelta(seconds=1)},
+        settings.jwt_secret_key,
+        algorithm=settings.jwt_algorithm,
+    )
+    res = client.get("/api/profile", headers={"Authorization": f"Bearer {expired}"})
+    assert res.status_code == 401
@@ -1,9 +1,9 @@
 from datetime import date
-from decimal import Decimal
 
-from app.models import Expense, User
+from app.models import User
 from app.services.currency import resolve_currency
-from app.services.limits import daily_limit_for_user, has_reached_daily_limit
+from app.services.limits import daily_limit_for_user
+from app.services.quota import consume_daily_quota
 
 
 def test_currency_resolve_uses_parsed_and_sets_default(db_session):
@@ -12,9 +12,12 @@ def test_currency_resolve_uses_parsed_and_sets_default(db_session):
     db_session.commit()
     db_session.refresh(user)
 
-    resolved = resolve_currency(db_session, user, "eur", user.whatsapp_id)
+    resolved = resolve_currency(user, "eur", user.whatsapp_id)
     assert resolved == "EUR"
+    # Resolution only marks the user dirty; the caller owns the commit.
+    assert user in db_session.dirty
 
+    db_session.commit()
     db_session.refresh(user)
     assert user.default_currency == "EUR"
 
@@ -24,7 +27,7 @@ def test_currency_resolve_uses_existing_default(db_session):
     db_session.add(user)
     db_session.commit()
 
-    resolved = resolve_currency(db_session, user, None, user.whatsapp_id)
+    resolved = resolve_currency(user, None, user.whatsapp_id)
     assert resolved == "JPY"
 
 
@@ -34,7 +37,7 @@ def test_currency_resolve_falls_back_to_wa_id(db_session):
     db_session.commit()
     db_session.refresh(user)
 
-    resolved = resolve_currency(db_session, user, None, user.whatsapp_id)
+    resolved = resolve_currency(user, None, user.whatsapp_id)
     assert resolved == "INR"
 
 
@@ -48,26 +51,14 @@ def test_daily_limit_for_user(db_session):
     assert daily_limit_for_user(premium_user) == 50
 
 
-def test_has_reached_daily_limit(db_session):
+def test_daily_limit_is_enforced_by_quota(db_session):
     user = User(whatsapp_id="15550003333", is_premium=False)
     db_session.add(user)
     db_session.commit()
     db_session.refresh(user)
 
-    for _ in range(10):
-        expense = Expense(
-            user_id=user.id,
-            amount=Decimal("1.00"),
-            currency="USD",
-            category="food",
-            merchant="Cafe",
-            notes="Test",
-            expense_date=date.today(),
-        )
-        db_session.add(expense)
-    db_session.commit()
-
-    assert has_reached_daily_limit(db_session, user, date.today())
+    assert all(consume_daily_quota(db_session, user, date.today()) for _ in range(10))
+    assert not consume_daily_quota(db_session, user, date.today())
 
 
 def test_admin_toggle_premium(client, db_session):
@@ -95,3 +86,13 @@ def test_admin_requires_token(client, db_session):
         json={"is_premium": True},
     )
     assert res.status_code == 403
+
+
+def test_admin_stats_reports_pool_and_caches(client):
+    res = client.get("/api/admin/stats", headers={"X-Admin-Token": "test-admin-key"})
+    assert res.status_code == 200
+    data = res.json()
+    assert data["db_pool"]["sync"]["checkouts"] >= 1
+    assert {"user_cache", "parse_cache"} <= set(data)
+
+    assert client.get("/api/admin/stats").status_code == 403
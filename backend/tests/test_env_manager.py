@@ -0,0 +1,170 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.lambda_handlers import env_manager
+
+
+class StubSSM:
+    class exceptions:
+        class ParameterNotFound(Exception):
+            pass
+
+    def __init__(self, state=None):
+        self.value = json.dumps(state) if state is not None else None
+        self.puts = 0
+
+    def get_parameter(self, Name):
+        if self.value is None:
+            raise self.exceptions.ParameterNotFound()
+        return {"Parameter": {"Value": self.value}}
+
+    def put_parameter(self, Name, Type, Value, Overwrite):
+        self.value = Value
+        self.puts += 1
+
+    @property
+    def state(self):
+        return json.loads(self.value)
+
+
+class StubRDS:
+    class exceptions:
+        class InvalidDBInstanceStateFault(Exception):
+            pass
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.starts = 0
+
+    def start_db_instance(self, DBInstanceIdentifier):
+        self.starts += 1
+
+    def stop_db_instance(self, DBInstanceIdentifier):
+        pass
+
+    def describe_db_instances(self, DBInstanceIdentifier):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return {"DBInstances": [{"DBInstanceStatus": status}]}
+
+
+class StubLambda:
+    def __init__(self):
+        self.mappings = []
+        self.invokes = []
+
+    def update_event_source_mapping(self, UUID, Enabled):
+        self.mappings.append((UUID, Enabled))
+
+    def invoke(self, FunctionName, InvocationType, Payload):
+        self.invokes.append((FunctionName, InvocationType, json.loads(Payload)))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    clients = SimpleNamespace(ssm=StubSSM(), rds=StubRDS(["available"]), lambda_=StubLambda())
+    monkeypatch.setattr(
+        env_manager,
+        "get_client",
+        lambda service: getattr(clients, "lambda_" if service == "lambda" else service),
+    )
+    monkeypatch.setattr(env_manager, "time", FakeClock())
+    monkeypatch.setattr(env_manager, "DB_INSTANCE_IDENTIFIER", "wa-db")
+    monkeypatch.setattr(env_manager, "INBOUND_MAPPING_UUID", "in-uuid")
+    monkeypatch.setattr(env_manager, "OUTBOUND_MAPPING_UUID", "out-uuid")
+    monkeypatch.setattr(env_manager, "ENV_STATE_SSM_PARAMETER_NAME", "/wa/env_state")
+    monkeypatch.setattr(env_manager, "ENABLE_AUTO_SLEEP", True)
+    return clients
+
+
+def _context(remaining_seconds=900):
+    return SimpleNamespace(
+        function_name="wa-env-manager",
+        get_remaining_time_in_millis=lambda: remaining_seconds * 1000,
+    )
+
+
+def test_wake_starts_db_and_hands_off_polling(aws):
+    aws.ssm = StubSSM({"state": "sleeping", "lastActivityAt": "2025-01-01T00:00:00+00:00"})
+
+    env_manager.lambda_handler({"action": "wakeOnDemand"}, _context())
+
+    assert aws.rds.starts == 1
+    assert aws.ssm.state["state"] == "waking"
+    assert aws.lambda_.invokes == [("wa-env-manager", "Event", {"action": "pollWake"})]
+    # Workers stay paused until the DB is confirmed available.
+    assert aws.lambda_.mappings == []
+    assert env_manager.time.sleeps == []
+
+
+def test_poll_wake_backs_off_until_available(aws):
+    aws.ssm = StubSSM({"state": "waking", "wakeStartedAt": env_manager._now_iso()})
+    aws.rds = StubRDS(["starting", "starting", "starting", "available"])
+
+    env_manager.lambda_handler({"action": "pollWake"}, _context())
+
+    assert env_manager.time.sleeps == [5, 10, 20]
+    assert aws.lambda_.mappings == [("in-uuid", True), ("out-uuid", True)]
+    assert aws.ssm.state["state"] == "active"
+    assert "wakePollAttempts" not in aws.ssm.state
+    assert aws.lambda_.invokes == []
+
+
+def test_poll_wake_reinvokes_when_budget_runs_out(aws, monkeypatch):
+    monkeypatch.setattr(env_manager, "WAKE_POLL_BUDGET_SECONDS", 60)
+    aws.ssm = StubSSM({"state": "waking", "wakeStartedAt": env_manager._now_iso()})
+    aws.rds = StubRDS(["starting"])
+
+    env_manager.lambda_handler({"action": "pollWake"}, _context())
+
+    assert env_manager.time.sleeps == [5, 10, 20]
+    assert aws.ssm.state["state"] == "waking"
+    assert aws.ssm.state["wakePollAttempts"] == 4
+    assert aws.lambda_.invokes == [("wa-env-manager", "Event", {"action": "pollWake"})]
+    assert aws.lambda_.mappings == []
+
+
+def test_poll_wake_restarts_a_db_that_was_still_stopping(aws):
+    aws.ssm = StubSSM({"state": "waking", "wakeStartedAt": env_manager._now_iso()})
+    aws.rds = StubRDS(["stopped", "starting", "available"])
+
+    env_manager.lambda_handler({"action": "pollWake"}, _context())
+
+    assert aws.rds.starts == 1
+    assert aws.ssm.state["state"] == "active"
+
+
+def test_evaluate_idle_finishes_a_stalled_wake(aws):
+    aws.ssm = StubSSM({"state": "waking", "wakeStartedAt": "2025-01-01T00:00:00+00:00"})
+
+    env_manager.lambda_handler({"action": "evaluateIdle"}, _context())
+
+    assert aws.ssm.state["state"] == "active"
+    assert aws.lambda_.mappings == [("in-uuid", True), ("out-uuid", True)]
+
+
+def test_wake_on_active_env_batches_activity_writes(aws):
+    aws.ssm = StubSSM({"state": "active", "lastActivityAt": env_manager._now_iso()})
+
+    for _ in range(5):
+        env_manager.lambda_handler({"action": "wakeOnDemand"}, _context())
+    assert aws.ssm.puts == 0
+
+    aws.ssm = StubSSM({"state": "active", "lastActivityAt": "2025-01-01T00:00:00+00:00"})
+    env_manager.lambda_handler({"action": "wakeOnDemand"}, _context())
+    assert aws.ssm.puts == 1
+    assert aws.ssm.state["lastActivityAt"] > "2025-01-01T00:00:00+00:00"
@@ -0,0 +1,174 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.api.routes.auth import _create_jwt
+from app.models import DailyExpenseRollup, Expense, User
+
+
+def _user(db_session, wa_id="15551230000"):
+    user = User(whatsapp_id=wa_id, default_currency="EUR")
+    db_session.add(user)
+    db_session.commit()
+    return user, {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+
+
+def _chunked(body: bytes, size: int = 7):
+    for i in range(0, len(body), size):
+        yield body[i : i + size]
+
+
+def test_import_csv_streams_rows_and_reports_errors(client, db_session):
+    user, headers = _user(db_session)
+    body = (
+        "﻿Amount,expense_date,category,merchant,notes\r\n"
+        '12.50,2025-03-03,Food,Cafe,"Latte,\r\nwith ""oat"" milk"\r\n'
+        "abc,2025-03-03,food,Cafe,\r\n"
+        "\r\n"
+        "4,2025-03-04,,Deli,\r\n"
+        "5,03/04/2025,food,Deli,\r\n"
+        "1,2025-03-04\r\n"
+    ).encode("utf-8")
+
+    res = client.post(
+        "/api/expenses/import",
+        content=_chunked(body),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+
+    assert res.status_code == 200
+    data = res.json()
+    assert data["imported"] == 2
+    assert data["invalid"] == 3
+    assert data["over_limit"] == 0
+    assert data["errors"] == [
+        {"line": 4, "error": "amount is not a number"},
+        {"line": 7, "error": "expense_date must be YYYY-MM-DD"},
+        {"line": 8, "error": "expected 5 columns, got 2"},
+    ]
+
+    db_session.expire_all()
+    rows = db_session.execute(select(Expense).order_by(Expense.amount)).scalars().all()
+    assert [(r.amount, r.currency, r.category) for r in rows] == [
+        (Decimal("4.00"), "EUR", None),
+        (Decimal("12.50"), "EUR", "food"),
+    ]
+    assert rows[1].notes == 'Latte,\r\nwith "oat" milk'
+
+    rollups = db_session.execute(select(DailyExpenseRollup)).scalars().all()
+    assert {(r.expense_date, r.count) for r in rollups} == {
+        (date(2025, 3, 3), 1),
+        (date(2025, 3, 4), 1),
+    }
+
+
+def test_import_rejects_amounts_that_do_not_fit_two_decimals(client, db_session):
+    _, headers = _user(db_session)
+    body = b"amount,expense_date\n1e30,2025-03-03\n1e-9,2025-03-03\n0.004,2025-03-03\n1e2,2025-03-03\n"
+
+    res = client.post(
+        "/api/expenses/import",
+        content=body,
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+
+    assert res.status_code == 200
+    data = res.json()
+    assert data["imported"] == 1
+    assert data["errors"] == [
+        {"line": 2, "error": "amount is not a number"},
+        {"line": 3, "error": "amount must be greater than zero"},
+        {"line": 4, "error": "amount must be greater than zero"},
+    ]
+    db_session.expire_all()
+    assert db_session.execute(select(Expense.amount)).scalars().all() == [Decimal("100.00")]
+
+
+def test_import_ndjson_applies_daily_limit_per_day(client, db_session):
+    user, headers = _user(db_session)
+    lines = [
+        json.dumps({"amount": i + 1, "expense_date": "2025-03-03", "currency": "usd"})
+        for i in range(12)
+    ]
+    lines.append(json.dumps({"amount": 3, "expense_date": "2025-03-04"}))
+    lines.append("[1, 2]")
+    lines.append("{not json")
+
+    res = client.post(
+        "/api/expenses/import",
+        content="\n".join(lines).encode("utf-8"),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+
+    assert res.status_code == 200
+    data = res.json()
+    assert data["imported"] == 11
+    assert data["over_limit"] == 2
+    assert data["invalid"] == 2
+    assert [e["line"] for e in data["errors"]] == [14, 15]
+
+    res = client.get("/api/expenses/summary?start=2025-03-01&end=2025-03-05&period=day", headers=headers)
+    days = {row["period_start"]: row["count"] for row in res.json()["items"]}
+    assert days == {"2025-03-03": 10, "2025-03-04": 1}
+
+
+def test_import_keeps_records_apart_around_stray_quotes(client, db_session):
+    _, headers = _user(db_session)
+    lines = [json.dumps({"amount": i + 1, "expense_date": "2025-03-03"}) for i in range(5)]
+    lines[1] = json.dumps({"amount": 2, "expense_date": "2025-03-03", "notes": '5" screen'})
+    lines.insert(3, "{not json")
+
+    res = client.post(
+        "/api/expenses/import",
+        content=_chunked("\n".join(lines).encode("utf-8")),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert res.json()["imported"] == 5
+    assert res.json()["errors"] == [{"line": 4, "error": "invalid JSON"}]
+
+    body = (
+        "amount,expense_date,notes\n"
+        '1,2025-03-04,5" screen\n'
+        '2,2025-03-04,"two\nlines"\n'
+        '3,2025-03-04,"unclosed\n'
+    ).encode("utf-8")
+    res = client.post(
+        "/api/expenses/import",
+        content=_chunked(body),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert res.json()["imported"] == 2
+    assert res.json()["errors"] == [{"line": 5, "error": "unterminated quoted field"}]
+    db_session.expire_all()
+    query = select(Expense.notes).where(Expense.expense_date == date(2025, 3, 4))
+    notes = db_session.execute(query.order_by(Expense.amount)).scalars().all()
+    assert notes == ['5" screen', "two\nlines"]
+
+
+def test_import_rejects_bad_header_and_unknown_type(client, db_session):
+    _, headers = _user(db_session)
+
+    res = client.post(
+        "/api/expenses/import",
+        content=b"amount,merchant\n1,Cafe\n",
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert res.status_code == 400
+    assert "expense_date" in res.json()["detail"]
+
+    res = client.post(
+        "/api/expenses/import",
+        content=b"amount,expense_date\n1,2025-03-03\n",
+        headers={**headers, "Content-Type": "application/octet-stream"},
+    )
+    assert res.status_code == 415
+
+    res = client.post(
+        "/api/expenses/import?format=csv",
+        content=b"amount,expense_date\n1,2025-03-03\n",
+        headers={**headers, "Content-Type": "application/octet-stream"},
+    )
+    assert res.status_code == 200
+    assert res.json()["imported"] == 1
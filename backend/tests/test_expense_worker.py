@@ -0,0 +1,118 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.lambda_handlers import expense_worker
+from app.models import DailyExpenseQuota, Expense, User
+
+
+def _record(message_id, body):
+    return {"messageId": message_id, "body": json.dumps(body)}
+
+
+def _expense_body(wa_id, amount=12.5, expense_date=None):
+    return {
+        "type": "expense",
+        "wa_id": wa_id,
+        "expense": {
+            "amount": amount,
+            "currency": "USD",
+            "category": "food",
+            "merchant": "Cafe",
+            "notes": "Latte",
+            "expense_date": (expense_date or date.today()).isoformat(),
+        },
+    }
+
+
+def test_worker_batch_persists_and_reports_failures(db_session, monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        expense_worker, "enqueue_outbound_text", lambda wa_id, text: sent.append((wa_id, text))
+    )
+
+    existing = User(whatsapp_id="15550001111")
+    db_session.add(existing)
+    db_session.commit()
+
+    event = {
+        "Records": [
+            _record("m1", _expense_body("15550001111")),
+            _record("m2", _expense_body("15550002222", amount=3)),
+            {"messageId": "m3", "body": "{not json"},
+            _record("m4", _expense_body("15550002222", amount=0)),
+        ]
+    }
+    res = expense_worker.lambda_handler(event, None)
+
+    assert res == {"batchItemFailures": [{"itemIdentifier": "m3"}]}
+    assert db_session.query(Expense).count() == 2
+    assert db_session.query(User).filter(User.whatsapp_id == "15550002222").count() == 1
+    assert ("15550001111", "Recorded expense: 12.50 USD for Cafe on %s." % date.today()) in sent
+    assert any("valid amount" in text for wa_id, text in sent if wa_id == "15550002222")
+
+
+def test_worker_batch_enforces_daily_limit_within_batch(db_session, monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        expense_worker, "enqueue_outbound_text", lambda wa_id, text: sent.append((wa_id, text))
+    )
+
+    user = User(whatsapp_id="15550003333", is_premium=False)
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    for _ in range(9):
+        db_session.add(
+            Expense(
+                user_id=user.id,
+                amount=Decimal("1.00"),
+                currency="USD",
+                expense_date=date.today(),
+            )
+        )
+    # Quota counters track accepted messages, as seeded by the migration.
+    db_session.add(DailyExpenseQuota(user_id=user.id, quota_date=date.today(), used=9))
+    db_session.commit()
+
+    event = {
+        "Records": [
+            _record("m1", _expense_body("15550003333")),
+            _record("m2", _expense_body("15550003333")),
+        ]
+    }
+    res = expense_worker.lambda_handler(event, None)
+
+    assert res == {"batchItemFailures": []}
+    assert db_session.query(Expense).filter(Expense.user_id == user.id).count() == 10
+    assert "daily limit of 10" in sent[-1][1]
+
+
+def test_worker_record_writes_user_and_expense_in_one_commit(db_session, monkeypatch):
+    from sqlalchemy import event
+
+    from app.db import engine
+
+    monkeypatch.setattr(expense_worker, "enqueue_outbound_text", lambda wa_id, text: None)
+    statements = []
+    commits = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        expense_worker._handle_record(db_session, _expense_body("919876543210"))
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+
+    # SELECT user, INSERT user, rollup read for the daily limit,
+    # UPDATE inferred default currency, INSERT expense, rollup upsert.
+    assert len(statements) == 6
+    assert len(commits) == 1
+    assert db_session.query(User).one().default_currency == "USD"
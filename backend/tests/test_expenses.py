@@ -1,8 +1,11 @@
+import csv
+import io
+import json
 from datetime import date
 from decimal import Decimal
 
 from app.api.routes.auth import _create_jwt
-from app.models import Expense, User
+from app.models import DailyExpenseQuota, Expense, User
 
 
 def test_list_expenses(client, db_session):
@@ -63,3 +66,233 @@ def test_update_expense(client, db_session):
     data = res.json()
     assert data["amount"] == 25.5
     assert data["merchant"] == "New Deli"
+
+
+def test_update_expense_date_moves_its_quota_slot(client, db_session):
+    user = User(whatsapp_id="17776664444")
+    db_session.add(user)
+    db_session.commit()
+    expense = Expense(
+        user_id=user.id, amount=Decimal("5.00"), currency="USD", expense_date=date(2025, 3, 1)
+    )
+    db_session.add_all(
+        [
+            expense,
+            DailyExpenseQuota(user_id=user.id, quota_date=date(2025, 3, 1), used=1),
+            DailyExpenseQuota(user_id=user.id, quota_date=date(2025, 3, 2), used=10),
+        ]
+    )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+
+    res = client.patch(
+        f"/api/expenses/{expense.id}", json={"expense_date": "2025-03-02"}, headers=headers
+    )
+    assert res.status_code == 400
+    assert "2025-03-02" in res.json()["detail"]
+
+    res = client.patch(
+        f"/api/expenses/{expense.id}", json={"expense_date": "2025-03-03"}, headers=headers
+    )
+    assert res.status_code == 200
+    db_session.expire_all()
+    used = {q.quota_date.day: q.used for q in db_session.query(DailyExpenseQuota)}
+    assert used == {1: 0, 2: 10, 3: 1}
+
+
+def test_list_expenses_cursor_pagination(client, db_session):
+    user = User(whatsapp_id="16665554444")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+
+    for day in range(1, 6):
+        db_session.add(
+            Expense(
+                user_id=user.id,
+                amount=Decimal(day),
+                currency="USD",
+                category="food",
+                merchant=f"Cafe {day}",
+                notes="Latte",
+                expense_date=date(2025, 1, day),
+            )
+        )
+    db_session.commit()
+
+    token = _create_jwt(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    seen = []
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get("/api/expenses", headers=headers, params=params)
+        assert res.status_code == 200
+        data = res.json()
+        seen.extend(item["merchant"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == ["Cafe 5", "Cafe 4", "Cafe 3", "Cafe 2", "Cafe 1"]
+    assert cursor is None
+
+    res = client.get("/api/expenses", headers=headers, params={"limit": 2, "offset": 2})
+    assert [item["merchant"] for item in res.json()["items"]] == ["Cafe 3", "Cafe 2"]
+
+    res = client.get("/api/expenses", headers=headers, params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+
+
+def test_expense_summary_groups_in_sql(client, db_session):
+    user = User(whatsapp_id="16665554444")
+    other = User(whatsapp_id="16665553333")
+    db_session.add_all([user, other])
+    db_session.commit()
+
+    rows = [
+        (user, "10.00", "USD", "food", date(2025, 3, 3)),  # Monday
+        (user, "5.25", "USD", "food", date(2025, 3, 9)),  # Sunday, same ISO week
+        (user, "7.00", "USD", "transport", date(2025, 3, 10)),
+        (user, "900", "JPY", "food", date(2025, 3, 10)),
+        (user, "3.00", "USD", "food", date(2025, 4, 1)),
+        (user, "99.00", "USD", "food", date(2025, 5, 1)),  # outside the range
+        (other, "50.00", "USD", "food", date(2025, 3, 3)),
+    ]
+    db_session.add_all(
+        Expense(
+            user_id=owner.id,
+            amount=Decimal(amount),
+            currency=currency,
+            category=category,
+            expense_date=expense_date,
+        )
+        for owner, amount, currency, category, expense_date in rows
+    )
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+    params = {"start": "2025-03-01", "end": "2025-04-30"}
+
+    res = client.get(
+        "/api/expenses/summary", params={**params, "period": "month"}, headers=headers
+    )
+    assert res.status_code == 200
+    data = res.json()
+    assert data["truncated"] is False
+    assert [tuple(item.values()) for item in data["items"]] == [
+        ("2025-03-01", "JPY", "food", 900.0, 1),
+        ("2025-03-01", "USD", "food", 15.25, 2),
+        ("2025-03-01", "USD", "transport", 7.0, 1),
+        ("2025-04-01", "USD", "food", 3.0, 1),
+    ]
+
+    res = client.get(
+        "/api/expenses/summary",
+        params={**params, "period": "week", "by_category": "false"},
+        headers=headers,
+    )
+    weeks = [(i["period_start"], i["currency"], i["total"]) for i in res.json()["items"]]
+    assert weeks == [
+        ("2025-03-03", "USD", 15.25),
+        ("2025-03-10", "JPY", 900.0),
+        ("2025-03-10", "USD", 7.0),
+        ("2025-03-31", "USD", 3.0),
+    ]
+
+    res = client.get("/api/expenses/summary", params={**params, "limit": 2}, headers=headers)
+    assert len(res.json()["items"]) == 2
+    assert res.json()["truncated"] is True
+
+    res = client.get(
+        "/api/expenses/summary",
+        params={"start": "2025-05-01", "end": "2025-04-01"},
+        headers=headers,
+    )
+    assert res.status_code == 400
+
+
+def test_export_streams_csv_and_ndjson(client, db_session, monkeypatch):
+    from app.api.routes import expenses as expenses_routes
+
+    monkeypatch.setattr(expenses_routes, "EXPORT_BATCH_ROWS", 2)
+    user = User(whatsapp_id="13334445555")
+    other = User(whatsapp_id="13334446666")
+    db_session.add_all([user, other])
+    db_session.commit()
+    for day, merchant in ((3, "Cafe"), (1, 'Deli, "best"'), (2, "Bakery"), (5, "Bar")):
+        db_session.add(
+            Expense(
+                user_id=user.id,
+                amount=Decimal("3.00") + day,
+                currency="USD",
+                category="food",
+                merchant=merchant,
+                notes="line one\nline two" if day == 1 else None,
+                expense_date=date(2025, 3, day),
+            )
+        )
+    db_session.add(
+        Expense(user_id=other.id, amount=Decimal("1.00"), currency="USD", expense_date=date(2025, 3, 1))
+    )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+
+    res = client.get("/api/expenses/export", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert 'filename="expenses.csv"' in res.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert [r["merchant"] for r in rows] == ['Deli, "best"', "Bakery", "Cafe", "Bar"]
+    assert rows[0]["notes"] == "line one\nline two"
+    assert rows[0]["amount"] == "4.0"
+    assert list(rows[0]) == list(client.get("/api/expenses", headers=headers).json()["items"][0])
+
+    res = client.get(
+        "/api/expenses/export?format=ndjson&start=2025-03-02&end=2025-03-03", headers=headers
+    )
+    assert res.status_code == 200
+    items = [json.loads(line) for line in res.text.splitlines()]
+    assert [i["merchant"] for i in items] == ["Bakery", "Cafe"]
+    assert all(i["user_id"] == str(user.id) for i in items)
+
+
+def test_export_without_expenses_returns_header_only(client, db_session):
+    user = User(whatsapp_id="13334447777")
+    db_session.add(user)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+
+    res = client.get("/api/expenses/export", headers=headers)
+    assert res.status_code == 200
+    assert res.text.startswith("id,user_id,amount,")
+    assert res.text.count("\n") == 1
+
+
+def test_export_on_lambda_refuses_more_rows_than_fit_a_response(client, db_session, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "export_max_rows_lambda", 2)
+    user = User(whatsapp_id="13334448888")
+    db_session.add(user)
+    db_session.commit()
+    for day in (1, 2, 3):
+        db_session.add(
+            Expense(user_id=user.id, amount=Decimal("1.00"), currency="USD", expense_date=date(2025, 3, day))
+        )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+
+    assert client.get("/api/expenses/export", headers=headers).status_code == 200
+
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "waexpense-dev-api")
+    res = client.get("/api/expenses/export", headers=headers)
+    assert res.status_code == 413
+    assert "start/end" in res.json()["detail"]
+
+    res = client.get("/api/expenses/export?start=2025-03-02", headers=headers)
+    assert res.status_code == 200
+    assert res.text.count("\n") == 3
@@ -0,0 +1,46 @@
+import asyncio
+
+from app.services import http_client
+
+
+async def _current_client():
+    return http_client.get_http_client()
+
+
+def test_http_client_reused_across_run_sync_calls():
+    first = http_client.run_sync(_current_client())
+    second = http_client.run_sync(_current_client())
+    assert first is second
+    assert not first.is_closed
+
+    http_client.run_sync(http_client.close_http_client())
+    assert first.is_closed
+    assert http_client.run_sync(_current_client()) is not first
+
+
+def test_http_client_rebuilt_for_a_new_loop():
+    async def scenario():
+        client = http_client.get_http_client()
+        assert http_client.get_http_client() is client
+        return client
+
+    first = asyncio.run(scenario())
+    second = asyncio.run(scenario())
+    assert first is not second
+
+
+def test_http_client_per_loop_is_kept_until_closed_on_its_loop():
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(_current_client())
+        other = asyncio.run(_current_client())
+        assert other is not first
+        assert not first.is_closed
+        assert loop.run_until_complete(_current_client()) is first
+
+        loop.run_until_complete(http_client.close_http_client())
+        assert first.is_closed
+    finally:
+        loop.close()
+    http_client.run_sync(_current_client())
+    assert loop not in http_client._clients
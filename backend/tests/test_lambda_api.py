@@ -0,0 +1,29 @@
+import boto3
+from sqlalchemy import inspect
+
+from app.db import engine
+from app.lambda_handlers import api
+from app.models import Base
+from app.services import aws
+
+
+def test_init_db_action_creates_schema():
+    Base.metadata.drop_all(bind=engine)
+    assert not inspect(engine).has_table("expenses")
+
+    assert api.lambda_handler({"action": "initDb"}, None) == {"status": "ok"}
+    assert inspect(engine).has_table("expenses")
+
+
+def test_get_client_is_created_once_per_config(monkeypatch):
+    created = []
+    monkeypatch.setattr(aws, "_clients", {})
+    monkeypatch.setattr(
+        boto3, "client", lambda service, config=None: created.append((service, config)) or object()
+    )
+
+    first = aws.get_client("lambda", connect_timeout=1)
+    assert aws.get_client("lambda", connect_timeout=1) is first
+    assert aws.get_client("lambda") is not first
+    assert [service for service, _ in created] == ["lambda", "lambda"]
+    assert created[0][1].connect_timeout == 1
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.lambda_handlers import outbound_sender
+from app.services import whatsapp
+
+
+def _record(message_id, wa_id, text="hello"):
+    body = {"type": "send_text", "wa_id": wa_id, "text": text}
+    return {"messageId": message_id, "body": json.dumps(body)}
+
+
+def test_outbound_batch_sends_concurrently_and_reports_failures(monkeypatch):
+    in_flight = 0
+    peak = 0
+    sent = []
+
+    async def fake_send(wa_id, text, raise_retryable=False):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if wa_id == "bad":
+            return None
+        if wa_id == "flaky":
+            raise whatsapp.WhatsAppSendError("503")
+        sent.append(wa_id)
+        return {"messages": [{"id": "wamid"}]}
+
+    monkeypatch.setattr(outbound_sender.whatsapp_service, "send_text_message", fake_send)
+    monkeypatch.setattr(outbound_sender, "_max_concurrency", 3)
+    monkeypatch.setattr(outbound_sender, "_requests_per_second", 0)
+
+    records = [_record(f"m{i}", f"1555000{i}") for i in range(6)]
+    records.append(_record("m-bad", "bad"))
+    records.append(_record("m-flaky", "flaky"))
+    records.append({"messageId": "m-skip", "body": json.dumps({"type": "other"})})
+
+    res = outbound_sender.lambda_handler({"Records": records}, None)
+
+    # Permanent rejections are acknowledged; only transient failures are retried.
+    assert res == {"batchItemFailures": [{"itemIdentifier": "m-flaky"}]}
+    assert len(sent) == 6
+    assert peak == 3
+
+
+def test_send_text_message_raises_only_retryable_errors(monkeypatch):
+    statuses = {"15550000001": 400, "15550000002": 429, "15550000003": 503}
+
+    def respond(request):
+        return httpx.Response(statuses[json.loads(request.content)["to"]])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(respond)) as client:
+            monkeypatch.setattr(whatsapp, "get_http_client", lambda: client)
+            service = whatsapp.whatsapp_service
+            assert await service.send_text_message("15550000001", "hi", raise_retryable=True) is None
+            for wa_id in ("15550000002", "15550000003"):
+                with pytest.raises(whatsapp.WhatsAppSendError):
+                    await service.send_text_message(wa_id, "hi", raise_retryable=True)
+            # Without the flag every failure still returns None.
+            assert await service.send_text_message("15550000003", "hi") is None
+
+    asyncio.run(run())
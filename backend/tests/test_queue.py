@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from app.services import queue
+
+
+class FakeSQS:
+    def __init__(self, fail_ids=()):
+        self.batches = []
+        self.single = []
+        self.fail_ids = set(fail_ids)
+
+    def send_message_batch(self, QueueUrl, Entries):
+        self.batches.append((QueueUrl, Entries))
+        failed = [{"Id": e["Id"]} for e in Entries if e["Id"] in self.fail_ids]
+        self.fail_ids.clear()
+        return {"Successful": [], "Failed": failed}
+
+    def send_message(self, QueueUrl, MessageBody):
+        self.single.append((QueueUrl, MessageBody))
+
+
+def test_batched_enqueue_groups_messages(monkeypatch):
+    fake = FakeSQS(fail_ids={"3"})
+    monkeypatch.setattr(queue, "sqs", fake)
+    monkeypatch.setattr(queue, "OUTBOUND_QUEUE_URL", "https://sqs/outbound")
+
+    with queue.batched_enqueue():
+        for i in range(23):
+            assert queue.enqueue_outbound_text("15551234567", f"msg {i}")
+
+    assert [len(entries) for _, entries in fake.batches] == [10, 10, 3]
+    # The rejected entry is retried on its own.
+    assert len(fake.single) == 1
+    assert json.loads(fake.single[0][1])["text"] == "msg 3"
+
+
+def test_batching_producer_flushes_on_size():
+    fake = FakeSQS()
+    producer = queue.BatchingProducer(client=fake)
+    big = {"text": "x" * (100 * 1024)}
+    for _ in range(3):
+        producer.add("https://sqs/inbound", big)
+    producer.flush()
+
+    assert [len(entries) for _, entries in fake.batches] == [2, 1]
+
+
+def test_batching_producer_raises_when_retry_fails():
+    class BrokenSQS(FakeSQS):
+        def send_message_batch(self, QueueUrl, Entries):
+            raise RuntimeError("boom")
+
+        def send_message(self, QueueUrl, MessageBody):
+            raise RuntimeError("boom")
+
+    producer = queue.BatchingProducer(client=BrokenSQS())
+    producer.add("https://sqs/inbound", {"type": "expense"})
+    with pytest.raises(queue.QueueFlushError) as exc_info:
+        producer.flush()
+    assert len(exc_info.value.failed) == 1
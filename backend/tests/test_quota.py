@@ -0,0 +1,108 @@
+import os
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import engine
+from app.models import Base, DailyExpenseQuota, Expense, User
+from app.services.quota import consume_statement, try_consume
+
+LIMIT = 10
+WORKERS = 8
+ATTEMPTS_PER_WORKER = 4
+
+
+def _race(bind) -> int:
+    """Fire parallel check-and-insert transactions at one user; return accepted count."""
+    Session = sessionmaker(bind=bind, autoflush=False, future=True)
+    with Session() as db:
+        user = User(whatsapp_id="15559990000")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    accepted = []
+    barrier = threading.Barrier(WORKERS)
+
+    def worker():
+        barrier.wait()
+        with Session() as db:
+            for _ in range(ATTEMPTS_PER_WORKER):
+                while True:
+                    try:
+                        if try_consume(db, user_id, date(2025, 3, 3), LIMIT):
+                            db.add(
+                                Expense(
+                                    user_id=user_id,
+                                    amount=Decimal("1.00"),
+                                    currency="USD",
+                                    expense_date=date(2025, 3, 3),
+                                )
+                            )
+                            accepted.append(1)
+                        db.commit()
+                        break
+                    except OperationalError:
+                        # SQLite "database is locked": retry the whole transaction.
+                        db.rollback()
+
+    threads = [threading.Thread(target=worker) for _ in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with Session() as db:
+        expenses = db.query(Expense).filter(Expense.user_id == user_id).count()
+        used = db.execute(
+            select(DailyExpenseQuota.used).where(DailyExpenseQuota.user_id == user_id)
+        ).scalar_one()
+    assert expenses == used == len(accepted)
+    return len(accepted)
+
+
+def test_parallel_inserts_never_exceed_limit_sqlite():
+    assert _race(engine) == LIMIT
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL not set")
+def test_parallel_inserts_never_exceed_limit_postgres():
+    pg_engine = create_engine(os.environ["TEST_POSTGRES_URL"], pool_size=WORKERS, future=True)
+    Base.metadata.drop_all(bind=pg_engine)
+    Base.metadata.create_all(bind=pg_engine)
+    try:
+        assert _race(pg_engine) == LIMIT
+    finally:
+        Base.metadata.drop_all(bind=pg_engine)
+        pg_engine.dispose()
+
+
+def test_postgres_statement_is_a_single_conditional_upsert():
+    stmt = consume_statement("postgresql", None, date(2025, 3, 3), LIMIT, 1)
+    sql = " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+    assert sql.startswith("INSERT INTO daily_expense_quotas")
+    assert (
+        "ON CONFLICT (user_id, quota_date) DO UPDATE SET used = "
+        "(daily_expense_quotas.used + excluded.used) "
+        "WHERE daily_expense_quotas.used + excluded.used <= %(param_1)s "
+        "RETURNING daily_expense_quotas.used"
+    ) in sql
+
+
+def test_try_consume_batches_and_refuses_oversized_requests(db_session):
+    user = User(whatsapp_id="15559990001")
+    db_session.add(user)
+    db_session.commit()
+
+    assert try_consume(db_session, user.id, date(2025, 3, 3), LIMIT, 7)
+    assert not try_consume(db_session, user.id, date(2025, 3, 3), LIMIT, 4)
+    assert try_consume(db_session, user.id, date(2025, 3, 3), LIMIT, 3)
+    assert not try_consume(db_session, user.id, date(2025, 3, 3), LIMIT)
+    # Another day has its own counter.
+    assert try_consume(db_session, user.id, date(2025, 3, 4), LIMIT, LIMIT)
@@ -0,0 +1,145 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.api.routes.auth import _create_jwt
+from app.models import DailyExpenseRollup, Expense, User
+from app.services.rollups import daily_counts, rebuild_rollups
+
+
+def _rollups(db_session):
+    db_session.expire_all()
+    rows = db_session.execute(
+        select(DailyExpenseRollup).where(DailyExpenseRollup.count != 0)
+    ).scalars()
+    return {
+        (r.expense_date.isoformat(), r.currency, r.category): (r.count, Decimal(str(r.sum_amount)))
+        for r in rows
+    }
+
+
+def _expense(user, amount, category="food", expense_date=date(2025, 3, 3), currency="USD"):
+    return Expense(
+        user_id=user.id,
+        amount=Decimal(amount),
+        currency=currency,
+        category=category,
+        expense_date=expense_date,
+    )
+
+
+def test_rollups_follow_inserts_updates_and_deletes(client, db_session):
+    user = User(whatsapp_id="15554443333")
+    db_session.add(user)
+    db_session.commit()
+
+    lunch = _expense(user, "10.00")
+    db_session.add_all([lunch, _expense(user, "2.50"), _expense(user, "4.00", category=None)])
+    db_session.commit()
+    assert _rollups(db_session) == {
+        ("2025-03-03", "USD", "food"): (2, Decimal("12.50")),
+        ("2025-03-03", "USD", ""): (1, Decimal("4.00")),
+    }
+    assert daily_counts(db_session, [user.id], [date(2025, 3, 3)]) == {
+        (user.id, date(2025, 3, 3)): 3
+    }
+
+    # update_expense moves the row to a new key, committed with the change.
+    headers = {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+    res = client.patch(
+        f"/api/expenses/{lunch.id}",
+        json={"amount": 11, "category": "transport", "expense_date": "2025-03-04"},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    assert _rollups(db_session) == {
+        ("2025-03-03", "USD", "food"): (1, Decimal("2.50")),
+        ("2025-03-03", "USD", ""): (1, Decimal("4.00")),
+        ("2025-03-04", "USD", "transport"): (1, Decimal("11.00")),
+    }
+
+    # Overwriting an expired attribute still subtracts the old value.
+    lunch = db_session.get(Expense, lunch.id)
+    db_session.expire(lunch)
+    lunch.amount = Decimal("1.00")
+    db_session.commit()
+    assert _rollups(db_session)[("2025-03-04", "USD", "transport")] == (1, Decimal("1.00"))
+
+    db_session.delete(lunch)
+    db_session.commit()
+    assert ("2025-03-04", "USD", "transport") not in _rollups(db_session)
+
+
+def test_rollups_untouched_by_rolled_back_flush(db_session):
+    user = User(whatsapp_id="15554442222")
+    db_session.add(user)
+    db_session.commit()
+
+    db_session.add(_expense(user, "9.00"))
+    db_session.flush()
+    db_session.rollback()
+    assert _rollups(db_session) == {}
+
+
+def test_rebuild_rollups_matches_expenses(client, db_session):
+    user = User(whatsapp_id="15554441111")
+    db_session.add(user)
+    db_session.commit()
+    client.post(
+        "/api/dev/seed",
+        json={"whatsapp_id": "15554441111", "amount": 7.5, "expense_date": "2025-03-03"},
+    )
+    db_session.add(_expense(user, "3.00", currency="EUR"))
+    db_session.commit()
+    expected = _rollups(db_session)
+    assert expected == {
+        ("2025-03-03", "USD", "food"): (1, Decimal("7.50")),
+        ("2025-03-03", "EUR", "food"): (1, Decimal("3.00")),
+    }
+
+    db_session.query(DailyExpenseRollup).update({"count": 99})
+    db_session.commit()
+    assert rebuild_rollups(db_session, user.id) == 2
+    db_session.commit()
+    assert _rollups(db_session) == expected
+
+
+_WORKER_SCRIPT = """
+import json, sys
+from app.db import SessionLocal, engine
+from app.lambda_handlers import expense_worker
+from app.models import Base, DailyExpenseRollup, Expense
+
+Base.metadata.create_all(bind=engine)
+expense_worker.enqueue_outbound_text = lambda wa_id, text: None
+body = {"type": "expense", "wa_id": "15550009999", "expense": {
+    "amount": 7, "currency": "USD", "category": "food", "expense_date": "2025-03-03"}}
+expense_worker.lambda_handler({"Records": [{"messageId": "m1", "body": json.dumps(body)}]}, None)
+with SessionLocal() as db:
+    print(json.dumps({
+        "expenses": db.query(Expense).count(),
+        "rollups": [r.count for r in db.query(DailyExpenseRollup)],
+        "app_main": "app.main" in sys.modules,
+    }))
+"""
+
+
+def test_worker_maintains_rollups_without_the_api_app(tmp_path):
+    # conftest imports app.main for every test; the worker Lambda never does.
+    database_url = f"sqlite+pysqlite:///{tmp_path / 'worker.db'}"
+    env = {**os.environ, "DEBUG": "false", "DATABASE_URL": database_url}
+    out = subprocess.run(
+        [sys.executable, "-c", _WORKER_SCRIPT],
+        cwd=Path(__file__).resolve().parents[1],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert json.loads(out.splitlines()[-1]) == {"expenses": 1, "rollups": [1], "app_main": False}
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from app.core.config import settings
+from app.services import text_parser
+from app.services.cache import LRUCache, RedisCache
+
+CORPUS = Path(__file__).resolve().parent / "data" / "parser_corpus.jsonl"
+
+
+def _load_corpus():
+    with CORPUS.open(encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def test_confident_local_parses_match_labels():
+    confident = 0
+    for item in _load_corpus():
+        parsed = text_parser._parse_local(item["text"])
+        if parsed["confidence"] < settings.local_parser_confidence_threshold:
+            continue
+        confident += 1
+        assert parsed["amount"] == Decimal(str(item["amount"])), item["text"]
+        assert parsed["currency"] == item["currency"], item["text"]
+        assert parsed["category"] == item["category"], item["text"]
+    assert confident >= 10
+
+
+def test_parse_expense_text_skips_external_when_confident(monkeypatch):
+    calls = []
+
+    async def fake_external(message, reference_date=None):
+        calls.append(message)
+        return None
+
+    monkeypatch.setattr(text_parser, "call_external_text_parser", fake_external)
+    monkeypatch.setattr(text_parser, "_parse_cache", LRUCache())
+
+    parsed = asyncio.run(text_parser.parse_expense_text("lunch 12 USD"))
+    assert parsed["amount"] == Decimal("12")
+    assert parsed["currency"] == "USD"
+    assert calls == []
+
+    asyncio.run(text_parser.parse_expense_text("2kg apples 200 rupees"))
+    assert calls == ["2kg apples 200 rupees"]
+
+
+def test_parse_cache_reuses_external_results(monkeypatch):
+    calls = []
+
+    async def fake_external(message, reference_date=None):
+        calls.append(message)
+        return {
+            "amount": 3,
+            "currency": "EUR",
+            "expense_date": "2025-01-01",
+            "category": "food",
+            "merchant": None,
+            "notes": message,
+        }
+
+    cache = LRUCache()
+    monkeypatch.setattr(text_parser, "call_external_text_parser", fake_external)
+    monkeypatch.setattr(text_parser, "_parse_cache", cache)
+
+    ref = date(2025, 1, 1)
+    first = asyncio.run(text_parser.parse_expense_text("coffee 3", reference_date=ref))
+    second = asyncio.run(text_parser.parse_expense_text("  Coffee   3 ", reference_date=ref))
+    asyncio.run(text_parser.parse_expense_text("coffee 3", reference_date=date(2025, 1, 2)))
+
+    assert calls == ["coffee 3", "coffee 3"]
+    assert second["amount"] == first["amount"] == Decimal("3")
+    assert second["expense_date"] == date(2025, 1, 1)
+    assert second["notes"] == "  Coffee   3 "
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_parse_cache_hit_takes_merchant_from_the_current_message(monkeypatch):
+    async def fake_external(message, reference_date=None):
+        return {
+            "amount": 4,
+            "currency": "USD",
+            "expense_date": "2025-01-01",
+            "category": "food",
+            "merchant": "BLUE BOTTLE",
+            "notes": message,
+        }
+
+    monkeypatch.setattr(text_parser, "call_external_text_parser", fake_external)
+    monkeypatch.setattr(text_parser, "_parse_cache", LRUCache())
+
+    ref = date(2025, 1, 1)
+    asyncio.run(text_parser.parse_expense_text("4 at BLUE BOTTLE", reference_date=ref))
+    second = asyncio.run(text_parser.parse_expense_text("4 at blue  bottle", reference_date=ref))
+
+    assert text_parser.get_parse_cache().stats()["hits"] == 1
+    assert second["merchant"] == "blue  bottle"
+
+
+def test_lru_cache_evicts_and_expires(monkeypatch):
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1", ttl_seconds=60)
+    cache.set("b", "2", ttl_seconds=60)
+    assert cache.get("a") == "1"
+    cache.set("c", "3", ttl_seconds=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+    cache.set("d", "4", ttl_seconds=0)
+    assert cache.get("d") is None
+
+
+def test_redis_cache_with_fake_client():
+    class FakeRedis:
+        def __init__(self):
+            self.data = {}
+
+        def get(self, key):
+            return self.data.get(key)
+
+        def set(self, key, value, ex=None):
+            self.data[key] = value.encode()
+
+        def delete(self, key):
+            self.data.pop(key, None)
+
+    fake = FakeRedis()
+    cache = RedisCache(fake, prefix="parse:")
+    cache.set("k", "v", ttl_seconds=10)
+    assert fake.data == {"parse:k": b"v"}
+    assert cache.get("k") == "v"
+    cache.delete("k")
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_category_matcher_finds_keyword_at_end_of_long_message():
+    message = " ".join(["nothing relevant here"] * 50 + ["supermarket"])
+    assert text_parser._parse_local(message)["category"] == "grocery"
+
+
+def test_local_parse_survives_dotted_dates_and_thousands_separators():
+    parsed = text_parser.parse_expense_text_local("03.01.2025 taxi 15 EUR")
+    assert parsed["amount"] == Decimal("15")
+    assert parsed["expense_date"] == date(2025, 1, 3)
+
+    parsed = text_parser.parse_expense_text_local("paid 1.234.567 IDR")
+    assert parsed["amount"] is not None
+    # Ambiguous separators are left to the external parser.
+    assert parsed["confidence"] < settings.local_parser_confidence_threshold
+
+    assert text_parser.parse_expense_text_local("rent 1,234.50 USD")["amount"] == Decimal("1234.50")
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.api.routes.auth import _create_jwt
+from app.models import User
+from app.services import user_cache
+from app.services.cache import LRUCache, RedisCache
+from app.services.currency import resolve_currency
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture(params=["lru", "redis"])
+def cache(request, monkeypatch):
+    if request.param == "lru":
+        backend = LRUCache(max_entries=16)
+    else:
+        backend = RedisCache(FakeRedis(), prefix="user:")
+    monkeypatch.setattr(user_cache, "_user_cache", backend)
+    return backend
+
+
+def _user_selects(fn):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    # Class-level, so the async route engine is counted as well as the sync one.
+    event.listen(Engine, "before_cursor_execute", on_execute)
+    try:
+        fn()
+    finally:
+        event.remove(Engine, "before_cursor_execute", on_execute)
+    return len(statements)
+
+
+def _make_user(db_session, **kwargs):
+    user = User(whatsapp_id="15557654321", name="Ann", **kwargs)
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user, {"Authorization": f"Bearer {_create_jwt(str(user.id))}"}
+
+
+def test_repeat_requests_skip_user_select(client, db_session, cache):
+    _, headers = _make_user(db_session)
+
+    assert _user_selects(lambda: client.get("/api/profile", headers=headers)) == 1
+    responses = []
+    assert _user_selects(lambda: responses.append(client.get("/api/profile", headers=headers))) == 0
+    assert responses[0].json()["name"] == "Ann"
+    assert cache.stats()["hits"] == 1
+
+
+def test_profile_and_premium_writes_invalidate(client, db_session, cache):
+    user, headers = _make_user(db_session, is_premium=False)
+    client.get("/api/profile", headers=headers)
+
+    # The cached user is attached to the request session and can be written.
+    res = client.patch("/api/profile", json={"name": "Bea"}, headers=headers)
+    assert res.json()["name"] == "Bea"
+    assert client.get("/api/profile", headers=headers).json()["name"] == "Bea"
+
+    client.patch(
+        f"/api/admin/users/{user.whatsapp_id}/premium",
+        headers={"X-Admin-Token": "test-admin-key"},
+        json={"is_premium": True},
+    )
+    assert client.get("/api/profile", headers=headers).json()["is_premium"] is True
+
+
+def test_resolve_currency_invalidates_after_commit(client, db_session, cache):
+    user, headers = _make_user(db_session, default_currency="USD")
+    client.get("/api/profile", headers=headers)
+    key = user_cache._user_key(user.id)
+
+    resolve_currency(user, "EUR", user.whatsapp_id)
+    assert cache.get(key) is not None  # not committed yet
+    db_session.commit()
+    assert cache.get(key) is None
+
+    assert client.get("/api/profile", headers=headers).json()["default_currency"] == "EUR"
@@ -0,0 +1,121 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.api import webhook
+from app.db import engine
+from app.models import Expense, User
+
+
+class _StatementCounter:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+        event.remove(engine, "commit", self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+
+def _payload(wa_id, text):
+    return {
+        "entry": [
+            {
+                "changes": [
+                    {
+                        "value": {
+                            "messages": [
+                                {
+                                    "from": wa_id,
+                                    "id": "wamid.ID",
+                                    "type": "text",
+                                    "text": {"body": text},
+                                }
+                            ]
+                        }
+                    }
+                ]
+            }
+        ]
+    }
+
+
+def test_webhook_text_message_uses_single_commit(client, db_session, monkeypatch):
+    async def fake_parse(message, reference_date=None):
+        return {
+            "amount": Decimal("23.5"),
+            "currency": "eur",
+            "expense_date": date.today(),
+            "category": "food",
+            "merchant": "Dinner",
+            "notes": message,
+        }
+
+    sent = []
+
+    async def fake_send(wa_id, text):
+        sent.append((wa_id, text))
+
+    monkeypatch.setattr(webhook, "parse_expense_text", fake_parse)
+    monkeypatch.setattr(webhook.whatsapp_service, "send_text_message", fake_send)
+
+    user = User(whatsapp_id="15551234567")
+    db_session.add(user)
+    db_session.commit()
+
+    with _StatementCounter() as counter:
+        res = client.post("/webhook", json=_payload("15551234567", "Dinner 23.5 EUR"))
+
+    assert res.status_code == 200
+    # SELECT user, rollup read for the daily limit, UPDATE default currency,
+    # INSERT expense, rollup upsert.
+    assert len(counter.statements) == 5
+    assert counter.commits == 1
+
+    db_session.expire_all()
+    assert db_session.query(Expense).count() == 1
+    assert db_session.query(User).one().default_currency == "EUR"
+    assert sent == [
+        ("15551234567", f"Recorded expense: 23.50 EUR for Dinner on {date.today()}.")
+    ]
+
+
+def test_webhook_parses_before_creating_a_new_user(client, db_session, monkeypatch):
+    with _StatementCounter() as counter:
+
+        async def fake_parse(message, reference_date=None):
+            # Only the user lookup has run: no INSERT holds a lock during the parse.
+            assert [s.split()[0] for s in counter.statements] == ["SELECT"]
+            return {
+                "amount": Decimal("4"),
+                "currency": "usd",
+                "expense_date": date.today(),
+                "category": None,
+                "merchant": None,
+                "notes": message,
+            }
+
+        async def fake_send(wa_id, text):
+            pass
+
+        monkeypatch.setattr(webhook, "parse_expense_text", fake_parse)
+        monkeypatch.setattr(webhook.whatsapp_service, "send_text_message", fake_send)
+        res = client.post("/webhook", json=_payload("15557654321", "Coffee 4"))
+
+    assert res.status_code == 200
+    assert counter.commits == 1
+    db_session.expire_all()
+    assert db_session.query(User).one().whatsapp_id == "15557654321"
+    assert db_session.query(Expense).count() == 1
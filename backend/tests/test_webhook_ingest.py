@@ -0,0 +1,72 @@
+import asyncio
+import time
+from datetime import date
+from decimal import Decimal
+
+from app.lambda_handlers import webhook_ingest
+from app.services import text_parser
+
+
+def _text(wa_id, body):
+    return {"from": wa_id, "type": "text", "timestamp": "1735689600", "text": {"body": body}}
+
+
+def test_webhook_ingest_parses_messages_concurrently(monkeypatch):
+    async def fake_parse(message, reference_date=None):
+        # Sequentially, four 0.2s parses would blow the 0.5s budget.
+        await asyncio.sleep(2 if message == "slow 9" else 0.2)
+        return {
+            "amount": Decimal("5"),
+            "currency": "USD",
+            "expense_date": reference_date,
+            "category": "food",
+            "merchant": "external",
+            "notes": message,
+        }
+
+    enqueued = []
+    monkeypatch.setattr(webhook_ingest, "parse_expense_text", fake_parse)
+    monkeypatch.setattr(webhook_ingest, "enqueue_inbound", enqueued.append)
+    monkeypatch.setattr(webhook_ingest, "_parse_budget_seconds", 0.5)
+
+    messages = [_text(f"1555000{i}", f"coffee {i}") for i in range(4)]
+    messages.append(_text("15559999", "slow 9"))
+    payload = {"entry": [{"changes": [{"value": {"messages": messages}}]}]}
+
+    start = time.perf_counter()
+    res = webhook_ingest._handle_webhook_payload(payload, b"", None)
+    elapsed = time.perf_counter() - start
+
+    assert res["statusCode"] == 200
+    assert elapsed < 1.5
+    assert [p["wa_id"] for p in enqueued] == [
+        "15550000",
+        "15550001",
+        "15550002",
+        "15550003",
+        "15559999",
+    ]
+    assert all(p["expense"]["merchant"] == "external" for p in enqueued[:4])
+    # The message that blew the time budget was parsed locally instead.
+    assert enqueued[4]["expense"]["amount"] == 9.0
+    assert enqueued[4]["expense"]["merchant"] == "slow"
+    assert enqueued[4]["expense"]["expense_date"] == date(2025, 1, 1).isoformat()
+
+
+def test_webhook_ingest_handles_dotted_numbers(monkeypatch):
+    async def external_down(message, reference_date=None):
+        raise RuntimeError("parser unavailable")
+
+    enqueued = []
+    monkeypatch.setattr(text_parser, "call_external_text_parser", external_down)
+    monkeypatch.setattr(webhook_ingest, "enqueue_inbound", enqueued.append)
+
+    messages = [_text("15550001", "03.01.2025 taxi 15 EUR"), _text("15550002", "paid 1.234.567 IDR")]
+    payload = {"entry": [{"changes": [{"value": {"messages": messages}}]}]}
+
+    res = webhook_ingest._handle_webhook_payload(payload, b"", None)
+
+    assert res["statusCode"] == 200
+    assert len(enqueued) == 2
+    assert enqueued[0]["expense"]["amount"] == 15.0
+    assert enqueued[0]["expense"]["expense_date"] == "2025-01-03"
@@ -336,6 +336,9 @@ resource "aws_lambda_function" "backend_api" {
   environment {
     variables = merge(
       local.base_env,
+      # Most routes use the async pool (1 + 1 overflow); the few sync routes
+      # open their connection per request instead of keeping a second pool.
+      { DB_SYNC_POOL_MODE = "null" },
       var.enable_auto_sleep ? {
         ENV_MANAGER_FUNCTION_NAME = aws_lambda_function.env_manager.function_name
       } : {}
@@ -343,6 +346,24 @@ resource "aws_lambda_function" "backend_api" {
   }
 }
 
+# The default image_uri is always :latest, so key the migration on the digest
+# that tag currently points to.
+data "aws_ecr_image" "backend_latest" {
+  count           = var.backend_lambda_image == "" ? 1 : 0
+  repository_name = aws_ecr_repository.backend.name
+  image_tag       = "latest"
+}
+
+# Schema setup runs once per deploy instead of on every API cold start.
+resource "aws_lambda_invocation" "init_db" {
+  function_name = aws_lambda_function.backend_api.function_name
+  input         = jsonencode({ action = "initDb" })
+
+  triggers = {
+    image = var.backend_lambda_image != "" ? var.backend_lambda_image : data.aws_ecr_image.backend_latest[0].image_digest
+  }
+}
+
 resource "aws_lambda_function" "expense_worker" {
   function_name = "${local.name_prefix}-worker"
   role          = aws_iam_role.lambda_vpc.arn
@@ -395,23 +416,40 @@ resource "aws_lambda_function" "outbound_sender" {
   memory_size   = var.backend_lambda_memory
   timeout       = var.backend_lambda_timeout
 
+  # The send rate limit is per container, so the container count is capped
+  # and each one gets its share of the global budget.
+  reserved_concurrent_executions = var.outbound_max_concurrency
+
   image_config {
     command = ["app.lambda_handlers.outbound_sender.lambda_handler"]
   }
 
   environment {
-    variables = local.base_env
+    variables = merge(local.base_env, {
+      OUTBOUND_REQUESTS_PER_SECOND = tostring(var.outbound_requests_per_second / var.outbound_max_concurrency)
+    })
   }
 }
 
 resource "aws_lambda_event_source_mapping" "inbound_worker" {
   event_source_arn = aws_sqs_queue.inbound.arn
   function_name    = aws_lambda_function.expense_worker.arn
+
+  # The worker returns batchItemFailures so only failed records are redelivered.
+  function_response_types = ["ReportBatchItemFailures"]
 }
 
 resource "aws_lambda_event_source_mapping" "outbound_sender" {
   event_source_arn = aws_sqs_queue.outbound.arn
   function_name    = aws_lambda_function.outbound_sender.arn
+
+  # The sender returns batchItemFailures so only failed sends are retried.
+  function_response_types = ["ReportBatchItemFailures"]
+
+  # Stay within the reserved concurrency instead of getting throttled.
+  scaling_config {
+    maximum_concurrency = var.outbound_max_concurrency
+  }
 }
 
 resource "aws_iam_role" "lambda_env_manager" {
@@ -450,6 +488,12 @@ resource "aws_iam_role_policy" "lambda_env_manager_control" {
           aws_lambda_event_source_mapping.outbound_sender.arn,
         ]
       },
+      {
+        # Wake-up polling continues in asynchronous invocations of itself.
+        Effect   = "Allow"
+        Action   = ["lambda:InvokeFunction"]
+        Resource = ["arn:aws:lambda:${var.aws_region}:${data.aws_caller_identity.current.account_id}:function:${local.name_prefix}-env-manager"]
+      },
       {
         Effect = "Allow"
         Action = [
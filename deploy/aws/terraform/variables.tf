@@ -135,6 +135,18 @@ variable "outbound_queue_name" {
   default     = "outbound"
 }
 
+variable "outbound_requests_per_second" {
+  description = "WhatsApp sends per second across all outbound sender containers"
+  type        = number
+  default     = 50
+}
+
+variable "outbound_max_concurrency" {
+  description = "Maximum concurrent outbound sender containers (at least 2); each gets an equal share of outbound_requests_per_second"
+  type        = number
+  default     = 2
+}
+
 variable "app_name" {
   description = "APP_NAME value"
   type        = string
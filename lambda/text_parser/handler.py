@@ -1,11 +1,15 @@
 import json
+import logging
 import os
+import time
 from datetime import date
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, List, NamedTuple, Optional
 
 import boto3
 
+logger = logging.getLogger(__name__)
+
 REGION = os.environ.get("AWS_REGION", "us-east-1")
 MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", "mistral.mistral-7b-instruct-v0:2")
 DEFAULT_CURRENCY = os.environ.get("DEFAULT_CURRENCY", "USD")
@@ -17,8 +21,34 @@ ALLOWED_CATEGORIES = {
     ).split(",")
     if value.strip()
 }
-MAX_TOKENS = int(os.environ.get("MAX_TOKENS", "256"))
+# "full" is the original verbose prompt; "compact" is a short instruction block
+# that also drops "notes" from the completion (it is filled from the input).
+PROMPT_VARIANT = os.environ.get("PROMPT_VARIANT", "full").strip().lower()
+if PROMPT_VARIANT not in {"full", "compact"}:
+    logger.warning("Unknown PROMPT_VARIANT %r; using 'full'", PROMPT_VARIANT)
+    PROMPT_VARIANT = "full"
+MAX_TOKENS = int(
+    os.environ.get("MAX_TOKENS", "128" if PROMPT_VARIANT == "compact" else "256")
+)
+# Log prompt/completion token counts and wall time for every model call.
+PROFILE_PROMPTS = os.environ.get("PROFILE_PROMPTS", "").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
+if PROFILE_PROMPTS:
+    logger.setLevel(logging.INFO)
+# Use invoke_model_with_response_stream and stop reading once the JSON closes.
+STREAM_RESPONSES = os.environ.get("STREAM_RESPONSES", "").strip().lower() in {
+    "1",
+    "true",
+    "yes",
+    "on",
+}
 TEMPERATURE = float(os.environ.get("TEMPERATURE", "0.1"))
+# Batch mode: how many messages are packed into one model call.
+MAX_BATCH_ITEMS = max(int(os.environ.get("MAX_BATCH_ITEMS", "10")), 1)
 
 bedrock = boto3.client("bedrock-runtime", region_name=REGION)
 
@@ -64,46 +94,33 @@ def _ensure_schema(obj: Dict[str, Any], original_text: str) -> Dict[str, Any]:
     return out
 
 
-def lambda_handler(event, context):
-    # Expect JSON body { "text": "..." } via API Gateway
-    if "body" in event:
-        try:
-            body = json.loads(event["body"])
-        except json.JSONDecodeError:
-            return {"statusCode": 400, "body": json.dumps({"error": "Invalid JSON body"})}
-    else:
-        body = event
+_FIELDS = """- amount (number) – total amount spent
+- currency (string or null) – 3-letter ISO code (e.g. "USD", "JPY", "INR"); use null if not specified
+- expense_date (string) – ISO date "YYYY-MM-DD"; use {date_default} if not specified
+- category (string) – one of: "grocery", "food", "transport", "shopping", "general"
+- merchant (string or null) – store/provider name if present, otherwise null
+- notes (string) – copy of the original message"""
 
-    text = body.get("text")
-    if not text:
-        return {"statusCode": 400, "body": json.dumps({"error": "Missing 'text'"})}
+_RULES = """- Infer currency from symbols or words (e.g. "JPY", "¥", "yen" → "JPY"; "rupee", "rupees", "rs" → "INR").
+- If the user does NOT specify currency, set currency to null.
+- For transport (bus, train, taxi, uber, shinkansen, metro, subway, etc.) use category "transport".
+- For fruits, vegetables, supermarket, groceries (apple, kg, grocery, supermarket, market, etc.) use category "grocery".
+- For meals (dinner, lunch, breakfast, restaurant, cafe) use category "food".
+- If you cannot infer a merchant, use null."""
 
-    reference_date = body.get("reference_date")
-    if isinstance(reference_date, str):
-        today = reference_date
-    else:
-        today = date.today().isoformat()
 
-    prompt = f"""
+def _build_full_prompt(text: str, today: str) -> str:
+    fields = _FIELDS.format(date_default=f'"{today}"')
+    return f"""
 You are an expense extraction engine.
 
 Input: a short human message describing a personal expense.
 Output: a single JSON object with exactly these fields:
 
-- amount (number) – total amount spent
-- currency (string or null) – 3-letter ISO code (e.g. "USD", "JPY", "INR"); use null if not specified
-- expense_date (string) – ISO date "YYYY-MM-DD"; use "{today}" if not specified
-- category (string) – one of: "grocery", "food", "transport", "shopping", "general"
-- merchant (string or null) – store/provider name if present, otherwise null
-- notes (string) – copy of the original message
+{fields}
 
 Rules:
-- Infer currency from symbols or words (e.g. "JPY", "¥", "yen" → "JPY"; "rupee", "rupees", "rs" → "INR").
-- If the user does NOT specify currency, set currency to null.
-- For transport (bus, train, taxi, uber, shinkansen, metro, subway, etc.) use category "transport".
-- For fruits, vegetables, supermarket, groceries (apple, kg, grocery, supermarket, market, etc.) use category "grocery".
-- For meals (dinner, lunch, breakfast, restaurant, cafe) use category "food".
-- If you cannot infer a merchant, use null.
+{_RULES}
 - Always return ONLY a valid JSON object, no explanations, no markdown.
 
 Example input: "2kg apples 200 rupees"
@@ -113,18 +130,327 @@ Example output:
 Now process this input: "{text}"
 """
 
+
+def _build_full_batch_prompt(items: List[Dict[str, Any]]) -> str:
+    fields = _FIELDS.format(date_default="the item's reference_date")
+    return f"""
+You are an expense extraction engine.
+
+Input: a JSON array of short human messages, each describing a personal expense,
+with an "index", the message "text" and a "reference_date".
+Output: a JSON array with exactly one object per input item, each with these fields:
+
+- index (number) – the "index" of the input item
+{fields}
+
+Rules:
+{_RULES}
+- Always return ONLY a valid JSON array, no explanations, no markdown.
+
+Example input: [{{"index": 0, "text": "2kg apples 200 rupees", "reference_date": "2025-01-01"}}]
+Example output:
+[{{"index": 0, "amount": 200.0, "currency": "INR", "expense_date": "2025-01-01", "category": "grocery", "merchant": null, "notes": "2kg apples 200 rupees"}}]
+
+Now process this input:
+{json.dumps(items, ensure_ascii=False)}
+"""
+
+
+_COMPACT_KEYS = (
+    "amount (number), currency (ISO 4217 code, null if not stated; $=USD, €=EUR, "
+    "£=GBP, ¥/yen=JPY, ₹/rs/rupees=INR), expense_date (YYYY-MM-DD, default {date_default}), "
+    "category (grocery: market/produce; food: meals/cafe; transport: bus/train/taxi/metro; "
+    "shopping; general), merchant (name or null)"
+)
+_COMPACT_PROMPT = (
+    "Extract the expense from the message as one JSON object with keys "
+    + _COMPACT_KEYS.format(date_default="{today}")
+    + ". Reply with JSON only.\nMessage: {text}\nJSON:"
+)
+_COMPACT_BATCH_PROMPT = (
+    "Extract each item's expense. Reply with only a JSON array holding one object per "
+    "item with keys index (the item's index), "
+    + _COMPACT_KEYS.format(date_default="the item's reference_date")
+    + ".\nItems: {items}\nJSON:"
+)
+
+
+def _build_compact_prompt(text: str, today: str) -> str:
+    return _COMPACT_PROMPT.format(today=today, text=json.dumps(text, ensure_ascii=False))
+
+
+def _build_compact_batch_prompt(items: List[Dict[str, Any]]) -> str:
+    return _COMPACT_BATCH_PROMPT.format(items=json.dumps(items, ensure_ascii=False))
+
+
+def _build_prompt(text: str, today: str, variant: Optional[str] = None) -> str:
+    if (variant or PROMPT_VARIANT) == "compact":
+        return _build_compact_prompt(text, today)
+    return _build_full_prompt(text, today)
+
+
+def _build_batch_prompt(items: List[Dict[str, Any]], variant: Optional[str] = None) -> str:
+    if (variant or PROMPT_VARIANT) == "compact":
+        return _build_compact_batch_prompt(items)
+    return _build_full_batch_prompt(items)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for when Bedrock reports none."""
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+class ModelCall(NamedTuple):
+    text: str
+    input_tokens: int
+    output_tokens: int
+    elapsed_ms: float
+    # True when the token counts are estimates rather than Bedrock's own.
+    estimated: bool
+
+
+class JSONScanner:
+    """
+    Incremental scanner that finds the first complete top-level JSON value
+    starting with `opener` in text fed chunk by chunk. Anything before the
+    opener is skipped; brackets inside strings (and escaped quotes) are ignored.
+    """
+
+    def __init__(self, opener: str = "{"):
+        self.opener = opener
+        self._buffer: List[str] = []
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Consume `chunk`; return the JSON text once the top-level value has closed."""
+        if self.done:
+            return None
+        if not self._started:
+            start = chunk.find(self.opener)
+            if start < 0:
+                return None
+            self._started = True
+            chunk = chunk[start:]
+
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._buffer.append(chunk[: i + 1])
+                    self.done = True
+                    return "".join(self._buffer)
+        self._buffer.append(chunk)
+        return None
+
+
+def _call_model(prompt: str, max_tokens: int, opener: str = "{") -> ModelCall:
     # Mistral instruct models on Bedrock use a simple prompt + max_tokens schema
     request_body = {
         "prompt": prompt,
-        "max_tokens": MAX_TOKENS,
+        "max_tokens": max_tokens,
         "temperature": TEMPERATURE,
     }
+    if STREAM_RESPONSES:
+        return _call_model_stream(request_body, opener)
+
+    start = time.perf_counter()
+    resp = bedrock.invoke_model(modelId=MODEL_ID, body=json.dumps(request_body))
+    raw_body = resp["body"].read().decode("utf-8")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    model_out = json.loads(raw_body)
+    text = model_out.get("outputs", [{}])[0].get("text", "")
+
+    headers = resp.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    input_tokens = headers.get("x-amzn-bedrock-input-token-count")
+    output_tokens = headers.get("x-amzn-bedrock-output-token-count")
+    estimated = input_tokens is None or output_tokens is None
+    return ModelCall(
+        text=text,
+        input_tokens=int(input_tokens) if input_tokens is not None else estimate_tokens(prompt),
+        output_tokens=int(output_tokens) if output_tokens is not None else estimate_tokens(text),
+        elapsed_ms=elapsed_ms,
+        estimated=estimated,
+    )
+
 
+def _call_model_stream(request_body: Dict[str, Any], opener: str) -> ModelCall:
+    """
+    Stream the completion and return as soon as the top-level JSON value closes,
+    so trailing explanations from the model never add to latency. If the stream
+    ends first, the raw text is returned for the usual salvage in _extract_json.
+    """
+    start = time.perf_counter()
+    resp = bedrock.invoke_model_with_response_stream(
+        modelId=MODEL_ID, body=json.dumps(request_body)
+    )
+    stream = resp["body"]
+    scanner = JSONScanner(opener)
+    parts: List[str] = []
+    metrics: Dict[str, Any] = {}
+    text: Optional[str] = None
     try:
-        resp = bedrock.invoke_model(modelId=MODEL_ID, body=json.dumps(request_body))
-        raw_body = resp["body"].read().decode("utf-8")
-        model_out = json.loads(raw_body)
-        assistant_text = model_out.get("outputs", [{}])[0].get("text", "")
+        for event in stream:
+            payload = (event.get("chunk") or {}).get("bytes")
+            if not payload:
+                continue
+            data = json.loads(payload)
+            metrics = data.get("amazon-bedrock-invocationMetrics") or metrics
+            piece = "".join(out.get("text", "") for out in data.get("outputs", []))
+            parts.append(piece)
+            text = scanner.feed(piece)
+            if text is not None:
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    completion = "".join(parts)
+    estimated = "inputTokenCount" not in metrics
+    return ModelCall(
+        text=text if text is not None else completion,
+        input_tokens=metrics.get("inputTokenCount") or estimate_tokens(request_body["prompt"]),
+        output_tokens=metrics.get("outputTokenCount") or estimate_tokens(completion),
+        elapsed_ms=elapsed_ms,
+        estimated=estimated,
+    )
+
+
+def _invoke_model(prompt: str, max_tokens: int, items: int = 1, opener: str = "{") -> str:
+    call = _call_model(prompt, max_tokens, opener)
+    if PROFILE_PROMPTS:
+        logger.info(
+            "Bedrock call profile: %s",
+            json.dumps(
+                {
+                    "variant": PROMPT_VARIANT,
+                    "streamed": STREAM_RESPONSES,
+                    "items": items,
+                    "prompt_chars": len(prompt),
+                    "input_tokens": call.input_tokens,
+                    "output_tokens": call.output_tokens,
+                    "max_tokens": max_tokens,
+                    "estimated": call.estimated,
+                    "elapsed_ms": round(call.elapsed_ms, 1),
+                }
+            ),
+        )
+    return call.text
+
+
+def _extract_json(assistant_text: str, opener: str = "{", closer: str = "}") -> Any:
+    try:
+        return json.loads(assistant_text)
+    except Exception:
+        # Try to salvage JSON substring
+        start = assistant_text.index(opener)
+        end = assistant_text.rindex(closer) + 1
+        return json.loads(assistant_text[start:end])
+
+
+def _reference_date(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return date.today().isoformat()
+
+
+def _handle_batch(raw_items: Any) -> Dict[str, Any]:
+    """
+    Parse many messages with as few model calls as possible: items are packed
+    MAX_BATCH_ITEMS per prompt and the model answers with an indexed JSON
+    array. Each item is validated on its own; items the model skipped or that
+    were invalid come back as null so the caller can fall back locally.
+    """
+    if not isinstance(raw_items, list) or not raw_items:
+        return {"statusCode": 400, "body": json.dumps({"error": "'items' must be a non-empty list"})}
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(raw_items)
+    pending: List[Dict[str, Any]] = []
+    for index, item in enumerate(raw_items):
+        if isinstance(item, dict) and item.get("text"):
+            pending.append(
+                {
+                    "index": index,
+                    "text": item["text"],
+                    "reference_date": _reference_date(item.get("reference_date")),
+                }
+            )
+
+    for start in range(0, len(pending), MAX_BATCH_ITEMS):
+        chunk = pending[start : start + MAX_BATCH_ITEMS]
+        try:
+            assistant_text = _invoke_model(
+                _build_batch_prompt(chunk),
+                MAX_TOKENS * len(chunk),
+                items=len(chunk),
+                opener="[",
+            )
+            parsed = _extract_json(assistant_text, "[", "]")
+        except Exception as e:
+            logger.warning("Batch chunk of %s items failed: %s", len(chunk), e)
+            continue
+        if not isinstance(parsed, list):
+            continue
+
+        by_index = {item["index"]: item for item in chunk}
+        for obj in parsed:
+            if not isinstance(obj, dict):
+                continue
+            try:
+                index = int(obj.get("index"))
+            except (TypeError, ValueError):
+                continue
+            item = by_index.get(index)
+            if item is None:
+                continue
+            if not obj.get("expense_date"):
+                obj["expense_date"] = item["reference_date"]
+            results[index] = _ensure_schema(obj, item["text"])
+
+    return {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({"results": results}),
+    }
+
+
+def lambda_handler(event, context):
+    # Expect JSON body { "text": "..." } or { "items": [{"text": "...", "reference_date": "..."}] }
+    if "body" in event:
+        try:
+            body = json.loads(event["body"])
+        except json.JSONDecodeError:
+            return {"statusCode": 400, "body": json.dumps({"error": "Invalid JSON body"})}
+    else:
+        body = event
+
+    if "items" in body:
+        return _handle_batch(body.get("items"))
+
+    text = body.get("text")
+    if not text:
+        return {"statusCode": 400, "body": json.dumps({"error": "Missing 'text'"})}
+
+    today = _reference_date(body.get("reference_date"))
+
+    try:
+        assistant_text = _invoke_model(_build_prompt(text, today), MAX_TOKENS)
     except Exception as e:
         return {
             "statusCode": 500,
@@ -133,18 +459,12 @@ Now process this input: "{text}"
 
     # Try to parse the model's JSON
     try:
-        parsed_obj = json.loads(assistant_text)
-    except Exception:
-        # Try to salvage JSON substring
-        try:
-            start = assistant_text.index("{")
-            end = assistant_text.rindex("}") + 1
-            parsed_obj = json.loads(assistant_text[start:end])
-        except Exception as e:
-            return {
-                "statusCode": 500,
-                "body": json.dumps({"error": f"Failed to parse model JSON: {str(e)}"}),
-            }
+        parsed_obj = _extract_json(assistant_text)
+    except Exception as e:
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": f"Failed to parse model JSON: {str(e)}"}),
+        }
 
     normalized = _ensure_schema(parsed_obj, text)
 
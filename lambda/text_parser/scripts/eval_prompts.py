@@ -0,0 +1,146 @@
+"""
+Compare prompt variants on the labelled parser corpus: accuracy, tokens and latency.
+
+    python scripts/eval_prompts.py --record /tmp/prompt_eval.jsonl   # calls Bedrock
+    python scripts/eval_prompts.py --replay /tmp/prompt_eval.jsonl   # re-scores offline
+    python scripts/eval_prompts.py --corpus tests/data/prompt_eval_corpus.jsonl \
+        --replay tests/data/prompt_eval_recording.jsonl              # sample, no AWS
+
+Live runs need AWS credentials with bedrock:InvokeModel on BEDROCK_MODEL_ID.
+Recording the completions lets the scoring be re-run (or the scorer changed)
+without paying for the calls again. Token counts come from Bedrock's response
+headers when present, otherwise from the ~4 chars/token estimate. The sample
+recording under tests/data is hand-written (estimated tokens, nominal
+latencies): it exercises replay and scoring, not the model.
+"""
+
+import argparse
+import contextlib
+import json
+import statistics
+import sys
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TextIO
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import handler  # noqa: E402
+
+CORPUS = ROOT.parents[1] / "backend" / "tests" / "data" / "parser_corpus.jsonl"
+REFERENCE_DATE = "2025-01-01"
+MAX_TOKENS = {"full": 256, "compact": 128}
+
+Caller = Callable[[str, str, str, int], handler.ModelCall]
+
+
+def _live_caller(out: Optional[TextIO]) -> Caller:
+    def call(variant: str, text: str, prompt: str, max_tokens: int) -> handler.ModelCall:
+        result = handler._call_model(prompt, max_tokens)
+        if out:
+            out.write(json.dumps({"variant": variant, "message": text, **result._asdict()}) + "\n")
+            out.flush()
+        return result
+
+    return call
+
+
+def _replay_caller(path: str) -> Caller:
+    with open(path, encoding="utf-8") as fh:
+        recorded = {}
+        for line in fh:
+            if line.strip():
+                row = json.loads(line)
+                key = (row.pop("variant"), row.pop("message"))
+                recorded[key] = handler.ModelCall(**row)
+
+    def call(variant: str, text: str, prompt: str, max_tokens: int) -> handler.ModelCall:
+        return recorded[(variant, text)]
+
+    return call
+
+
+def _score(expected: Dict, completion: str, text: str) -> Dict[str, bool]:
+    try:
+        parsed = handler._ensure_schema(handler._extract_json(completion), text)
+    except Exception:
+        return {"amount": False, "currency": False, "category": False}
+    amount = parsed["amount"]
+    return {
+        "amount": amount is not None
+        and Decimal(str(amount)).quantize(Decimal("0.01"))
+        == Decimal(str(expected["amount"])).quantize(Decimal("0.01")),
+        "currency": parsed["currency"] == expected["currency"],
+        "category": parsed["category"] == expected["category"],
+    }
+
+
+def evaluate(variant: str, corpus: List[Dict], call: Caller, max_tokens: int) -> Dict:
+    fields = {"amount": 0, "currency": 0, "category": 0}
+    exact = 0
+    input_tokens: List[int] = []
+    output_tokens: List[int] = []
+    latencies: List[float] = []
+    for item in corpus:
+        prompt = handler._build_prompt(item["text"], REFERENCE_DATE, variant)
+        result = call(variant, item["text"], prompt, max_tokens)
+        scores = _score(item, result.text, item["text"])
+        for field, ok in scores.items():
+            fields[field] += ok
+        exact += all(scores.values())
+        input_tokens.append(result.input_tokens)
+        output_tokens.append(result.output_tokens)
+        latencies.append(result.elapsed_ms)
+
+    latencies.sort()
+    n = len(corpus)
+    return {
+        "variant": variant,
+        "exact": exact / n,
+        **{f"{field}_acc": count / n for field, count in fields.items()},
+        "input_tokens": statistics.mean(input_tokens),
+        "output_tokens": statistics.mean(output_tokens),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[min(n - 1, int(n * 0.95))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=str(CORPUS))
+    parser.add_argument("--variants", default="full,compact")
+    parser.add_argument("--record", help="write live completions to this JSONL file")
+    parser.add_argument("--replay", help="score completions recorded with --record")
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as fh:
+        corpus = [json.loads(line) for line in fh if line.strip()]
+    with contextlib.ExitStack() as stack:
+        if args.replay:
+            call = _replay_caller(args.replay)
+        else:
+            out = None
+            if args.record:
+                out = stack.enter_context(open(args.record, "w", encoding="utf-8"))
+            call = _live_caller(out)
+        rows = [
+            evaluate(variant, corpus, call, MAX_TOKENS[variant])
+            for variant in args.variants.split(",")
+        ]
+    print(f"corpus={len(corpus)} model={handler.MODEL_ID}")
+    print(
+        f"{'variant':<8} {'exact':>6} {'amount':>7} {'curr':>6} {'categ':>6}"
+        f" {'in_tok':>7} {'out_tok':>7} {'p50_ms':>8} {'p95_ms':>8}"
+    )
+    for row in rows:
+        print(
+            f"{row['variant']:<8} {row['exact']:>6.1%} {row['amount_acc']:>7.1%}"
+            f" {row['currency_acc']:>6.1%} {row['category_acc']:>6.1%}"
+            f" {row['input_tokens']:>7.0f} {row['output_tokens']:>7.0f}"
+            f" {row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
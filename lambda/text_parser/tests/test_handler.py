@@ -61,3 +61,202 @@ def test_lambda_handler_parses_bedrock_response(monkeypatch):
     body = json.loads(res["body"])
     assert body["amount"] == 10.0
     assert body["expense_date"] == "2025-01-01"
+
+
+class BatchBedrock:
+    """Answers batch prompts by echoing each input item back as a parsed expense."""
+
+    def __init__(self, skip_index=None):
+        self.calls = 0
+        self.skip_index = skip_index
+
+    def invoke_model(self, modelId, body):
+        self.calls += 1
+        prompt = json.loads(body)["prompt"]
+        items = json.loads(prompt.rsplit("Now process this input:\n", 1)[1])
+        out = [
+            {
+                "index": item["index"],
+                "amount": float(item["text"].split()[-1]),
+                "currency": "USD",
+                "category": "food",
+                "merchant": None,
+                "notes": item["text"],
+            }
+            for item in items
+            if item["index"] != self.skip_index
+        ]
+        payload = json.dumps({"outputs": [{"text": "Sure:\n" + json.dumps(out)}]})
+        return {"body": DummyBody(payload)}
+
+
+def test_lambda_handler_batch_packs_items_per_invocation(monkeypatch):
+    stub = BatchBedrock(skip_index=7)
+    monkeypatch.setattr(handler, "bedrock", stub)
+    monkeypatch.setattr(handler, "MAX_BATCH_ITEMS", 5)
+
+    items = [{"text": f"coffee {i + 1}", "reference_date": "2025-01-01"} for i in range(12)]
+    items.append({"reference_date": "2025-01-01"})
+    res = handler.lambda_handler({"body": json.dumps({"items": items})}, None)
+
+    assert res["statusCode"] == 200
+    results = json.loads(res["body"])["results"]
+    # 12 valid texts in chunks of 5 -> 3 model calls instead of 12.
+    assert stub.calls == 3
+    assert len(results) == 13
+    assert results[0]["amount"] == 1.0
+    assert results[0]["expense_date"] == "2025-01-01"
+    assert results[11]["notes"] == "coffee 12"
+    # Skipped by the model, and missing text: both come back as null.
+    assert results[7] is None
+    assert results[12] is None
+
+
+def test_lambda_handler_batch_rejects_empty_items():
+    res = handler.lambda_handler({"body": json.dumps({"items": []})}, None)
+    assert res["statusCode"] == 400
+
+
+def test_compact_prompt_is_shorter_and_selectable(monkeypatch):
+    full = handler._build_prompt("2kg apples 200 rupees", "2025-01-01", "full")
+    compact = handler._build_prompt("2kg apples 200 rupees", "2025-01-01", "compact")
+    assert handler.estimate_tokens(compact) * 2 < handler.estimate_tokens(full)
+    assert '"2kg apples 200 rupees"' in compact
+    assert "2025-01-01" in compact
+
+    monkeypatch.setattr(handler, "PROMPT_VARIANT", "compact")
+    assert handler._build_prompt("2kg apples 200 rupees", "2025-01-01") == compact
+
+
+def test_compact_batch_prompt_lists_items():
+    items = [{"index": 3, "text": "taxi 9", "reference_date": "2025-01-01"}]
+    prompt = handler._build_batch_prompt(items, "compact")
+    assert json.dumps(items) in prompt
+    assert len(prompt) < len(handler._build_batch_prompt(items, "full")) / 2
+
+
+def test_profile_mode_logs_tokens_and_latency(monkeypatch, caplog):
+    class HeaderBedrock(DummyBedrock):
+        def invoke_model(self, modelId, body):
+            resp = super().invoke_model(modelId, body)
+            resp["ResponseMetadata"] = {
+                "HTTPHeaders": {
+                    "x-amzn-bedrock-input-token-count": "87",
+                    "x-amzn-bedrock-output-token-count": "31",
+                }
+            }
+            return resp
+
+    monkeypatch.setattr(handler, "bedrock", HeaderBedrock('{"amount": 5}'))
+    monkeypatch.setattr(handler, "PROFILE_PROMPTS", True)
+    with caplog.at_level("INFO", logger=handler.logger.name):
+        res = handler.lambda_handler({"text": "coffee 5"}, None)
+
+    assert res["statusCode"] == 200
+    record = next(r for r in caplog.records if "Bedrock call profile" in r.getMessage())
+    profile = json.loads(record.getMessage().split(": ", 1)[1])
+    assert profile["input_tokens"] == 87
+    assert profile["output_tokens"] == 31
+    assert profile["estimated"] is False
+    assert profile["elapsed_ms"] >= 0
+
+
+STREAMS = os.path.join(os.path.dirname(__file__), "data")
+
+
+class RecordedStream:
+    """Replays a recorded invoke_model_with_response_stream body, counting reads."""
+
+    def __init__(self, name):
+        with open(os.path.join(STREAMS, f"stream_{name}.jsonl"), encoding="utf-8") as fh:
+            self.events = [{"chunk": {"bytes": line.strip().encode("utf-8")}} for line in fh]
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for event in self.events:
+            self.consumed += 1
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+class StreamingBedrock:
+    def __init__(self, name):
+        self.stream = RecordedStream(name)
+
+    def invoke_model_with_response_stream(self, modelId, body):
+        return {"body": self.stream}
+
+
+@pytest.mark.parametrize(
+    "name,opener,expected_events",
+    [("trailing_chatter", "{", 7), ("tricky_strings", "{", 3), ("batch_array", "[", 5)],
+)
+def test_json_scanner_stops_when_top_level_value_closes(name, opener, expected_events):
+    stream = RecordedStream(name)
+    scanner = handler.JSONScanner(opener)
+    text = None
+    for event in stream:
+        chunk = json.loads(event["chunk"]["bytes"])["outputs"][0]["text"]
+        text = scanner.feed(chunk)
+        if text is not None:
+            break
+
+    assert stream.consumed == expected_events
+    parsed = json.loads(text)
+    if name == "tricky_strings":
+        assert parsed["merchant"] == 'Joe"s } Diner\\'
+        assert parsed["notes"] == "lunch [team] {x}"
+    if name == "batch_array":
+        assert [item["index"] for item in parsed] == [0, 1]
+
+
+def test_lambda_handler_streams_and_ignores_trailing_chatter(monkeypatch):
+    stub = StreamingBedrock("trailing_chatter")
+    monkeypatch.setattr(handler, "bedrock", stub)
+    monkeypatch.setattr(handler, "STREAM_RESPONSES", True)
+
+    res = handler.lambda_handler({"text": "2kg apples 200 rupees"}, None)
+
+    assert res["statusCode"] == 200
+    body = json.loads(res["body"])
+    assert body["amount"] == 200.0
+    assert body["currency"] == "INR"
+    # The 7 remaining chatter events were never read and the stream was closed.
+    assert stub.stream.consumed == 7
+    assert stub.stream.closed
+
+
+def test_stream_truncated_output_reports_parse_error(monkeypatch):
+    monkeypatch.setattr(handler, "bedrock", StreamingBedrock("truncated"))
+    monkeypatch.setattr(handler, "STREAM_RESPONSES", True)
+
+    call = handler._call_model("prompt", 16)
+    assert call.output_tokens == 16
+    assert not call.estimated
+
+    res = handler.lambda_handler({"text": "metro 30 EUR"}, None)
+    assert res["statusCode"] == 500
+
+
+def test_eval_prompts_replays_the_sample_recording():
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(
+        "eval_prompts", os.path.join(ROOT, "scripts", "eval_prompts.py")
+    )
+    eval_prompts = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(eval_prompts)
+
+    with open(os.path.join(STREAMS, "prompt_eval_corpus.jsonl"), encoding="utf-8") as fh:
+        corpus = [json.loads(line) for line in fh if line.strip()]
+    call = eval_prompts._replay_caller(os.path.join(STREAMS, "prompt_eval_recording.jsonl"))
+
+    full = eval_prompts.evaluate("full", corpus, call, 256)
+    compact = eval_prompts.evaluate("compact", corpus, call, 128)
+    assert full["exact"] == 1.0
+    # One compact completion miscounts "3 coffees 12 USD"; trailing chatter still parses.
+    assert compact["exact"] == 0.8 and compact["category_acc"] == 1.0
+    assert compact["input_tokens"] < full["input_tokens"]